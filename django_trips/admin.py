@@ -1,5 +1,6 @@
 from config_models.admin import ConfigurationModelAdmin
 from django.contrib import admin
+from django.db import transaction
 
 from django_trips.choices import LocationType
 from django_trips.models import (
@@ -26,6 +27,10 @@ from django_trips.models import (
     TripWishlist,
     TrustBadge,
 )
+from django_trips.signals import (
+    bump_catalog_version_on_commit,
+    refresh_destination_days_on_commit,
+)
 
 # =============================================================================
 # Locations
@@ -99,8 +104,18 @@ class HostRatingInline(admin.StackedInline):
     description="Mark selected hosts as inactive (and deactivate their trips)"
 )
 def deactivate_hosts(modeladmin, request, queryset):
-    trips_updated = Trip.objects.filter(host__in=queryset).update(is_active=False)
-    hosts_updated = queryset.update(is_active=False)
+    trips = Trip.objects.filter(host__in=queryset)
+    with transaction.atomic():
+        destination_ids = set(trips.values_list("destination", flat=True))
+        # One set-based UPDATE - an inactive trip is never listable, so
+        # Trip.is_listable is cleared alongside is_active rather than recomputed.
+        trips_updated = trips.update(is_active=False, is_listable=False)
+        hosts_updated = queryset.update(is_active=False)
+        # Both bulk updates above bypass the post_save receivers that normally
+        # invalidate cached catalog data (see cache.py) and rebuild the
+        # destination calendars the trips were listed in.
+        bump_catalog_version_on_commit()
+        refresh_destination_days_on_commit(destination_ids)
     modeladmin.message_user(
         request,
         f"Deactivated {hosts_updated} host(s) and {trips_updated} of their trip(s).",
@@ -0,0 +1,134 @@
+"""
+The Trip queryset a trip card (`TripListSerializer`) renders from - shared
+by `/trips/`, the rows that nest or include a trip (`/trips/upcoming/`,
+`?format=compact`'s `included`) and the benchmark commands.
+"""
+
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+
+from django_trips.api.serializers import get_card_images_limit, get_card_schedules_limit
+from django_trips.choices import ScheduleStatus
+from django_trips.models import TripImage, TripPackage, TripReview, TripSchedule
+
+#: Trip columns `TripListSerializer` never renders - the heavy free-text/JSON
+#: ones only the detail page shows - deferred on every card query.
+TRIP_CARD_DEFERRED_FIELDS = (
+    "overview",
+    "included",
+    "excluded",
+    "add_ons",
+    "travel_tips",
+    "requirements",
+    "child_policy",
+    "metadata",
+)
+
+
+def prefetch_trip_card_relations(queryset, field_names):
+    """
+    Loads exactly what `TripListSerializer` needs to render `field_names`
+    (see `SparseFieldsetViewMixin.get_selected_field_names`) for every trip
+    on a page in a fixed number of queries, and nothing it doesn't - a
+    relation behind an unrequested field is never joined or prefetched, and
+    `description` is deferred along with `TRIP_CARD_DEFERRED_FIELDS` unless
+    it was asked for.
+
+    Rows that only point at a trip (e.g. `/trips/upcoming/`'s schedules)
+    get the same treatment by prefetching `trip` with this as the queryset -
+    see `UpcomingTripsListAPIView.get_queryset`.
+    """
+    deferred = TRIP_CARD_DEFERRED_FIELDS
+    if "description" not in field_names:
+        deferred += ("description",)
+    queryset = queryset.defer(*deferred)
+
+    # Single-valued relations TripListSerializer renders per row
+    # (destination, its parent for Location.region, the review summary,
+    # and the host -> host.type/host.ratings chain) - safe to
+    # select_related alongside an annotate()/distinct() since none of
+    # these add extra rows, unlike the M2M/reverse-FK relations below.
+    select_related = []
+    if "destination" in field_names:
+        select_related += ["destination", "destination__parent"]
+    if "host" in field_names:
+        select_related += ["host", "host__type", "host__ratings"]
+    if "review_summary" in field_names:
+        select_related.append("review_summary")
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+
+    if "departures_count" in field_names:
+        # Counted in a correlated subquery rather than Count("schedules"):
+        # the list queryset already joins packages for its `price`
+        # aggregate, which a second to-many join would multiply.
+        departures = (
+            TripSchedule.objects.upcoming()
+            .filter(trip=OuterRef("pk"), status=ScheduleStatus.PUBLISHED)
+            .order_by()
+            .values("trip")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        queryset = queryset.annotate(
+            departures_count=Coalesce(Subquery(departures), 0)
+        )
+
+    # Cards only show the first few images/departures, however many a trip
+    # has (a daily trip expanded by create_schedules() can have hundreds of
+    # departures) - so both prefetches are sliced, which Django runs as a
+    # single `ROW_NUMBER() OVER (PARTITION BY trip_id ...)` query for the
+    # whole page, loading at most N rows per trip.
+    prefetches = []
+    if "schedules" in field_names or "next_departure" in field_names:
+        # Backs TripListSerializer.schedules/next_departure - prefetched once
+        # per page here (to_attr caches it off each trip instance) rather
+        # than one query per row inside the serializer.
+        prefetches.append(
+            Prefetch(
+                "schedules",
+                queryset=TripSchedule.objects.upcoming()
+                .filter(status=ScheduleStatus.PUBLISHED)
+                .order_by("start_date", "pk")[: get_card_schedules_limit()],
+                to_attr="_prefetched_upcoming_schedules",
+            )
+        )
+    if "images" in field_names:
+        prefetches.append(
+            Prefetch(
+                "images",
+                queryset=TripImage.objects.order_by("order", "pk")[: get_card_images_limit()],
+                to_attr="_prefetched_card_images",
+            )
+        )
+    if "starting_price" in field_names:
+        # Backs TripListSerializer.get_starting_price - same to_attr
+        # trick as schedules above, since the model's starting_price
+        # property builds its own fresh `.order_by().first()` query
+        # that a plain prefetch_related("packages") wouldn't satisfy.
+        prefetches.append(
+            Prefetch(
+                "packages",
+                queryset=TripPackage.objects.order_by("base_price"),
+                to_attr="_prefetched_packages_by_price",
+            )
+        )
+    if "review_summary" in field_names:
+        # Backs get_trip_review_summary_data's reviews_count - same
+        # reasoning as packages above (trip.reviews.filter(...).count()
+        # is a fresh query the ORM can't satisfy from a bare prefetch).
+        prefetches.append(
+            Prefetch(
+                "reviews",
+                queryset=TripReview.objects.filter(is_verified=True),
+                to_attr="_prefetched_verified_reviews",
+            )
+        )
+    prefetches += [
+        relation
+        for relation in ("categories", "facilities", "trust_badges")
+        if relation in field_names
+    ]
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset
@@ -0,0 +1,164 @@
+"""
+Deduplicated `?format=compact` responses for schedule-heavy list endpoints.
+
+`/trips/upcoming/` and `/destinations/` render a schedule per row, and the
+standard format nests the whole trip card (host, destination, taxonomy,
+images) into every one of them - ten departures of one trip is ten
+identical trip blobs. With `?format=compact` each row carries its trip's id
+instead, and the response gains an `included` block holding every
+referenced trip, location, host and taxonomy item exactly once, keyed by id:
+
+    {
+        "count": 2, ..., "results": [{"id": 7, "trip": 3, ...}, {"id": 8, "trip": 3, ...}],
+        "included": {
+            "trips": {"3": {"name": ..., "destination": 5, "host": 2, "categories": [1, 4], ...}},
+            "locations": {"5": {...}},
+            "hosts": {"2": {...}},
+            "categories": {"1": {...}, "4": {...}},
+            "facilities": {...},
+            "trust_badges": {...}
+        }
+    }
+
+Each included object has exactly the shape the standard format nests. Only
+the relations the (sparse-fieldset narrowed) trips actually render get an
+`included` entry.
+"""
+
+from typing import Optional
+
+from django_trips.api.cards import prefetch_trip_card_relations
+from django_trips.api.fieldsets import SparseFieldsetViewMixin, get_nested_selection
+from django_trips.api.renderers import CompactJSONRenderer
+from django_trips.api.serializers import (
+    CategorySerializer,
+    CompactTripListSerializer,
+    FacilitySerializer,
+    HostSerializer,
+    LocationSerializer,
+    TrustBadgeSerializer,
+)
+from django_trips.models import Trip
+
+#: (trip field, `included` key, serializer, is a many-relation) for each
+#: related object `CompactTripListSerializer` renders as an id.
+COMPACT_TRIP_RELATIONS = (
+    ("destination", "locations", LocationSerializer, False),
+    ("host", "hosts", HostSerializer, False),
+    ("categories", "categories", CategorySerializer, True),
+    ("facilities", "facilities", FacilitySerializer, True),
+    ("trust_badges", "trust_badges", TrustBadgeSerializer, True),
+)
+
+
+class CompactIncluded:
+    """
+    Collects the trips a compact response's rows reference (rows register
+    themselves - see `CompactTripScheduleSerializer`), then loads and
+    renders each of them, and each object they share, once.
+
+    `get_trip_queryset(field_names)` returns the Trip queryset (with
+    whatever joins/prefetches rendering `field_names` needs) the collected
+    trips are loaded from. `context` is the rows' serializer context, which
+    the included objects render with too.
+    """
+
+    def __init__(self, get_trip_queryset):
+        self.get_trip_queryset = get_trip_queryset
+        self.trip_ids = {}
+        self.context = {}
+
+    def add_trip(self, trip_id):
+        self.trip_ids.setdefault(trip_id, None)
+
+    def load_trips(self, field_names):
+        if not self.trip_ids:
+            return []
+        trips = list(self.get_trip_queryset(field_names).filter(pk__in=list(self.trip_ids)))
+        return sorted(trips, key=lambda trip: trip.pk)
+
+    def render_by_pk(self, serializer_class, objects, **kwargs):
+        data = serializer_class(objects, many=True, context=self.context, **kwargs).data
+        return {obj.pk: obj_data for obj, obj_data in zip(objects, data)}
+
+    @staticmethod
+    def related_objects(trips, field_name, many):
+        """The distinct objects `trips` reference through `field_name`, by pk."""
+        related = {}
+        for trip in trips:
+            objects = getattr(trip, field_name).all() if many else [getattr(trip, field_name)]
+            related.update((obj.pk, obj) for obj in objects if obj is not None)
+        return sorted(related.values(), key=lambda obj: obj.pk)
+
+    def get_data(self, sparse_fields: Optional[dict] = None, sparse_omit=None):
+        sparse_omit = sparse_omit or {}
+        field_names = CompactTripListSerializer.get_selected_field_names(
+            sparse_fields, sparse_omit
+        )
+        trips = self.load_trips(field_names)
+        included = {
+            "trips": self.render_by_pk(
+                CompactTripListSerializer,
+                trips,
+                sparse_fields=sparse_fields,
+                sparse_omit=sparse_omit,
+            )
+        }
+        for field_name, key, serializer_class, many in COMPACT_TRIP_RELATIONS:
+            if field_name in field_names:
+                included[key] = self.render_by_pk(
+                    serializer_class, self.related_objects(trips, field_name, many)
+                )
+        return included
+
+
+class CompactFormatViewMixin:
+    """
+    Adds `?format=compact` to a list view: `compact_serializer_class` renders
+    the rows, and the trips they reference are appended as `included`.
+    """
+
+    compact_serializer_class = None
+
+    def get_renderers(self):
+        return super().get_renderers() + [CompactJSONRenderer()]
+
+    def is_compact(self) -> bool:
+        renderer = getattr(getattr(self, "request", None), "accepted_renderer", None)
+        return getattr(renderer, "format", None) == CompactJSONRenderer.format
+
+    def get_serializer_class(self):
+        if self.compact_serializer_class is not None and self.is_compact():
+            return self.compact_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        compact_included = getattr(self, "compact_included", None)
+        if compact_included is not None:
+            context["compact_included"] = compact_included
+            compact_included.context = context
+        return context
+
+    def get_compact_trip_queryset(self, field_names):
+        """The trips `included` renders, loaded with what `field_names` need."""
+        return prefetch_trip_card_relations(Trip.objects.all(), field_names)
+
+    def get_compact_trip_selection(self):
+        """`?fields=trip.name` narrows the included trips as it would a nested trip."""
+        if isinstance(self, SparseFieldsetViewMixin):
+            return get_nested_selection(*self.get_sparse_fieldset(), "trip")
+        return None, {}
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_compact():
+            return super().list(request, *args, **kwargs)
+
+        self.compact_included = CompactIncluded(self.get_compact_trip_queryset)
+        response = super().list(request, *args, **kwargs)
+        if isinstance(response.data, list):
+            response.data = {"results": response.data}
+        response.data["included"] = self.compact_included.get_data(
+            *self.get_compact_trip_selection()
+        )
+        return response
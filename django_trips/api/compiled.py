@@ -0,0 +1,117 @@
+"""
+Compiled fast path for rendering many instances of the same serializer.
+
+`Serializer.to_representation` re-walks every field per instance: a
+`get_attribute()` with its source resolution and SkipField handling, the
+`PKOnlyObject`/None check, then `to_representation()` dispatch - and nested
+serializers repeat all of it per related object. On a prefetched 100-card
+`/trips/` page that dispatch is most of the CPU left.
+
+`compile_serializer()` does that resolution once per serializer instead -
+picking each field's attribute accessor and representation function up
+front - and returns a plain `instance -> dict` function producing exactly
+what `serializer.to_representation(instance)` would. A serializer can also
+hand-compile a field by defining `compile_<field_name>()`, returning its
+own `instance -> value` function (see `TripListSerializer.compile_trip_url`).
+Use it by setting `Meta.list_serializer_class = CompiledListSerializer`.
+"""
+
+from operator import attrgetter
+from typing import Callable
+
+from django.db import models
+from rest_framework import relations, serializers
+
+from django_trips.api.memo import MemoizedSerializerMixin
+
+Builder = Callable[[object], object]
+
+
+def compile_getter(field) -> Builder:
+    """
+    Attribute accessor for `field`: a bare `attrgetter` for a plain
+    single-attribute source on a model serializer, otherwise the field's own
+    `get_attribute()` (dotted/"*" sources, callables, relations' pk-only
+    optimization, dict instances, ...).
+    """
+    model = getattr(getattr(field.parent, "Meta", None), "model", None)
+    source_attrs = field.source_attrs
+    if (
+        model is not None
+        and len(source_attrs) == 1
+        and not isinstance(field, (relations.RelatedField, relations.ManyRelatedField))
+        and not callable(getattr(model, source_attrs[0], None))
+    ):
+        return attrgetter(source_attrs[0])
+    return field.get_attribute
+
+
+def compile_field(field) -> Builder:
+    """`instance -> value` function for one bound serializer field."""
+    if isinstance(field, serializers.SerializerMethodField):
+        return getattr(field.parent, field.method_name)
+
+    get_attribute = compile_getter(field)
+    if isinstance(field, serializers.ListSerializer):
+        build_child = compile_serializer(field.child)
+
+        def build_list(instance):
+            value = get_attribute(instance)
+            if value is None:
+                return None
+            if isinstance(value, models.manager.BaseManager):
+                value = value.all()
+            return [build_child(item) for item in value]
+
+        return build_list
+
+    if isinstance(field, serializers.BaseSerializer):
+        to_representation = compile_serializer(field)
+    else:
+        to_representation = field.to_representation
+
+    if get_attribute == field.get_attribute:
+        # Same None check as Serializer.to_representation, PKOnlyObject included.
+        def build_value(instance):
+            value = get_attribute(instance)
+            check_for_none = value.pk if isinstance(value, relations.PKOnlyObject) else value
+            return None if check_for_none is None else to_representation(value)
+
+        return build_value
+
+    def build_attribute(instance):
+        value = get_attribute(instance)
+        return None if value is None else to_representation(value)
+
+    return build_attribute
+
+
+def compile_serializer(serializer) -> Builder:
+    """`instance -> dict` function equivalent to `serializer.to_representation`."""
+    if type(serializer).to_representation not in (
+        serializers.Serializer.to_representation,
+        MemoizedSerializerMixin.to_representation,
+    ):
+        # A custom to_representation can't be second-guessed - defer to it.
+        return serializer.to_representation
+
+    steps = []
+    for field in serializer._readable_fields:  # pylint:disable=protected-access
+        compile_hook = getattr(serializer, f"compile_{field.field_name}", None)
+        steps.append((field.field_name, compile_hook() if compile_hook else compile_field(field)))
+
+    def build(instance):
+        return {field_name: build_field(instance) for field_name, build_field in steps}
+
+    if isinstance(serializer, MemoizedSerializerMixin):
+        return serializer.memoize(build)
+    return build
+
+
+class CompiledListSerializer(serializers.ListSerializer):  # pylint:disable=abstract-method
+    """`ListSerializer` rendering its items through `compile_serializer(child)`."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        build = compile_serializer(self.child)
+        return [build(item) for item in iterable]
@@ -0,0 +1,110 @@
+"""
+A trip's departures by day for a month - the booking widget's calendar.
+
+`/trips/<id>/calendar/?month=YYYY-MM` returns, for each day of the month
+with a published departure to come, the seats left across that day's
+departures and what each package tier costs on it - `base_price` plus the
+departure's surcharge, the same sum `get_effective_price()` (services.py)
+makes at booking time, so the widget needn't redo it:
+
+    {
+        "month": "2026-08",
+        "days": [
+            {
+                "date": "2026-08-14", "departures": 1, "seats_left": 12,
+                "min_price": 15000,
+                "prices": [{"package": "STANDARD", "price": 15000, "child_price": 9000}, ...]
+            },
+            ...
+        ]
+    }
+
+All of it comes from one query grouped by day and package. Responses are
+cached per trip and month, under both the catalog version (schedule and
+package writes) and the trip's own version (bookings - see signals.py).
+"""
+
+import calendar
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Min, Sum
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from django_trips.cache import catalog_cache_key, get_trip_version
+from django_trips.choices import ScheduleStatus
+from django_trips.models import TripSchedule
+
+
+def get_calendar_cache_timeout():
+    return getattr(settings, "DJANGO_TRIPS_CALENDAR_CACHE_TIMEOUT", 300)
+
+
+def parse_month(value):
+    """The first day of a `YYYY-MM` month - this month when `value` is empty."""
+    if not value:
+        return timezone.now().date().replace(day=1)
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError as error:
+        raise ValidationError({"month": "Enter a month as YYYY-MM."}) from error
+
+
+def upcoming_days(month):
+    """(first, last) day of `month` still to come - (today, ...) for this month."""
+    last = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+    return max(month, timezone.now().date()), last
+
+
+def departure_calendar(trip, month):
+    """The calendar (see the module docstring) of `trip`'s departures in `month`."""
+    rows = (
+        TripSchedule.objects.filter(
+            trip=trip, status=ScheduleStatus.PUBLISHED, start_date__range=upcoming_days(month)
+        )
+        .values("start_date", package=F("trip__packages__name"))
+        .annotate(
+            departures=Count("pk"),
+            seats_left=Sum("seats_left"),
+            price=Min(F("trip__packages__base_price") + F("additional_price")),
+            child_price=Min(F("trip__packages__base_child_price") + F("additional_child_price")),
+        )
+        .order_by("start_date", "price", "package")
+    )
+    days = {}
+    for row in rows:
+        # Every package of a day groups the same departures, so any row
+        # carries the day's departures/seats.
+        day = days.setdefault(
+            row["start_date"],
+            {
+                "date": row["start_date"],
+                "departures": row["departures"],
+                "seats_left": row["seats_left"],
+                "min_price": row["price"],
+                "prices": [],
+            },
+        )
+        if row["package"] is not None:
+            day["prices"].append(
+                {
+                    "package": row["package"],
+                    "price": row["price"],
+                    "child_price": row["child_price"],
+                }
+            )
+    return {"month": month.strftime("%Y-%m"), "days": list(days.values())}
+
+
+def get_departure_calendar(trip, month: date):
+    """`departure_calendar()`, cached per trip and month."""
+    cache_key = catalog_cache_key(
+        "trip-calendar", trip.pk, get_trip_version(trip.pk), month.isoformat()
+    )
+    data = cache.get(cache_key)
+    if data is None:
+        data = departure_calendar(trip, month)
+        cache.set(cache_key, data, get_calendar_cache_timeout())
+    return data
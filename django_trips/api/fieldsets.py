@@ -0,0 +1,119 @@
+"""
+Client-selected sparse fieldsets (`?fields=` / `?omit=`).
+
+Both params take a comma-separated list of field names, with dots reaching
+into nested serializers, e.g. on `/trips/upcoming/`:
+
+    ?fields=id,start_date,seats_left,trip.name,trip.slug,trip.poster
+    ?omit=trip.host,trip.schedules
+
+A bare name in `fields` keeps that whole field (nested or not); a dotted one
+keeps the nested field but narrows it to the named sub-fields. Unknown names
+are ignored. Only serializers declared with `SparseFieldsetSerializerMixin`
+(trip, schedule and booking serializers) honour a selection, and only on
+read requests - a write's validation still sees every field.
+
+The selection is parsed by `SparseFieldsetViewMixin` and handed to the
+root serializer; from there each serializer passes its nested fields'
+share of it down. Views also use it to skip loading relations/columns the
+response won't include - see `TripViewSet.get_queryset`.
+"""
+
+from typing import Optional
+
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_QUERY_PARAM = "fields"
+OMIT_QUERY_PARAM = "omit"
+
+
+def parse_field_tree(value: Optional[str]) -> dict:
+    """
+    "name,trip.slug,trip.host.name" -> {"name": {}, "trip": {"slug": {}, "host": {"name": {}}}}.
+    An empty dict means "this whole field".
+    """
+    tree = {}
+    for path in (value or "").split(","):
+        node = tree
+        for part in filter(None, (part.strip() for part in path.split("."))):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def get_nested_selection(include: Optional[dict], omit: dict, field_name: str):
+    """`(include, omit)` for one field's nested serializer, given its parent's."""
+    nested_include = include.get(field_name) or None if include is not None else None
+    return nested_include, omit.get(field_name) or {}
+
+
+def is_field_selected(include: Optional[dict], omit: dict, field_name: str) -> bool:
+    if include is not None and field_name not in include:
+        return False
+    return omit.get(field_name) != {}
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Drops fields outside the `sparse_fields`/`sparse_omit` selection (parsed
+    field trees, see `parse_field_tree`) and passes nested serializers their
+    own share of it.
+    """
+
+    def __init__(self, *args, sparse_fields=None, sparse_omit=None, **kwargs):
+        self._sparse_fields = sparse_fields
+        self._sparse_omit = sparse_omit or {}
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def get_selected_field_names(cls, include: Optional[dict], omit: dict) -> set:
+        """Top-level field names a `(include, omit)` selection keeps."""
+        return {
+            field_name
+            for field_name in cls.Meta.fields
+            if is_field_selected(include, omit, field_name)
+        }
+
+    def get_fields(self):
+        fields = super().get_fields()
+        include, omit = self._sparse_fields, self._sparse_omit
+        if include is None and not omit:
+            return fields
+
+        for field_name in list(fields):
+            if not is_field_selected(include, omit, field_name):
+                del fields[field_name]
+                continue
+            field = fields[field_name]
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, SparseFieldsetSerializerMixin):
+                nested._sparse_fields, nested._sparse_omit = get_nested_selection(
+                    include, omit, field_name
+                )
+        return fields
+
+
+class SparseFieldsetViewMixin:
+    """Parses `?fields=`/`?omit=` off the request and applies them to the view's serializer."""
+
+    def get_sparse_fieldset(self):
+        """`(include, omit)` field trees for this request - `(None, {})` means "everything"."""
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None, {}
+        params = request.query_params
+        # A blank `?fields=` selects nothing in particular, i.e. everything.
+        include = parse_field_tree(params.get(FIELDS_QUERY_PARAM)) or None
+        return include, parse_field_tree(params.get(OMIT_QUERY_PARAM))
+
+    def get_selected_field_names(self):
+        """Top-level fields of this view's serializer the response will include."""
+        return self.get_serializer_class().get_selected_field_names(*self.get_sparse_fieldset())
+
+    def get_serializer(self, *args, **kwargs):
+        include, omit = self.get_sparse_fieldset()
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, SparseFieldsetSerializerMixin):
+            kwargs.setdefault("sparse_fields", include)
+            kwargs.setdefault("sparse_omit", omit)
+        return super().get_serializer(*args, **kwargs)
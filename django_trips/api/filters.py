@@ -1,10 +1,39 @@
+import math
 from datetime import timedelta
 
 import django_filters as filters
-from django.db.models import Q
+from django import forms
+from django.conf import settings
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    Min,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Abs, Coalesce, Least
+from django.utils import timezone
+from django_filters.constants import EMPTY_VALUES
+from rest_framework.filters import OrderingFilter
 
 from django_trips.choices import LocationType, ScheduleStatus
-from django_trips.models import Location, Trip, TripBooking, TripPackage, TripSchedule
+from django_trips.geo import EARTH_RADIUS_KM, distance_km_expression, near_q
+from django_trips.managers import member_token
+from django_trips.models import (
+    Location,
+    Trip,
+    TripBooking,
+    TripOrigin,
+    TripPackage,
+    TripSchedule,
+    TripTrigram,
+)
+from django_trips.trigrams import SIMILARITY_THRESHOLD, resolve_location_slugs, trigrams
 
 
 def expand_destination_slugs(slugs):
@@ -17,8 +46,13 @@ def expand_destination_slugs(slugs):
 
     Scoped to parent__type=REGION specifically - a CITY with children (e.g.
     Skardu with Shangrila) doesn't roll its children up; only a REGION does.
+
+    A value that isn't a slug at all (a typo'd "hunza-valey", a run-together
+    "nathiagali") is first resolved to the closest location slug(s) by
+    trigram similarity - see `resolve_location_slugs`.
     """
-    return set(slugs) | set(
+    slugs = resolve_location_slugs(slugs)
+    return slugs | set(
         Location.objects.filter(
             parent__slug__in=slugs, parent__type=LocationType.REGION
         ).values_list("slug", flat=True)
@@ -26,21 +60,332 @@ def expand_destination_slugs(slugs):
 
 
 class TimedeltaFromDaysFilter(filters.NumberFilter):
+    """
+    Compares a `duration` DurationField against a number of days.
+
+    The exact comparison is on `duration` itself, but it's preceded by a
+    range on the indexed whole-days `duration_days` column next to it
+    (`Trip.duration_days`), which is what lets the database narrow the rows
+    by index first: `duration >= N days` implies `duration_days >= floor(N)`,
+    and `duration <= N days` implies `duration_days <= floor(N)` (likewise
+    for the strict comparisons).
+    """
+
+    days_lookups = {"gt": "gte", "gte": "gte", "lt": "lte", "lte": "lte"}
+
     def filter(self, qs, value):
-        if value is not None:
-            try:
-                value = timedelta(days=float(value))
-            except (ValueError, TypeError):
-                return qs.none()
-        return super().filter(qs, value)
+        if value in EMPTY_VALUES:
+            return qs
+        try:
+            duration = timedelta(days=float(value))
+            whole_days = math.floor(float(value))
+        except (ValueError, TypeError, OverflowError):
+            return qs.none()
+        if self.distinct:
+            qs = qs.distinct()
+        lookups = {f"{self.field_name}__{self.lookup_expr}": duration}
+        days_lookup = self.days_lookups.get(self.lookup_expr)
+        if days_lookup:
+            lookups[f"{self.field_name}_days__{days_lookup}"] = whole_days
+        return self.get_method(qs)(**lookups)
 
 
 class CharInFilter(filters.BaseInFilter, filters.CharFilter):
     pass
 
 
+class FuzzyNameFilter(filters.CharFilter):
+    """
+    A case-insensitive "name contains" on a trip name - or, when no trip in
+    the catalog contains it, the trips whose names share at least
+    `SIMILARITY_THRESHOLD` of its trigrams, so a typo'd search still finds
+    something. Whether to fall back is decided on the whole catalog, not
+    `qs` (a name that's real but filtered out here, e.g. a trip with no
+    upcoming departure, is not a typo), within the same query. Matches are
+    annotated with their `name_match_score` - the search's trigrams their
+    name shares (`TripTrigram.shared_count()`), plus the search's own
+    trigram count when it contains it - and ordered by it, best first,
+    ahead of whatever order the queryset already had. `field_name` is the
+    path to the trip's `name`, e.g. "trip__name".
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("lookup_expr", "icontains")
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        query_grams = trigrams(value)
+        if not query_grams:
+            return super().filter(qs, value)
+        trip_path = self.field_name.removesuffix("name")
+        contains = Q(**{f"{self.field_name}__{self.lookup_expr}": value})
+        # Part of the same statement, not a query of its own.
+        typo = ~Exists(Trip.objects.active().filter(name__icontains=value))
+        model_meta = qs.model._meta  # pylint:disable=protected-access
+        ordering = qs.query.order_by or model_meta.ordering
+        return (
+            qs.annotate(
+                name_match_score=Coalesce(
+                    TripTrigram.shared_count(query_grams, OuterRef(f"{trip_path}pk")), 0
+                )
+                + Case(When(contains, then=len(query_grams)), default=0)
+            )
+            .filter(
+                contains
+                | typo
+                & Q(name_match_score__gte=math.ceil(len(query_grams) * SIMILARITY_THRESHOLD))
+            )
+            .order_by("-name_match_score", *ordering)
+        )
+
+
+class AllOfFilter(CharInFilter):
+    """
+    A list of slugs a trip's `relation` M2M must contain every one of -
+    "matches all", where the plain `__in` filters match any. Tested against
+    the trip's denormalized `Trip.MEMBER_FIELDS` column, one `contains` per
+    slug, so each extra slug adds a condition on the same row rather than
+    another join (and duplicate rows to `distinct()` away).
+    """
+
+    def __init__(self, *args, relation, **kwargs):
+        self.relation = relation
+        kwargs.setdefault("field_name", Trip.MEMBER_FIELDS[relation])
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        slugs = set(value)
+        related_model = Trip._meta.get_field(self.relation).related_model  # pylint:disable=protected-access
+        member_ids = list(related_model.objects.filter(slug__in=slugs).values_list("pk", flat=True))
+        if len(member_ids) < len(slugs):
+            return qs.none()  # an unknown slug is a member of no trip
+        lookup = f"{self.field_name}__contains"
+        return qs.filter(*(Q(**{lookup: member_token(pk)}) for pk in member_ids))
+
+
+class CountFilter(filters.NumberFilter):
+    """A non-negative whole number, e.g. a head count."""
+
+    field_class = forms.IntegerField
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("min_value", 0)
+        super().__init__(*args, **kwargs)
+
+
+class LatLonField(forms.CharField):
+    """A "lat,lon" pair in decimal degrees, cleaned to a (lat, lon) tuple."""
+
+    def clean(self, value):
+        value = super().clean(value)
+        if value in EMPTY_VALUES:
+            return None
+        try:
+            lat, lon = (float(part) for part in value.split(","))
+        except ValueError as error:
+            raise forms.ValidationError("Enter a location as lat,lon.") from error
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise forms.ValidationError("Latitude must be within +/-90 and longitude +/-180.")
+        return lat, lon
+
+
+class LatLonFilter(filters.CharFilter):
+    field_class = LatLonField
+
+
+#: Further than any two points on Earth are apart - the distance to a
+#: location without coordinates.
+FAR_KM = math.pi * EARTH_RADIUS_KM + 1
+
+
+def get_near_default_radius_km():
+    return getattr(settings, "DJANGO_TRIPS_NEAR_DEFAULT_RADIUS_KM", 50)
+
+
+def passenger_limits_q(party_size: int, prefix: str = "") -> Q:
+    """
+    Trips whose `passenger_limit_min`/`passenger_limit_max` admit a party of
+    `party_size` - 0/null meaning no limit on either side. `prefix` is the
+    lookup path to the trip, e.g. "trip__" from a schedule.
+    """
+    minimum, maximum = f"{prefix}passenger_limit_min", f"{prefix}passenger_limit_max"
+    return (
+        Q(**{f"{minimum}__isnull": True}) | Q(**{f"{minimum}__lte": party_size})
+    ) & (
+        Q(**{f"{maximum}__isnull": True})
+        | Q(**{maximum: 0})
+        | Q(**{f"{maximum}__gte": party_size})
+    )
+
+
+class PartySizeFilterSet(filters.FilterSet):
+    """
+    `adults`/`children`: keep only what a party of that size can book - a
+    departure with at least that many `seats_left` (a stored, indexed
+    column - see TripSchedule.seats_left), on a trip whose passenger limits
+    admit it. Both count towards the party; either may be given alone.
+    Subclasses apply `get_party_size()` in their own filter_queryset().
+
+    (Trip.age_limit isn't checked: a head count carries no ages.)
+    """
+
+    adults = CountFilter(
+        method="filter_noop",
+        help_text="Number of adults travelling - only trips/departures with "
+        "room for the whole party (adults + children) are kept.",
+    )
+    children = CountFilter(
+        method="filter_noop",
+        help_text="Number of children travelling, counted towards the party "
+        "size along with adults.",
+    )
+
+    def filter_noop(self, queryset, _name, _value):
+        """Actual filtering for these fields happens once, combined, in filter_queryset()."""
+        return queryset
+
+    def get_party_size(self):
+        """adults + children, or None when neither was given (or both are 0)."""
+        party_size = sum(
+            self.form.cleaned_data.get(field_name) or 0 for field_name in ("adults", "children")
+        )
+        return party_size or None
+
+
+class FlexibleDateFilterSet(filters.FilterSet):
+    """
+    `date`/`flex_days`: keep only published departures starting within
+    `flex_days` (default 0, at most `MAX_FLEX_DAYS`) of `date`, nearest
+    first - "around 14 August, give or take 3 days" in one request.
+    Subclasses apply `get_date_window()` in their own filter_queryset(),
+    ranking by `date_distance_expression()`.
+    """
+
+    MAX_FLEX_DAYS = 14
+
+    date = filters.DateFilter(
+        method="filter_noop",
+        help_text="Filter trips with a published departure starting on this date, "
+        "give or take `flex_days` (YYYY-MM-DD) - nearest departures first.",
+    )
+    flex_days = CountFilter(
+        method="filter_noop",
+        max_value=MAX_FLEX_DAYS,
+        help_text=f"How many days either side of `date` a departure may start "
+        f"(0-{MAX_FLEX_DAYS}, default 0).",
+    )
+
+    def filter_noop(self, queryset, _name, _value):
+        """Actual filtering for these fields happens once, combined, in filter_queryset()."""
+        return queryset
+
+    def get_date_window(self):
+        """(date, first start date, last start date), or None when `date` wasn't given."""
+        target = self.form.cleaned_data.get("date")
+        if target is None:
+            return None
+        flex = timedelta(days=self.form.cleaned_data.get("flex_days") or 0)
+        return target, target - flex, target + flex
+
+    @staticmethod
+    def date_distance_expression(target, prefix=""):
+        """How far (a duration) the `start_date` at `prefix` is from `target`, either way."""
+        return Abs(F(f"{prefix}start_date") - Value(target))
+
+
+class NearFilterSet(filters.FilterSet):
+    """
+    `near`/`radius_km`: keep only trips whose destination or departure
+    location lies within `radius_km` (default
+    `DJANGO_TRIPS_NEAR_DEFAULT_RADIUS_KM`, at most `MAX_RADIUS_KM`) of
+    `near`, nearest first. The locations in range are found first, by grid
+    cell, bounding box and haversine distance (see geo.py); subclasses
+    call `filter_near()` from their own filter_queryset().
+    """
+
+    MAX_RADIUS_KM = 500
+
+    near = LatLonFilter(
+        method="filter_noop",
+        help_text="Filter trips whose destination or departure is near this point, "
+        "given as lat,lon in decimal degrees, e.g. ?near=35.92,74.31 - nearest first.",
+    )
+    radius_km = filters.NumberFilter(
+        method="filter_noop",
+        min_value=0,
+        max_value=MAX_RADIUS_KM,
+        help_text="How far from `near` (in km) the destination or departure may be.",
+    )
+
+    def filter_noop(self, queryset, _name, _value):
+        """Actual filtering for these fields happens once, combined, in filter_queryset()."""
+        return queryset
+
+    def get_near_point(self):
+        """(lat, lon, radius_km), or None when `near` wasn't given."""
+        point = self.form.cleaned_data.get("near")
+        if point is None:
+            return None
+        radius_km = self.form.cleaned_data.get("radius_km")
+        if radius_km is None:
+            radius_km = get_near_default_radius_km()
+        return (*point, float(radius_km))
+
+    @staticmethod
+    def get_near_location_ids(lat, lon, radius_km):
+        """Ids of the locations within `radius_km` of (lat, lon)."""
+        return list(
+            Location.objects.filter(near_q(lat, lon, radius_km))
+            .alias(distance_km=distance_km_expression(lat, lon))
+            .filter(distance_km__lte=radius_km)
+            .values_list("pk", flat=True)
+        )
+
+    @staticmethod
+    def trip_distance_expression(lat, lon, prefix=""):
+        """
+        Distance in km from (lat, lon) to the nearer of the trip's (at
+        `prefix`) destination and departure.
+        """
+        return Least(
+            Coalesce(distance_km_expression(lat, lon, f"{prefix}destination__"), FAR_KM),
+            Coalesce(distance_km_expression(lat, lon, f"{prefix}departure__"), FAR_KM),
+        )
+
+    def filter_near(self, queryset, prefix=""):
+        """
+        `queryset` narrowed to the trips (at `prefix`) near the `near`
+        point, annotated with their `distance_km` and ordered by it -
+        ahead of whatever order it already had.
+        """
+        near_point = self.get_near_point()
+        if not near_point:
+            return queryset
+        location_ids = self.get_near_location_ids(*near_point)
+        lat, lon, _radius_km = near_point
+        model_meta = queryset.model._meta  # pylint:disable=protected-access
+        ordering = queryset.query.order_by or model_meta.ordering
+        return (
+            queryset.filter(
+                Q(**{f"{prefix}destination__in": location_ids})
+                | Q(**{f"{prefix}departure__in": location_ids})
+            )
+            .annotate(distance_km=self.trip_distance_expression(lat, lon, prefix))
+            .order_by("distance_km", *ordering)
+        )
+
+
 class TripBaseFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name="name", lookup_expr="icontains")
+    name = FuzzyNameFilter(
+        field_name="name",
+        help_text="Filter trips whose name contains this value (case-insensitive), "
+        "or failing that, whose name closely matches it, best matches first, "
+        "e.g. ?name=hunza+valey",
+    )
     destination = CharInFilter(
         field_name="destination__slug",
         lookup_expr="in",
@@ -48,7 +393,8 @@ class TripBaseFilter(filters.FilterSet):
         help_text="Filter trips by a list of destination slugs, e.g. "
         "?destination=hunza,skardu. A REGION-type slug (e.g. 'galiyat') also "
         "matches trips destined for any of that region's child locations "
-        "(e.g. 'nathia-gali').",
+        "(e.g. 'nathia-gali'). A value that isn't a location slug is matched to "
+        "the closest-named location(s), e.g. ?destination=nathiagali.",
     )
     duration_from = TimedeltaFromDaysFilter(field_name="duration", lookup_expr="gte")
     duration_to = TimedeltaFromDaysFilter(field_name="duration", lookup_expr="lte")
@@ -63,10 +409,10 @@ class TripBaseFilter(filters.FilterSet):
         return queryset.filter(destination__slug__in=expand_destination_slugs(value))
 
 
-class TripFilter(TripBaseFilter):
+class TripFilter(TripBaseFilter, PartySizeFilterSet, FlexibleDateFilterSet, NearFilterSet):
     """
     Filter trips by name, destination, duration, category, price range,
-    and/or date range.
+    date range, and/or party size.
 
     price_from/price_to match against a trip's packages directly - a
     package's base_price is date-independent, so no cross-schedule
@@ -76,7 +422,11 @@ class TripFilter(TripBaseFilter):
     condition separately (as django-filter would by default) can match a
     trip via two *different* schedules (e.g. a cheap-but-past one and an
     expensive-but-future one) even though no single schedule satisfies both.
-    filter_queryset() below implements both halves.
+    filter_queryset() below implements both halves. A party size
+    (`adults`/`children`) joins the same single-schedule condition: the
+    matching departure must also be upcoming with enough seats left, and
+    so does a `date`/`flex_days` window - whose matches are then ranked by
+    their nearest such departure (see `rank_by_nearest_departure`).
     """
 
     category = CharInFilter(
@@ -94,6 +444,33 @@ class TripFilter(TripBaseFilter):
         lookup_expr="in",
         help_text="Filter trips by a list of trust badge slugs, e.g. ?trust_badge=certified-guide",
     )
+    departure = CharInFilter(
+        method="filter_departure",
+        help_text="Filter trips leaving from a list of location slugs, e.g. "
+        "?departure=lahore,islamabad - the trip's departure city or a pickup "
+        "point on one of its upcoming published departures. A REGION-type slug "
+        "also matches its child locations.",
+    )
+    category_all = AllOfFilter(
+        relation="categories",
+        help_text="Filter trips in every one of a list of category slugs, e.g. "
+        "?category_all=hiking,family",
+    )
+    facility_all = AllOfFilter(
+        relation="facilities",
+        help_text="Filter trips offering every one of a list of facility slugs, e.g. "
+        "?facility_all=hot-water,bonfire",
+    )
+    trust_badge_all = AllOfFilter(
+        relation="trust_badges",
+        help_text="Filter trips holding every one of a list of trust badge slugs, e.g. "
+        "?trust_badge_all=certified-guide,free-cancellation",
+    )
+    location_all = AllOfFilter(
+        relation="locations",
+        help_text="Filter trips visiting every one of a list of location slugs, e.g. "
+        "?location_all=hunza,skardu",
+    )
     verified_host = filters.BooleanFilter(
         field_name="host__verified",
         help_text="Filter trips by whether their host is verified, e.g. ?verified_host=true",
@@ -123,9 +500,19 @@ class TripFilter(TripBaseFilter):
         model = Trip
         fields = []
 
-    def filter_noop(self, queryset, _name, _value):
-        """Actual filtering for these fields happens once, combined, in filter_queryset()."""
-        return queryset
+    def filter_departure(self, queryset, _name, value):
+        """
+        A single semi-join on the precomputed `TripOrigin` table. A pickup
+        only counts while it still has a departure to come (its
+        `latest_departure`); the trip's own departure city always does.
+        """
+        if not value:
+            return queryset
+        origins = TripOrigin.objects.filter(
+            Q(latest_departure__isnull=True) | Q(latest_departure__gte=timezone.now().date()),
+            location__slug__in=expand_destination_slugs(value),
+        )
+        return queryset.filter(pk__in=origins.values("trip_id"))
 
     def filter_queryset(self, queryset):
         price_constraints = Q()
@@ -162,25 +549,80 @@ class TripFilter(TripBaseFilter):
                 schedule_constraints &= Q(**{lookup: value})
                 has_schedule_constraint = True
 
+        party_size = self.get_party_size()
+        if party_size:
+            queryset = queryset.filter(passenger_limits_q(party_size))
+            schedule_constraints &= Q(
+                start_date__gte=timezone.now().date(), seats_left__gte=party_size
+            )
+            has_schedule_constraint = True
+
+        date_window = self.get_date_window()
+        if date_window:
+            schedule_constraints &= Q(start_date__range=date_window[1:])
+            has_schedule_constraint = True
+
         if has_schedule_constraint:
             matching_trip_ids = TripSchedule.objects.filter(
                 schedule_constraints
             ).values_list("trip_id", flat=True)
             queryset = queryset.filter(pk__in=matching_trip_ids)
 
-        return super().filter_queryset(queryset)
+        queryset = self.filter_near(queryset)
+        if date_window:
+            queryset = self.rank_by_nearest_departure(
+                queryset, date_window[0], schedule_constraints
+            )
 
+        return super().filter_queryset(queryset)
 
-class UpcomingTripsFilter(filters.FilterSet):
+    def rank_by_nearest_departure(self, queryset, target, schedule_constraints):
+        """
+        Orders trips by how close their nearest matching departure starts to
+        `target` (the `date_distance` annotation), and attaches that
+        departure as `_prefetched_nearest_departures`: a sliced prefetch,
+        which Django runs as one `ROW_NUMBER() OVER (PARTITION BY trip_id
+        ORDER BY distance)` query for the whole page. Any order the
+        queryset already had (e.g. `near`'s) breaks ties; `?ordering=` still
+        overrides it all.
+        """
+        distance = self.date_distance_expression(target)
+        departures = TripSchedule.objects.filter(schedule_constraints)
+        nearest_distance = (
+            departures.filter(trip=OuterRef("pk"))
+            .order_by()
+            .values("trip")
+            .annotate(distance=Min(distance))
+            .values("distance")
+        )
+        ordering = queryset.query.order_by or Trip._meta.ordering  # pylint:disable=protected-access
+        return (
+            queryset.annotate(date_distance=Subquery(nearest_distance))
+            .order_by("date_distance", *ordering)
+            .prefetch_related(
+                Prefetch(
+                    "schedules",
+                    queryset=departures.annotate(date_distance=distance).order_by(
+                        "date_distance", "start_date"
+                    )[:1],
+                    to_attr="_prefetched_nearest_departures",
+                )
+            )
+        )
+
+
+class UpcomingTripsFilter(PartySizeFilterSet, FlexibleDateFilterSet, NearFilterSet):
     """
-    Filter upcoming trips by name, price range, date range, destination slug,
-    and trip duration range (in days).
+    Filter upcoming trips by name, price range, date range (or a flexible
+    `date`/`flex_days` window, nearest departures first), destination slug,
+    distance from a point (`near`/`radius_km`), trip duration range (in
+    days), and party size.
     """
 
-    name = filters.CharFilter(
+    name = FuzzyNameFilter(
         field_name="trip__name",
-        lookup_expr="icontains",
-        help_text="Filter trips whose name contains this value (case-insensitive).",
+        help_text="Filter trips whose name contains this value (case-insensitive), "
+        "or failing that, whose name closely matches it, best matches first.",
     )
     price_from = filters.NumberFilter(
         field_name="price",
@@ -214,7 +656,8 @@ class UpcomingTripsFilter(filters.FilterSet):
         help_text="Filter trips by a list of destination slugs, e.g. "
         "?destination=hunza,skardu. A REGION-type slug (e.g. 'galiyat') also "
         "matches trips destined for any of that region's child locations "
-        "(e.g. 'nathia-gali').",
+        "(e.g. 'nathia-gali'). A value that isn't a location slug is matched to "
+        "the closest-named location(s), e.g. ?destination=nathiagali.",
     )
     duration_from = TimedeltaFromDaysFilter(
         field_name="trip__duration",
@@ -238,6 +681,12 @@ class UpcomingTripsFilter(filters.FilterSet):
             "destination",
             "duration_from",
             "duration_to",
+            "adults",
+            "children",
+            "date",
+            "flex_days",
+            "near",
+            "radius_km",
         ]
 
     def filter_destination(self, queryset, _name, value):
@@ -245,6 +694,23 @@ class UpcomingTripsFilter(filters.FilterSet):
             return queryset
         return queryset.filter(trip__destination__slug__in=expand_destination_slugs(value))
 
+    def filter_queryset(self, queryset):
+        party_size = self.get_party_size()
+        if party_size:
+            queryset = queryset.filter(
+                passenger_limits_q(party_size, prefix="trip__"), seats_left__gte=party_size
+            )
+        queryset = self.filter_near(queryset, prefix="trip__")
+        date_window = self.get_date_window()
+        if date_window:
+            target, first, last = date_window
+            queryset = (
+                queryset.filter(status=ScheduleStatus.PUBLISHED, start_date__range=(first, last))
+                .annotate(date_distance=self.date_distance_expression(target))
+                .order_by("date_distance", *(queryset.query.order_by or ("start_date",)))
+            )
+        return super().filter_queryset(queryset)
+
 
 class TripBookingFilterSet(filters.FilterSet):
     target_date_after = filters.DateTimeFilter(
@@ -268,3 +734,19 @@ class TripBookingFilterSet(filters.FilterSet):
             "adults",
             "children",
         ]
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    DRF's `OrderingFilter`, with `-id` appended to a client's `?ordering=`
+    so rows it ties (e.g. every trip still at `popularity` 0) come back in
+    the same order on every page rather than whatever the query plan picks.
+    """
+
+    tiebreakers = {"id", "-id", "pk", "-pk"}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not self.tiebreakers & set(ordering):
+            ordering = [*ordering, "-id"]
+        return ordering
@@ -0,0 +1,147 @@
+"""
+Price distributions behind the budget slider.
+
+`/trips/price-histogram/` and `/trips/upcoming/price-histogram/` take the
+same filters as the lists they sit under and return the min/max and a
+bucketed distribution of the matching prices - `Trip.min_price` and
+`TripSchedule.resolved_price`, stored columns, so no package aggregation
+is involved:
+
+    {
+        "count": 42, "min": 9500, "max": 31000, "bucket_width": 5000,
+        "buckets": [{"from": 5000, "to": 10000, "count": 3}, ...]
+    }
+
+Prices are counted in one grouped query, per `DJANGO_TRIPS_PRICE_HISTOGRAM_RESOLUTION`
+step, and merged into buckets here. The bucket width adapts to the data:
+about log2(count) + 1 buckets (Sturges' rule), capped by `?buckets=`, each a
+round 1/2/5 x 10^k multiple of the resolution. Responses are cached per
+normalized filter set under the catalog version (cache.py).
+"""
+
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Min
+from django.db.models.functions import Floor
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
+
+from django_trips.api.paginators import NON_FILTER_QUERY_PARAMS, normalize_filter_params
+from django_trips.cache import catalog_cache_key
+
+
+def get_price_histogram_resolution():
+    return getattr(settings, "DJANGO_TRIPS_PRICE_HISTOGRAM_RESOLUTION", 100)
+
+
+def get_price_histogram_cache_timeout():
+    return getattr(settings, "DJANGO_TRIPS_PRICE_HISTOGRAM_CACHE_TIMEOUT", 60)
+
+
+def nice_width(raw_width, resolution):
+    """
+    The smallest 1/2/5 x 10^k multiple of `resolution` that is at least
+    `raw_width`, e.g. 2,300 at a resolution of 100 -> 5,000.
+    """
+    units = max(raw_width / resolution, 1)
+    magnitude = 10 ** math.floor(math.log10(units))
+    step = next(step for step in (1, 2, 5, 10) if step * magnitude >= units)
+    return step * magnitude * resolution
+
+
+def as_number(value):
+    """A price as a JSON number - an int when it's a whole one."""
+    value = Decimal(value)
+    return int(value) if value == value.to_integral_value() else float(value)
+
+
+def price_histogram(queryset, price_field, max_buckets, resolution):
+    """The histogram (see the module docstring) of `price_field` over `queryset`."""
+    # Re-selected by pk so a filter's joins can't count a row twice.
+    rows = list(
+        queryset.model.objects.filter(pk__in=queryset.order_by().values("pk"))
+        .filter(**{f"{price_field}__isnull": False})
+        .annotate(price_step=Floor(F(price_field) / resolution))
+        .values("price_step")
+        .annotate(count=Count("pk"), low=Min(price_field), high=Max(price_field))
+        .order_by("price_step")
+    )
+    if not rows:
+        return {"count": 0, "min": None, "max": None, "bucket_width": None, "buckets": []}
+
+    total = sum(row["count"] for row in rows)
+    low, high = Decimal(rows[0]["low"]), Decimal(rows[-1]["high"])
+    target_buckets = min(max_buckets, math.ceil(math.log2(total)) + 1)
+    width = nice_width((high - low) / target_buckets, resolution)
+    while True:
+        # Starting on a multiple of the width can take one bucket more.
+        start = math.floor(low / width) * width
+        bucket_count = math.floor((high - start) / width) + 1
+        if bucket_count <= max_buckets:
+            break
+        width = nice_width(width + resolution, resolution)
+    counts = [0] * bucket_count
+    for row in rows:
+        counts[math.floor((Decimal(row["low"]) - start) / width)] += row["count"]
+    return {
+        "count": total,
+        "min": as_number(low),
+        "max": as_number(high),
+        "bucket_width": as_number(width),
+        "buckets": [
+            {
+                "from": as_number(start + index * width),
+                "to": as_number(start + (index + 1) * width),
+                "count": count,
+            }
+            for index, count in enumerate(counts)
+        ],
+    }
+
+
+class PriceHistogramViewMixin:
+    """
+    For views filtering a list of priced rows: `price_histogram_response()`
+    answers with the histogram of `price_histogram_field` over
+    `get_queryset()`, filtered by the view's filter backends.
+    """
+
+    price_histogram_field = None
+    default_buckets = 20
+    max_buckets = 50
+    non_filter_query_params = NON_FILTER_QUERY_PARAMS
+
+    def get_max_buckets(self):
+        try:
+            buckets = int(self.request.query_params.get("buckets", self.default_buckets))
+        except ValueError:
+            return self.default_buckets
+        return min(max(buckets, 1), self.max_buckets)
+
+    def filter_price_histogram_queryset(self, queryset):
+        """`filter_queryset()` minus ordering - a histogram has no order, and
+        list-only annotations (e.g. `/trips/`'s `price`) aren't there to order by."""
+        for backend in self.filter_backends:
+            if not issubclass(backend, OrderingFilter):
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def price_histogram_response(self, request):
+        cache_key = catalog_cache_key(
+            "price-histogram",
+            request.path,
+            normalize_filter_params(request.query_params, self.non_filter_query_params),
+        )
+        histogram = cache.get(cache_key)
+        if histogram is None:
+            histogram = price_histogram(
+                self.filter_price_histogram_queryset(self.get_queryset()),
+                self.price_histogram_field,
+                self.get_max_buckets(),
+                get_price_histogram_resolution(),
+            )
+            cache.set(cache_key, histogram, get_price_histogram_cache_timeout())
+        return Response(histogram)
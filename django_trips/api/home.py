@@ -0,0 +1,235 @@
+"""
+The landing page in one request.
+
+`/home/` returns the sections a landing page shows - featured trips, top
+destinations, categories, hosts, trust badges, testimonials and upcoming
+departures - each the first `DJANGO_TRIPS_HOME_SECTION_LIMIT` rows of the
+endpoint that lists it on its own, rendered by that endpoint's view: its
+queryset, its serializer and its serializer context.
+
+    {
+        "featured_trips": [...], "top_destinations": [...], "categories": [...],
+        "hosts": [...], "trust_badges": [...], "testimonials": [...],
+        "upcoming_departures": [...], "unavailable": []
+    }
+
+Each section is cached on its own under the catalog version (cache.py) -
+per user for those rendering trip cards, which carry the user's
+`is_wished`. The sections missing from the cache don't depend on each
+other, so they're built concurrently on one thread pool per process
+(`DJANGO_TRIPS_HOME_MAX_WORKERS` threads, each with its own database
+connection) - a section already being built for another request isn't
+built again, its build is waited on instead. The response waits at most
+`DJANGO_TRIPS_HOME_SECTION_TIMEOUT` seconds for them: a section that isn't
+ready by then, or fails, comes back empty and named under `unavailable`
+rather than holding up or failing the whole page. A late section still
+finishes in the background and caches its rows for the next request.
+"""
+
+import copy
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import QueryDict
+
+from django_trips.api.views.category import ActiveCategoriesListAPIView
+from django_trips.api.views.host import ActiveHostsListAPIView
+from django_trips.api.views.testimonial import ActiveTestimonialsListAPIView
+from django_trips.api.views.trip import (ActiveDestinationsWithSchedulesView,
+                                         TripViewSet, UpcomingTripsListAPIView)
+from django_trips.api.views.trust_badge import ActiveTrustBadgesListAPIView
+from django_trips.cache import catalog_cache_key
+from django_trips.choices import FeaturedType
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_pool = {}
+#: {cache key: the `Future` building it}, while it's being built.
+_building = {}
+
+
+def get_home_cache_timeout():
+    return getattr(settings, "DJANGO_TRIPS_HOME_CACHE_TIMEOUT", 60)
+
+
+def get_home_section_timeout():
+    """Seconds the response waits for the sections missing from the cache."""
+    return getattr(settings, "DJANGO_TRIPS_HOME_SECTION_TIMEOUT", 2)
+
+
+def get_home_section_limit():
+    return getattr(settings, "DJANGO_TRIPS_HOME_SECTION_LIMIT", 8)
+
+
+def get_home_max_workers():
+    """Threads building sections; 0 builds them one after another in the request's thread."""
+    return getattr(settings, "DJANGO_TRIPS_HOME_MAX_WORKERS", 4)
+
+
+def section_request(request):
+    """
+    A copy of `request` without its query string, so a section renders as
+    its own endpoint does unparameterized - the cache is keyed that way too.
+    """
+    # pylint:disable=protected-access
+    clean_request = copy.copy(request)
+    clean_request._request = copy.copy(request._request)
+    clean_request._request.GET = QueryDict()
+    return clean_request
+
+
+class HomeSection:
+    """One landing-page section: the first rows of `view_class`'s list."""
+
+    def __init__(self, name, view_class, refine=None, per_user=False, **initkwargs):
+        self.name = name
+        self.view_class = view_class
+        self.refine = refine
+        self.per_user = per_user
+        self.initkwargs = initkwargs
+
+    def get_cache_key(self, request, limit):
+        user_id = request.user.pk if self.per_user else None
+        return catalog_cache_key("home", self.name, limit, user_id)
+
+    def build(self, request, limit):
+        """The section's rows, through the view as its own endpoint would list them."""
+        request = section_request(request)
+        view = self.view_class(**self.initkwargs)
+        view.request, view.args, view.kwargs = request, (), {}
+        view.initial(request)
+        queryset = view.get_queryset()
+        if self.refine is not None:
+            queryset = self.refine(queryset)
+        return list(view.get_serializer(queryset[:limit], many=True).data)
+
+
+def featured_trips(queryset):
+    return queryset.filter(featured__in=FeaturedType.values)
+
+
+def soonest_first(queryset):
+    return queryset.order_by("start_date", "pk")
+
+
+HOME_SECTIONS = [
+    HomeSection(
+        "featured_trips", TripViewSet, refine=featured_trips, per_user=True, action="list"
+    ),
+    HomeSection("top_destinations", ActiveDestinationsWithSchedulesView, per_user=True),
+    HomeSection("categories", ActiveCategoriesListAPIView),
+    HomeSection("hosts", ActiveHostsListAPIView),
+    HomeSection("trust_badges", ActiveTrustBadgesListAPIView),
+    HomeSection("testimonials", ActiveTestimonialsListAPIView),
+    HomeSection(
+        "upcoming_departures", UpcomingTripsListAPIView, refine=soonest_first, per_user=True
+    ),
+]
+
+
+def build_section(section, request, limit, cache_key):
+    """`section.build()`, cached under `cache_key`."""
+    data = section.build(request, limit)
+    cache.set(cache_key, data, get_home_cache_timeout())
+    return data
+
+
+def build_section_in_thread(section, request, limit, cache_key):
+    try:
+        return build_section(section, request, limit, cache_key)
+    finally:
+        # Worker threads open their own connections; Django only closes
+        # the request thread's.
+        connections.close_all()
+
+
+def get_executor():
+    """
+    The process's section-building thread pool, made on first use - and
+    again, should `DJANGO_TRIPS_HOME_MAX_WORKERS` change.
+    """
+    max_workers = get_home_max_workers()
+    with _lock:
+        if _pool.get("max_workers") != max_workers:
+            if "executor" in _pool:
+                _pool["executor"].shutdown(wait=False)
+            _pool.update(
+                max_workers=max_workers,
+                executor=ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="django-trips-home"
+                ),
+            )
+        return _pool["executor"]
+
+
+def submit_section(executor, section, request, limit, cache_key):
+    """The `Future` building `section` under `cache_key` - the running one, if there is one."""
+    with _lock:
+        future = _building.get(cache_key)
+        if future is None:
+            future = _building[cache_key] = executor.submit(
+                build_section_in_thread, section, request, limit, cache_key
+            )
+            future.add_done_callback(lambda done: built(cache_key, done))
+        return future
+
+
+def built(cache_key, future):
+    with _lock:
+        if _building.get(cache_key) is future:
+            del _building[cache_key]
+
+
+def build_sections(sections, request, limit, cache_keys):
+    """
+    {section name: rows} for `sections`, built concurrently - leaving out
+    those not built within the timeout or that failed (see the module docstring).
+    """
+    max_workers = get_home_max_workers()
+    if max_workers < 1:
+        data = {}
+        for section in sections:
+            try:
+                data[section.name] = build_section(
+                    section, request, limit, cache_keys[section.name]
+                )
+            except Exception:  # pylint:disable=broad-except
+                logger.exception("Home section %r failed", section.name)
+        return data
+
+    executor = get_executor()
+    futures = {
+        section.name: submit_section(executor, section, request, limit, cache_keys[section.name])
+        for section in sections
+    }
+    # Don't wait for the late sections - they finish (and cache) in the background.
+    done, _not_done = wait(futures.values(), timeout=get_home_section_timeout())
+    data = {}
+    for name, future in futures.items():
+        if future not in done:
+            logger.warning("Home section %r timed out", name)
+        elif future.exception() is not None:
+            logger.error("Home section %r failed", name, exc_info=future.exception())
+        else:
+            data[name] = future.result()
+    return data
+
+
+def get_home(request, sections=None):
+    """Every section's rows (see the module docstring), plus the `unavailable` ones' names."""
+    sections = HOME_SECTIONS if sections is None else sections
+    limit = get_home_section_limit()
+    cache_keys = {section.name: section.get_cache_key(request, limit) for section in sections}
+    cached = cache.get_many(cache_keys.values())
+    data = {name: cached[key] for name, key in cache_keys.items() if key in cached}
+    missing = [section for section in sections if section.name not in data]
+    if missing:
+        data.update(build_sections(missing, request, limit, cache_keys))
+    home = {section.name: data.get(section.name, []) for section in sections}
+    home["unavailable"] = [section.name for section in sections if section.name not in data]
+    return home
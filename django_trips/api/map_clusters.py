@@ -0,0 +1,119 @@
+"""
+Server-side marker clustering for the trips map.
+
+`/trips/map/?zoom=6&bbox=min_lon,min_lat,max_lon,max_lat` groups the listable
+trips by the grid cell their destination falls in at that zoom and returns
+one cluster per cell - how many trips, their centroid and the cheapest
+starting price among them - so the map never has to fetch every trip:
+
+    {
+        "zoom": 6, "cell_size": 1.40625,
+        "clusters": [{"lat": 36.31, "lon": 74.66, "count": 12, "min_price": 9500}, ...]
+    }
+
+Cells are `90 / 2**zoom` degrees square - roughly 64px on a 256px-tile web
+map - aligned to (-90, -180). Each zoom tier's clusters come from one query
+grouped by cell and are cached whole, under the catalog version (cache.py),
+so a write to a trip, its packages or a location invalidates them; `bbox`
+then only picks the cached clusters whose centroid is in view.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Min
+from django.db.models.functions import Floor
+from rest_framework.exceptions import ValidationError
+
+from django_trips.cache import catalog_cache_key
+from django_trips.models import Trip
+
+MAX_ZOOM = 20
+
+
+def get_map_cache_timeout():
+    return getattr(settings, "DJANGO_TRIPS_MAP_CACHE_TIMEOUT", 300)
+
+
+def cell_size(zoom):
+    """Width and height, in degrees, of a cluster cell at `zoom`."""
+    return 90 / 2**zoom
+
+
+def parse_zoom(value):
+    """`?zoom=` as an int in 0-`MAX_ZOOM` - 0 (the whole world) when empty."""
+    if not value:
+        return 0
+    try:
+        zoom = int(value)
+    except ValueError as error:
+        raise ValidationError({"zoom": "Enter a whole number."}) from error
+    return min(max(zoom, 0), MAX_ZOOM)
+
+
+def parse_bbox(value):
+    """
+    `?bbox=min_lon,min_lat,max_lon,max_lat` as a tuple of floats - None when
+    empty. `min_lon` may exceed `max_lon`, for a box across the antimeridian.
+    """
+    if not value:
+        return None
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(","))
+    except ValueError as error:
+        raise ValidationError(
+            {"bbox": "Enter min_lon,min_lat,max_lon,max_lat in decimal degrees."}
+        ) from error
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+        raise ValidationError({"bbox": "Enter a box within -180..180, -90..90."})
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def in_bbox(cluster, bbox):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    if not min_lat <= cluster["lat"] <= max_lat:
+        return False
+    if min_lon <= max_lon:
+        return min_lon <= cluster["lon"] <= max_lon
+    return cluster["lon"] >= min_lon or cluster["lon"] <= max_lon
+
+
+def map_clusters(zoom):
+    """Every cluster (see the module docstring) at `zoom`."""
+    size = cell_size(zoom)
+    rows = (
+        Trip.objects.active()
+        .filter(destination__lat__isnull=False, destination__lon__isnull=False)
+        .annotate(
+            cell_row=Floor((F("destination__lat") + 90) / size),
+            cell_column=Floor((F("destination__lon") + 180) / size),
+        )
+        .values("cell_row", "cell_column")
+        .annotate(
+            count=Count("pk"),
+            lat=Avg("destination__lat"),
+            lon=Avg("destination__lon"),
+            min_price=Min("min_price"),
+        )
+        .order_by("cell_row", "cell_column")
+    )
+    return [
+        {
+            "lat": round(row["lat"], 6),
+            "lon": round(row["lon"], 6),
+            "count": row["count"],
+            "min_price": row["min_price"],
+        }
+        for row in rows
+    ]
+
+
+def get_map_clusters(zoom, bbox=None):
+    """`map_clusters()`, cached per zoom tier, narrowed to those in `bbox`."""
+    cache_key = catalog_cache_key("map-clusters", zoom)
+    clusters = cache.get(cache_key)
+    if clusters is None:
+        clusters = map_clusters(zoom)
+        cache.set(cache_key, clusters, get_map_cache_timeout())
+    if bbox is not None:
+        clusters = [cluster for cluster in clusters if in_bbox(cluster, bbox)]
+    return {"zoom": zoom, "cell_size": cell_size(zoom), "clusters": clusters}
@@ -0,0 +1,116 @@
+"""
+Request-scoped memo of nested serializer output.
+
+A `TripScheduleSerializer` row embeds its whole trip as a
+`TripListSerializer` card, so a response listing several departures of the
+same trip - `/trips/upcoming/`, `/destinations/`' nested schedules, a
+trip's bookings' `schedule_details` - renders that same card once per row.
+With `SerializationMemoViewMixin` on the view, a serializer declared with
+`MemoizedSerializerMixin` renders each instance once per response and hands
+every later row the same dict.
+
+Memo keys are `(serializer class, instance pk, flags)`, where the flags are
+whatever else shapes the output (the sparse fieldset selection - see
+`MemoizedSerializerMixin.get_memo_flags`). Serializers only memoize when
+nested as a single field (a list's own items are distinct anyway), and only
+where the view put a memo in the context, so rendering anywhere else is
+unchanged.
+
+The rows share that one dict (not copies of it), so a response's data must
+be treated as read-only once rendered: code post-processing a memoized
+response - a view, renderer or middleware - must copy a nested object
+before changing it, or the change shows up in every row sharing it.
+
+Each request's hit/miss counts are logged at DEBUG level to the
+`django_trips.api.memo` logger.
+"""
+
+import logging
+from typing import Callable, Optional
+
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+#: Serializer context key the view's memo is passed down under.
+MEMO_CONTEXT_KEY = "serialization_memo"
+
+
+class SerializationMemo:
+    """Rendered representations by key, with hit/miss counters."""
+
+    def __init__(self):
+        self.representations = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build: Callable[[], object]):
+        """The representation under `key`, built once - shared, not copied, so don't mutate it."""
+        try:
+            representation = self.representations[key]
+        except KeyError:
+            self.misses += 1
+            representation = self.representations[key] = build()
+        else:
+            self.hits += 1
+        return representation
+
+
+def get_serialization_memo(context: dict) -> Optional[SerializationMemo]:
+    return context.get(MEMO_CONTEXT_KEY)
+
+
+class MemoizedSerializerMixin:
+    """
+    Renders each instance once per response when nested as a single field
+    under a `SerializationMemoViewMixin` view - see the module docstring.
+    """
+
+    def get_memo_flags(self):
+        """Everything besides the instance that shapes this serializer's output."""
+        return repr(
+            (getattr(self, "_sparse_fields", None), getattr(self, "_sparse_omit", None))
+        )
+
+    def memoize(self, build: Callable[[object], dict]) -> Callable[[object], dict]:
+        """`build` (an `instance -> dict` function), going through the memo when there is one."""
+        memo = get_serialization_memo(self.context)
+        nested_as_field = self.parent is not None and not isinstance(
+            self.parent, serializers.ListSerializer
+        )
+        if memo is None or not nested_as_field:
+            return build
+        key_prefix = (type(self), self.get_memo_flags())
+        return lambda instance: memo.get_or_build(
+            (*key_prefix, instance.pk), lambda: build(instance)
+        )
+
+    def to_representation(self, instance):
+        return self.memoize(super().to_representation)(instance)
+
+
+class SerializationMemoViewMixin:
+    """Gives each request a `SerializationMemo`, passed to serializers via the context."""
+
+    def initial(self, request, *args, **kwargs):
+        self.serialization_memo = SerializationMemo()
+        super().initial(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        memo = getattr(self, "serialization_memo", None)
+        if memo is not None:
+            context[MEMO_CONTEXT_KEY] = memo
+        return context
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        memo = getattr(self, "serialization_memo", None)
+        if memo is not None and (memo.hits or memo.misses):
+            logger.debug(
+                "%s %s: serialization memo %d hits, %d misses",
+                request.method,
+                request.path,
+                memo.hits,
+                memo.misses,
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
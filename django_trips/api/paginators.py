@@ -1,12 +1,131 @@
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.pagination import (LimitOffsetPagination,
                                        PageNumberPagination)
 from rest_framework.response import Response
 
+from django_trips.cache import catalog_cache_key
+
+#: Query params that don't change which rows match - sparse fieldsets,
+#: the response format, ordering and paging - so cache keys leave them out.
+NON_FILTER_QUERY_PARAMS = ("ordering", "limit", "offset", "fields", "omit", "format")
+
+
+def normalize_filter_params(query_params, ignored=()):
+    """
+    `query_params` minus the `ignored` ones, as a sorted, whitespace-trimmed
+    list - the same filter set however its params are ordered or spaced.
+    """
+    return sorted(
+        (key, sorted(value.strip() for value in values if value.strip()))
+        for key, values in query_params.lists()
+        if key not in ignored
+    )
+
 
 class CustomLimitOffsetPaginator(LimitOffsetPagination):
     max_limit = 100
 
 
+class CachedCountLimitOffsetPaginator(CustomLimitOffsetPaginator):
+    """
+    `CustomLimitOffsetPaginator` that doesn't re-run `COUNT(*)` on every page.
+
+    Catalog list querysets are `DISTINCT`/`GROUP BY` queries, so their count
+    costs about as much as the page query itself - while clients only ever
+    show it as a rough "1,234 trips". The total is cached per normalized
+    filter set (request path plus query params, minus the ones that can't
+    change it: `NON_FILTER_QUERY_PARAMS`) under the current catalog version
+    (cache.py), so any catalog write invalidates it.
+
+    The exact count is bounded to `DJANGO_TRIPS_EXACT_COUNT_LIMIT` rows -
+    the cost of a COUNT grows with the rows it has to scan, so the row cap
+    is what keeps it inside its time budget. Past that cap the count is
+    reported as an estimate (a lower bound) and the response carries
+    `count_is_estimate: true`.
+    """
+
+    non_filter_query_params = NON_FILTER_QUERY_PARAMS
+
+    def __init__(self):
+        super().__init__()
+        self.request = None
+        self.limit = None
+        self.offset = None
+        self.count = None
+        self.count_is_estimate = False
+
+    @property
+    def count_cache_timeout(self):
+        return getattr(settings, "DJANGO_TRIPS_COUNT_CACHE_TIMEOUT", 60)
+
+    @property
+    def exact_count_limit(self):
+        return getattr(settings, "DJANGO_TRIPS_EXACT_COUNT_LIMIT", 10000)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count, self.count_is_estimate = self.get_cached_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if not self.count_is_estimate and (self.count == 0 or self.offset > self.count):
+            return []
+        page = list(queryset[self.offset : self.offset + self.limit])
+        if self.count_is_estimate:
+            # A lower bound - never report fewer rows than this page has
+            # actually seen, and keep `next` alive while pages come back full.
+            self.count = max(
+                self.count, self.offset + len(page) + int(len(page) == self.limit)
+            )
+        return page
+
+    def get_count_cache_key(self, request):
+        ignored = {self.limit_query_param, self.offset_query_param, *self.non_filter_query_params}
+        return catalog_cache_key(
+            "count", request.path, normalize_filter_params(request.query_params, ignored)
+        )
+
+    def get_cached_count(self, queryset):
+        """Returns `(count, is_estimate)`, from cache when available."""
+        cache_key = self.get_count_cache_key(self.request)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return tuple(cached)
+
+        # One row past the cap tells a total of exactly the cap from a larger one.
+        count = self.get_count(queryset.order_by()[: self.exact_count_limit + 1])
+        result = (min(count, self.exact_count_limit), count > self.exact_count_limit)
+        cache.set(cache_key, result, self.count_cache_timeout)
+        return result
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "count_is_estimate": self.count_is_estimate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_estimate"] = {
+            "type": "boolean",
+            "example": False,
+            "description": "True when `count` is a lower-bound estimate "
+            "rather than an exact total.",
+        }
+        return response_schema
+
+
 class TripResponsePagination(PageNumberPagination):
     """
     API Custom paginator for trips listing.
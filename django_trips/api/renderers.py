@@ -0,0 +1,102 @@
+"""
+Renderers shipped with the API, picked by DRF's usual content negotiation
+(`Accept` header, or `?format=`). Enable them project-wide with:
+
+    REST_FRAMEWORK = {
+        "DEFAULT_RENDERER_CLASSES": [
+            "django_trips.api.renderers.OrjsonRenderer",
+            "django_trips.api.renderers.MessagePackRenderer",
+            "rest_framework.renderers.BrowsableAPIRenderer",
+        ],
+    }
+
+`orjson`/`msgpack` are optional (`pip install django-trips[renderers]`).
+Without orjson, `OrjsonRenderer` renders through DRF's stdlib encoder
+instead; without msgpack, `MessagePackRenderer` refuses to render.
+
+Every value JSON/MessagePack can't represent natively (Decimal, dates,
+timedelta, lazy strings, ...) is encoded by DRF's own `JSONEncoder`, so all
+of these produce the same data `JSONRenderer` does - see `encode_value`.
+Compare their speed/payload size with `manage.py benchmark_renderers`.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+_drf_encoder = JSONEncoder()
+
+
+def encode_value(obj):
+    """
+    `default=` hook for orjson/msgpack: encodes a value neither supports
+    natively exactly as DRF's `JSONEncoder` would - Decimal as a float,
+    timedelta as total seconds, datetimes as ISO 8601 with a `Z` suffix and
+    millisecond precision, etc.
+    """
+    return _drf_encoder.default(obj)
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    `JSONRenderer` with the same output, encoded by orjson instead of the
+    stdlib `json` module - several times faster on large list pages.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        # Datetimes are passed through to `encode_value` since orjson's own
+        # format (microseconds, "+00:00") differs from DRF's.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=encode_value, option=option)
+        # Same escaping JSONRenderer applies: U+2028/U+2029 are valid in JSON
+        # strings but not in JavaScript ones.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Binary MessagePack rendering of the same data, for `Accept: application/msgpack`."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if msgpack is None:
+            raise ImproperlyConfigured(
+                "MessagePackRenderer requires the `msgpack` package "
+                "(pip install django-trips[renderers])."
+            )
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_value, use_bin_type=True, datetime=False)
+
+
+class CompactJSONRenderer(OrjsonRenderer):
+    """
+    Plain JSON, picked only by an explicit `?format=compact`.
+
+    DRF already treats `?format=` as a renderer override, so registering this
+    under the `compact` format is what lets that param through content
+    negotiation (rather than 404ing as an unknown format). The compact
+    *shape* itself is built by the view - see api/compact.py.
+    """
+
+    format = "compact"
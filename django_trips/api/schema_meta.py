@@ -11,15 +11,20 @@ from rest_framework import serializers
 
 from django_trips.api.serializers import (
     CategoryListSerializer,
+    DestinationCalendarSerializer,
     DestinationWithSchedulesSerializer,
     HostListSerializer,
+    SearchSuggestionSerializer,
     TestimonialSerializer,
+    TripCalendarSerializer,
     TripBookingSerializer,
     TripDetailSerializer,
     TripListSerializer,
+    TripMapSerializer,
     TripReviewSerializer,
     TripWishlistToggleSerializer,
     TrustBadgeListSerializer,
+    UpcomingTripListSerializer,
 )
 
 
@@ -31,8 +36,37 @@ class SchemaTags(Enum):
     HOSTS = ["Hosts"]
     TRUST_BADGES = ["Trust Badges"]
     TESTIMONIALS = ["Testimonials"]
+    SEARCH = ["Search"]
+    HOME = ["Home"]
 
 
+sparse_fieldset_parameters = [
+    OpenApiParameter(
+        name="fields",
+        description="Comma-separated fields to include, dotted for nested ones, "
+        "e.g. `name,slug,trip.name`. Everything else is left out.",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="omit",
+        description="Comma-separated fields to leave out, dotted for nested "
+        "ones, e.g. `host,schedules`.",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+]
+
+compact_format_parameter = OpenApiParameter(
+    name="format",
+    description="`compact` returns each row's trip as an id, with every "
+    "referenced trip, location, host and taxonomy item rendered once in an "
+    "`included` object keyed by id.",
+    required=False,
+    type=OpenApiTypes.STR,
+    enum=["json", "compact"],
+)
+
 error_response_serializer = inline_serializer(
     name="ErrorResponse",
     fields={
@@ -51,7 +85,8 @@ trip_retrieve_schema = extend_schema(
             OpenApiTypes.STR,
             OpenApiParameter.PATH,
             description="Unique trip ID or slug to identify the trip.",
-        )
+        ),
+        *sparse_fieldset_parameters,
     ],
     tags=SchemaTags.TRIPS.value,
 )
@@ -99,10 +134,12 @@ trip_list_schema = extend_schema(
         ),
         OpenApiParameter(
             name="ordering",
-            description="Ordering of results. Example: `name`, `-duration`, `price`, `-price`",
+            description="Ordering of results. Example: `name`, `-duration`, `price`, `-price`, "
+            "`-popularity`",
             required=False,
             type=OpenApiTypes.STR,
         ),
+        *sparse_fieldset_parameters,
     ],
 )
 
@@ -136,20 +173,228 @@ upcoming_trips_list_schema = extend_schema(
     parameters=[
         OpenApiParameter(
             name="ordering",
-            description="Ordering of results. Example: `start_date`, `-price`, `trip__duration`",
+            description="Ordering of results. Example: `start_date`, `-price`, `trip__duration`, "
+            "`-trip__popularity`",
             required=False,
             type=OpenApiTypes.STR,
         ),
+        *sparse_fieldset_parameters,
+        compact_format_parameter,
+    ],
+)
+price_histogram_response_serializer = inline_serializer(
+    name="PriceHistogram",
+    fields={
+        "count": serializers.IntegerField(help_text="Number of priced matches"),
+        "min": serializers.DecimalField(max_digits=8, decimal_places=0, allow_null=True),
+        "max": serializers.DecimalField(max_digits=8, decimal_places=0, allow_null=True),
+        "bucket_width": serializers.DecimalField(
+            max_digits=8, decimal_places=0, allow_null=True
+        ),
+        "buckets": inline_serializer(
+            name="PriceHistogramBucket",
+            many=True,
+            fields={
+                "from": serializers.DecimalField(max_digits=8, decimal_places=0),
+                "to": serializers.DecimalField(
+                    max_digits=8, decimal_places=0, help_text="Exclusive"
+                ),
+                "count": serializers.IntegerField(),
+            },
+        ),
+    },
+)
+
+price_histogram_buckets_parameter = OpenApiParameter(
+    name="buckets",
+    description="Maximum number of buckets (default 20, at most 50). Fewer are "
+    "returned when there are few matches.",
+    required=False,
+    type=OpenApiTypes.INT,
+)
+
+trip_price_histogram_schema = extend_schema(
+    summary="Trip Price Histogram",
+    description="Min/max and bucketed distribution of the starting price "
+    "(cheapest package) of the trips matching the same filters as the trip "
+    "list - for a budget slider. Bucket widths adapt to the matches.",
+    parameters=[price_histogram_buckets_parameter],
+    responses={200: price_histogram_response_serializer},
+    tags=SchemaTags.TRIPS.value,
+)
+
+trip_calendar_schema = extend_schema(
+    summary="Trip Departure Calendar",
+    description="A trip's published departures to come in a month, by day: how "
+    "many depart, the seats left across them, and each package tier's price "
+    "(base price plus the day's surcharge).",
+    parameters=[
+        OpenApiParameter(
+            "identifier",
+            OpenApiTypes.STR,
+            OpenApiParameter.PATH,
+            description="Unique trip ID or slug to identify the trip.",
+        ),
+        OpenApiParameter(
+            name="month",
+            description="Month to show, as YYYY-MM (default: the current month).",
+            required=False,
+            type=str,
+        ),
+    ],
+    responses={200: TripCalendarSerializer},
+    tags=SchemaTags.TRIPS.value,
+)
+
+trip_similar_schema = extend_schema(
+    summary="Similar Trips",
+    description="Listed trips most like this one - by categories, facilities, tags, "
+    "destination, duration and price - most similar first. Read from a precomputed "
+    "table, rebuilt offline (`manage.py refresh_trip_similarities`).",
+    parameters=[
+        OpenApiParameter(
+            "identifier",
+            OpenApiTypes.STR,
+            OpenApiParameter.PATH,
+            description="Unique trip ID or slug to identify the trip.",
+        ),
+        *sparse_fieldset_parameters,
     ],
+    responses={200: TripListSerializer(many=True)},
+    tags=SchemaTags.TRIPS.value,
 )
+
+trip_also_liked_schema = extend_schema(
+    summary="Travellers Also Liked",
+    description="Listed trips that travellers who wishlisted or booked this one also "
+    "wishlisted or booked, most in common first. Read from a precomputed table, rebuilt "
+    "offline (`manage.py refresh_trip_similarities`).",
+    parameters=[
+        OpenApiParameter(
+            "identifier",
+            OpenApiTypes.STR,
+            OpenApiParameter.PATH,
+            description="Unique trip ID or slug to identify the trip.",
+        ),
+        *sparse_fieldset_parameters,
+    ],
+    responses={200: TripListSerializer(many=True)},
+    tags=SchemaTags.TRIPS.value,
+)
+
+trip_map_schema = extend_schema(
+    summary="Trips Map Clusters",
+    description="The listable trips clustered by where their destinations are, one "
+    "cluster per grid cell at the given zoom: how many trips, their centroid and the "
+    "cheapest starting price among them.",
+    parameters=[
+        OpenApiParameter(
+            name="zoom",
+            description="Web map zoom level, 0-20 (default: 0); each step halves the cell size.",
+            required=False,
+            type=int,
+        ),
+        OpenApiParameter(
+            name="bbox",
+            description="Only clusters in view, as min_lon,min_lat,max_lon,max_lat, "
+            "e.g. ?bbox=70.5,33.5,78,37.5 (default: the whole world).",
+            required=False,
+            type=str,
+        ),
+    ],
+    responses={200: TripMapSerializer},
+    tags=SchemaTags.TRIPS.value,
+)
+
+upcoming_trips_price_histogram_schema = extend_schema(
+    summary="Upcoming Trips Price Histogram",
+    description="Min/max and bucketed distribution of the resolved price "
+    "(cheapest package plus the departure's surcharge) of the upcoming "
+    "departures matching the same filters as the upcoming trips list.",
+    parameters=[price_histogram_buckets_parameter],
+    responses={200: price_histogram_response_serializer},
+    tags=SchemaTags.TRIPS.value,
+)
+
 destinations_list_schema = extend_schema(
     summary="Get Trip Destinations",
     description="List all trip destinations, each annotated with a count "
     "of its currently active trips. Ordered by trip count descending.",
     responses={200: DestinationWithSchedulesSerializer},
+    parameters=[compact_format_parameter],
     tags=SchemaTags.TRIPS.value,
 )
 
+destination_calendar_schema = extend_schema(
+    summary="Destination Departure Calendar",
+    description="The cheapest departure, and how many there are, on each day of "
+    "a month across a destination's trips - a region's including its child "
+    "locations'.",
+    parameters=[
+        OpenApiParameter(
+            name="month",
+            description="Month to show, as YYYY-MM (default: the current month).",
+            required=False,
+            type=str,
+        ),
+    ],
+    responses={200: DestinationCalendarSerializer},
+    tags=SchemaTags.TRIPS.value,
+)
+
+search_suggest_schema = extend_schema(
+    summary="Get Search Suggestions",
+    description="Search-as-you-type suggestions: public trips, locations, "
+    "categories and hosts with a name, or a word of it, starting with `q`. "
+    "Whole-name matches come first, then shorter names. Served from an "
+    "in-memory index, not the database.",
+    parameters=[
+        OpenApiParameter(
+            name="q",
+            description="What has been typed so far, e.g. `hun`.",
+            required=True,
+            type=OpenApiTypes.STR,
+        ),
+        OpenApiParameter(
+            name="limit",
+            description="Maximum number of suggestions (default 10, at most 25).",
+            required=False,
+            type=OpenApiTypes.INT,
+        ),
+    ],
+    responses={
+        200: inline_serializer(
+            name="SearchSuggestResponse",
+            fields={"results": SearchSuggestionSerializer(many=True)},
+        )
+    },
+    tags=SchemaTags.SEARCH.value,
+)
+
+home_schema = extend_schema(
+    summary="Get Landing Page Sections",
+    description="Featured trips, top destinations, categories, hosts, trust badges, "
+    "testimonials and upcoming departures in one response, each the first few rows of "
+    "its own list endpoint. A section that couldn't be loaded in time comes back empty "
+    "and is named in `unavailable`.",
+    responses={
+        200: inline_serializer(
+            name="HomeResponse",
+            fields={
+                "featured_trips": TripListSerializer(many=True),
+                "top_destinations": DestinationWithSchedulesSerializer(many=True),
+                "categories": CategoryListSerializer(many=True),
+                "hosts": HostListSerializer(many=True),
+                "trust_badges": TrustBadgeListSerializer(many=True),
+                "testimonials": TestimonialSerializer(many=True),
+                "upcoming_departures": UpcomingTripListSerializer(many=True),
+                "unavailable": serializers.ListField(child=serializers.CharField()),
+            },
+        )
+    },
+    tags=SchemaTags.HOME.value,
+)
+
 categories_list_schema = extend_schema(
     summary="Get Trip Categories",
     description="List all active trip categories, each annotated with a "
@@ -221,6 +466,7 @@ booking_create_schema = extend_schema(
 
 booking_list_schema = extend_schema(
     summary="List bookings",
+    parameters=sparse_fieldset_parameters,
     description=(
         "**Permission:** Admin users only. "
         "Get paginated trip bookings with essential details. Includes filtering, sorting and searching.",
@@ -238,6 +484,7 @@ booking_list_schema = extend_schema(
 
 booking_retrieve_schema = extend_schema(
     summary="Get booking details",
+    parameters=sparse_fieldset_parameters,
     description="""  
     Retrieve complete details of a specific booking including trip information, 
     payment status, and participant details.
@@ -296,6 +543,7 @@ booking_lookup_schema = extend_schema(
             required=False,
             type=OpenApiTypes.STR,
         ),
+        *sparse_fieldset_parameters,
     ],
     responses={
         200: TripBookingSerializer,
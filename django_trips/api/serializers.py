@@ -1,18 +1,24 @@
 """Django Trips serializers"""
 
 from typing import TYPE_CHECKING, Optional
+from urllib.parse import quote
 
 import crum
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
+from django.urls.resolvers import RFC3986_SUBDELIMS
 from django_countries.serializer_fields import CountryField
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from taggit.serializers import TaggitSerializer, TagListSerializerField
 
+from django_trips.api.compiled import CompiledListSerializer, compile_serializer
+from django_trips.api.fieldsets import SparseFieldsetSerializerMixin
+from django_trips.api.memo import MemoizedSerializerMixin
 from django_trips.choices import LocationType, PackageTier, ScheduleStatus
 from django_trips.models import (
     Category,
@@ -604,7 +610,20 @@ class TripWishlistToggleSerializer(serializers.Serializer):  # pylint:disable=ab
     is_wished = serializers.BooleanField(read_only=True)
 
 
-class TripScheduleBaseSerializer(serializers.ModelSerializer):
+class SearchSuggestionSerializer(serializers.Serializer):  # pylint:disable=abstract-method
+    """One search-as-you-type suggestion (see suggestions.py)."""
+
+    type = serializers.ChoiceField(
+        choices=["trip", "location", "category", "host"], read_only=True
+    )
+    slug = serializers.CharField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    region = serializers.CharField(
+        read_only=True, allow_null=True, help_text="A location's region; null otherwise."
+    )
+
+
+class TripScheduleBaseSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Fields shared by every context a `TripSchedule` is rendered in."""
 
     seats_left = serializers.IntegerField(read_only=True)
@@ -627,6 +646,34 @@ class TripScheduleBaseSerializer(serializers.ModelSerializer):
         )
 
 
+def get_card_images_limit() -> int:
+    """Most gallery images a trip card (`TripListSerializer.images`) carries."""
+    return getattr(settings, "DJANGO_TRIPS_CARD_IMAGES_LIMIT", 5)
+
+
+def get_card_schedules_limit() -> int:
+    """Most upcoming departures a trip card (`TripListSerializer.schedules`) carries."""
+    return getattr(settings, "DJANGO_TRIPS_CARD_SCHEDULES_LIMIT", 5)
+
+
+def get_date_distance_days(obj) -> Optional[int]:
+    """
+    The `date_distance` a `?date=` search annotates (see
+    `FlexibleDateFilterSet`) in whole days, or None when there wasn't one.
+    """
+    distance = getattr(obj, "date_distance", None)
+    return None if distance is None else distance.days
+
+
+def get_distance_km(obj) -> Optional[float]:
+    """
+    The `distance_km` a `?near=` search annotates (see `NearFilterSet`),
+    to 0.1 km, or None when there wasn't one.
+    """
+    distance = getattr(obj, "distance_km", None)
+    return None if distance is None else round(distance, 1)
+
+
 def get_upcoming_published_schedules(trip: "Trip"):
     """
     Queryset of a trip's upcoming, published departures - i.e. exactly what a
@@ -642,11 +689,13 @@ def get_upcoming_published_schedules(trip: "Trip"):
     )
 
 
-class TripListSerializer(serializers.ModelSerializer):
+class TripListSerializer(
+    MemoizedSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     destination = LocationSerializer()
     duration = serializers.SerializerMethodField()
     poster = serializers.SerializerMethodField()
-    images = TripImageSerializer(many=True, read_only=True)
+    images = serializers.SerializerMethodField()
     starting_price = serializers.SerializerMethodField()
     review_summary = serializers.SerializerMethodField()
     trip_url = serializers.SerializerMethodField()
@@ -657,6 +706,11 @@ class TripListSerializer(serializers.ModelSerializer):
     trust_badges = TrustBadgeSerializer(many=True)
     host = HostSerializer()
     schedules = serializers.SerializerMethodField()
+    next_departure = serializers.SerializerMethodField()
+    departures_count = serializers.SerializerMethodField()
+    nearest_departure = serializers.SerializerMethodField()
+    date_distance = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Trip
@@ -681,7 +735,15 @@ class TripListSerializer(serializers.ModelSerializer):
             "is_wished",
             "host",
             "schedules",
+            "next_departure",
+            "departures_count",
+            "nearest_departure",
+            "date_distance",
+            "distance_km",
         )
+        # Renders many=True pages through compiled per-field accessors - see
+        # api/compiled.py and the compile_* hooks below.
+        list_serializer_class = CompiledListSerializer
 
     @extend_schema_field({"type": "string", "example": "7 Days 6 Nights"})
     def get_duration(self, obj):
@@ -691,6 +753,24 @@ class TripListSerializer(serializers.ModelSerializer):
     def get_poster(self, trip: "Trip") -> Optional[str]:
         return get_trip_poster(trip, self.context)
 
+    @staticmethod
+    def get_card_images(trip):
+        """
+        The trip's first `get_card_images_limit()` gallery images, from the
+        `_prefetched_card_images` cache `prefetch_trip_card_relations`
+        attaches when present (already cut to that limit per trip).
+        """
+        images = getattr(trip, "_prefetched_card_images", None)
+        if images is None:
+            images = trip.images.all()[: get_card_images_limit()]
+        return images
+
+    @extend_schema_field(TripImageSerializer(many=True))
+    def get_images(self, trip):
+        return TripImageSerializer(
+            self.get_card_images(trip), many=True, context=self.context
+        ).data
+
     @extend_schema_field(TripReviewSummarySerializer)
     def get_review_summary(self, obj):
         return get_trip_review_summary_data(obj)
@@ -721,22 +801,102 @@ class TripListSerializer(serializers.ModelSerializer):
     def get_is_wished(self, trip):
         return get_is_wished(trip, self.context)
 
+    @staticmethod
+    def get_card_schedules(trip):
+        """
+        The trip's next `get_card_schedules_limit()` upcoming/published
+        departures. Prefers the `_prefetched_upcoming_schedules` cache
+        `prefetch_trip_card_relations` attaches (already cut to that limit
+        per trip, in one windowed query for the whole page), to avoid an N+1
+        query per row; falls back to a direct query otherwise.
+        """
+        schedules = getattr(trip, "_prefetched_upcoming_schedules", None)
+        if schedules is None:
+            schedules = get_upcoming_published_schedules(trip)[: get_card_schedules_limit()]
+        return schedules
+
     @extend_schema_field(TripScheduleBaseSerializer(many=True))
     def get_schedules(self, trip):
         """
         Same upcoming/published departures as `TripDetailSerializer.schedules`,
         without `pickup_locations` - irrelevant until a traveler is actually
         booking, and needlessly heavy to prefetch for every card on `/trips/`.
-
-        Prefers the `_prefetched_upcoming_schedules` cache `TripViewSet.get_queryset`
-        attaches via `Prefetch(..., to_attr=...)` for the list action, to avoid an
-        N+1 query per row; falls back to a direct query otherwise.
+        Only the next few (`get_card_schedules`) - `departures_count` says
+        how many there are in all.
         """
-        schedules = getattr(trip, "_prefetched_upcoming_schedules", None)
-        if schedules is None:
-            schedules = get_upcoming_published_schedules(trip)
+        schedules = self.get_card_schedules(trip)
         return TripScheduleBaseSerializer(schedules, many=True, context=self.context).data
 
+    @extend_schema_field(OpenApiTypes.DATE)
+    def get_next_departure(self, trip) -> Optional[str]:
+        """Start date of the trip's next upcoming/published departure, if any."""
+        schedules = self.get_card_schedules(trip)
+        return schedules[0].start_date.isoformat() if schedules else None
+
+    @extend_schema_field(OpenApiTypes.INT)
+    def get_departures_count(self, trip) -> int:
+        """
+        How many upcoming/published departures the trip has in all - `schedules`
+        only carries the first few. Read off the `departures_count`
+        annotation `prefetch_trip_card_relations` adds; a direct count
+        otherwise.
+        """
+        departures_count = getattr(trip, "departures_count", None)
+        if departures_count is None:
+            departures_count = get_upcoming_published_schedules(trip).count()
+        return departures_count
+
+    @extend_schema_field(OpenApiTypes.DATE)
+    def get_nearest_departure(self, trip) -> Optional[str]:
+        """
+        Start date of the matching departure nearest the `?date=` searched
+        for (see `TripFilter.rank_by_nearest_departure`); null without one.
+        """
+        departures = getattr(trip, "_prefetched_nearest_departures", None)
+        return departures[0].start_date.isoformat() if departures else None
+
+    @extend_schema_field(OpenApiTypes.INT)
+    def get_date_distance(self, trip) -> Optional[int]:
+        """How many days `nearest_departure` is from the `?date=` searched for."""
+        return get_date_distance_days(trip)
+
+    @extend_schema_field(OpenApiTypes.FLOAT)
+    def get_distance_km(self, trip) -> Optional[float]:
+        """How far the trip's destination or departure is from the `?near=` point."""
+        return get_distance_km(trip)
+
+    def compile_trip_url(self):
+        """
+        `trip_url` off a single `reverse()` per page: the URL is reversed
+        once around a placeholder slug, and each trip's is the same prefix
+        and suffix around its own (quoted, as reverse() would) slug.
+        """
+        placeholder = "trip-slug-placeholder"
+        prefix, _, suffix = Trip(slug=placeholder).get_absolute_url().partition(placeholder)
+        safe = RFC3986_SUBDELIMS + "/~:@"
+        return lambda trip: f"{prefix}{quote(trip.slug, safe=safe)}{suffix}"
+
+    def compile_images(self):
+        """`images` rendered straight through a compiled TripImageSerializer."""
+        build_image = compile_serializer(TripImageSerializer(context=self.context))
+
+        def build(trip):
+            return [build_image(image) for image in self.get_card_images(trip)]
+
+        return build
+
+    def compile_schedules(self):
+        """
+        `schedules` from one compiled `TripScheduleBaseSerializer`, rather
+        than `get_schedules` building and binding a fresh one per trip.
+        """
+        build_schedule = compile_serializer(TripScheduleBaseSerializer(context=self.context))
+
+        def build(trip):
+            return [build_schedule(schedule) for schedule in self.get_card_schedules(trip)]
+
+        return build
+
 
 class TripItineraryReadSerializer(BaseTripItinerarySerializer):
     location = LocationSerializer(read_only=True)
@@ -763,6 +923,73 @@ class TripPackageSerializer(serializers.ModelSerializer):
         )
 
 
+class TripCalendarPriceSerializer(serializers.Serializer):  # pylint:disable=abstract-method
+    """What one package tier costs on a calendar day - base price plus the day's surcharge."""
+
+    package = serializers.ChoiceField(choices=PackageTier.choices, read_only=True)
+    price = serializers.DecimalField(max_digits=8, decimal_places=0, read_only=True)
+    child_price = serializers.DecimalField(max_digits=8, decimal_places=0, read_only=True)
+
+
+class TripCalendarDaySerializer(serializers.Serializer):  # pylint:disable=abstract-method
+    """A day with published departures in a trip's calendar (see api/departure_calendar.py)."""
+
+    date = serializers.DateField(read_only=True)
+    departures = serializers.IntegerField(read_only=True)
+    seats_left = serializers.IntegerField(
+        read_only=True, help_text="Seats left across the day's departures."
+    )
+    min_price = serializers.DecimalField(
+        max_digits=8, decimal_places=0, read_only=True, allow_null=True
+    )
+    prices = TripCalendarPriceSerializer(many=True, read_only=True)
+
+
+class TripCalendarSerializer(serializers.Serializer):  # pylint:disable=abstract-method
+    month = serializers.CharField(read_only=True, help_text="YYYY-MM")
+    days = TripCalendarDaySerializer(many=True, read_only=True)
+
+
+class TripMapClusterSerializer(serializers.Serializer):  # pylint:disable=abstract-method
+    """The listable trips whose destinations share a map cell (see api/map_clusters.py)."""
+
+    lat = serializers.FloatField(read_only=True, help_text="Centroid of the trips' destinations.")
+    lon = serializers.FloatField(read_only=True, help_text="Centroid of the trips' destinations.")
+    count = serializers.IntegerField(read_only=True)
+    min_price = serializers.DecimalField(
+        max_digits=8,
+        decimal_places=0,
+        read_only=True,
+        allow_null=True,
+        help_text="Cheapest starting price among the trips.",
+    )
+
+
+class TripMapSerializer(serializers.Serializer):  # pylint:disable=abstract-method
+    zoom = serializers.IntegerField(read_only=True)
+    cell_size = serializers.FloatField(read_only=True, help_text="Cell width/height in degrees.")
+    clusters = TripMapClusterSerializer(many=True, read_only=True)
+
+
+class DestinationCalendarDaySerializer(serializers.Serializer):  # pylint:disable=abstract-method
+    """A day with departures in a destination's calendar (see `DestinationDay`)."""
+
+    date = serializers.DateField(read_only=True)
+    min_price = serializers.DecimalField(
+        max_digits=8,
+        decimal_places=0,
+        read_only=True,
+        help_text="Cheapest departure that day, across the destination's trips.",
+    )
+    departures = serializers.IntegerField(read_only=True)
+
+
+class DestinationCalendarSerializer(serializers.Serializer):  # pylint:disable=abstract-method
+    destination = serializers.SlugField(read_only=True)
+    month = serializers.CharField(read_only=True, help_text="YYYY-MM")
+    days = DestinationCalendarDaySerializer(many=True, read_only=True)
+
+
 class TripPickupLocationSerializer(serializers.ModelSerializer):
     """A pickup point offered for a specific trip departure."""
 
@@ -786,7 +1013,9 @@ class TripScheduleDetailSerializer(TripScheduleBaseSerializer):
         fields = TripScheduleBaseSerializer.Meta.fields + ("pickup_locations",)
 
 
-class TripDetailSerializer(TaggitSerializer, serializers.ModelSerializer):
+class TripDetailSerializer(
+    SparseFieldsetSerializerMixin, TaggitSerializer, serializers.ModelSerializer
+):
     cancellation_policy = serializers.SerializerMethodField()
     refund_schedule = serializers.SerializerMethodField()
     duration = serializers.SerializerMethodField()
@@ -943,8 +1172,76 @@ class TripScheduleSerializer(TripScheduleBaseSerializer):
 
 
 class UpcomingTripListSerializer(TripScheduleSerializer):
-    """Same shape as `TripScheduleSerializer` - kept as a distinct name for
-    the `/trips/upcoming/` endpoint's schema/call sites."""
+    """`TripScheduleSerializer`, plus how far the departure is from a
+    `?date=`/`?near=` searched for - the `/trips/upcoming/` rows."""
+
+    date_distance = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta(TripScheduleSerializer.Meta):
+        fields = TripScheduleSerializer.Meta.fields + ("date_distance", "distance_km")
+
+    @extend_schema_field(OpenApiTypes.INT)
+    def get_date_distance(self, schedule) -> Optional[int]:
+        """Days between this departure and the `?date=` searched for; null without one."""
+        return get_date_distance_days(schedule)
+
+    @extend_schema_field(OpenApiTypes.FLOAT)
+    def get_distance_km(self, schedule) -> Optional[float]:
+        """Km between the trip and the `?near=` point; null without one."""
+        return get_distance_km(schedule)
+
+
+class CompactTripListSerializer(TripListSerializer):
+    """
+    `TripListSerializer` for a `?format=compact` response's `included.trips`:
+    the related objects trips share (destination, host, taxonomy) are ids
+    here, rendered once each in `included` (see api/compact.py) instead of
+    once per trip.
+    """
+
+    destination = serializers.PrimaryKeyRelatedField(read_only=True)
+    host = serializers.PrimaryKeyRelatedField(read_only=True)
+    categories = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    facilities = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    trust_badges = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta(TripListSerializer.Meta):
+        pass
+
+
+class CompactTripScheduleSerializer(TripScheduleBaseSerializer):
+    """
+    A `?format=compact` schedule row - `trip` is the id of an entry in the
+    response's `included.trips`. Rendering a row registers its trip with the
+    `compact_included` collector in the serializer context.
+    """
+
+    trip = serializers.PrimaryKeyRelatedField(read_only=True)
+    date_distance = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta(TripScheduleBaseSerializer.Meta):
+        fields = (
+            ("trip",) + TripScheduleBaseSerializer.Meta.fields + ("date_distance", "distance_km")
+        )
+
+    @extend_schema_field(OpenApiTypes.INT)
+    def get_date_distance(self, schedule) -> Optional[int]:
+        """Days between this departure and the `?date=` searched for; null without one."""
+        return get_date_distance_days(schedule)
+
+    @extend_schema_field(OpenApiTypes.FLOAT)
+    def get_distance_km(self, schedule) -> Optional[float]:
+        """Km between the trip and the `?near=` point; null without one."""
+        return get_distance_km(schedule)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        included = self.context.get("compact_included")
+        if included is not None and "trip" in data:
+            included.add_trip(data["trip"])
+        return data
 
 
 class DestinationWithSchedulesSerializer(serializers.ModelSerializer):
@@ -983,9 +1280,14 @@ class DestinationWithSchedulesSerializer(serializers.ModelSerializer):
         schedules = TripSchedule.objects.upcoming().filter(
             id__in=trips.values_list("schedules", flat=True)
         )
-        return UpcomingTripListSerializer(
-            schedules, many=True, context=self.context
-        ).data
+        # `?format=compact` (see api/compact.py) - rows point at trips
+        # rendered once in the response's `included` block.
+        serializer_class = (
+            CompactTripScheduleSerializer
+            if "compact_included" in self.context
+            else UpcomingTripListSerializer
+        )
+        return serializer_class(schedules, many=True, context=self.context).data
 
 
 class TestimonialSerializer(serializers.ModelSerializer):
@@ -1002,7 +1304,7 @@ class TestimonialSerializer(serializers.ModelSerializer):
         return obj.location.name if obj.location else None
 
 
-class TripBookingSerializer(serializers.ModelSerializer):
+class TripBookingSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     schedule = serializers.PrimaryKeyRelatedField(
         queryset=TripSchedule.objects.upcoming(),
         write_only=True,
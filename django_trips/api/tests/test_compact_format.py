@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from django_trips.choices import ScheduleStatus
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          TripFactory, TripScheduleFactory)
+
+
+@pytest.mark.django_db
+class TestCompactFormat(AuthenticatedUserTestCase):
+    """`?format=compact` renders each referenced trip once, under `included`."""
+
+    maxDiff = None
+    upcoming_url = reverse("trips-api:upcoming-trips-list")
+    destinations_url = reverse("trips-api:destinations")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.trip = TripFactory(trip_schedule=None)
+        cls.other_trip = TripFactory(trip_schedule=None, host=cls.trip.host)
+        for days, trip in ((3, cls.trip), (5, cls.trip), (7, cls.trip), (4, cls.other_trip)):
+            TripScheduleFactory(
+                trip=trip,
+                start_date=timezone.now().date() + timedelta(days=days),
+                end_date=timezone.now().date() + timedelta(days=days + 2),
+                status=ScheduleStatus.PUBLISHED,
+            )
+
+    def get_json(self, url, params=None):
+        response = self.client.get(url, params or {}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_rows_reference_trips_included_once(self):
+        data = self.get_json(self.upcoming_url, {"format": "compact"})
+        self.assertEqual(len(data["results"]), 4)
+        self.assertEqual(
+            sorted(row["trip"] for row in data["results"]),
+            sorted([self.trip.id] * 3 + [self.other_trip.id]),
+        )
+        self.assertEqual(
+            set(data["included"]["trips"]), {str(self.trip.id), str(self.other_trip.id)}
+        )
+        # Both trips share one host - rendered once.
+        self.assertEqual(list(data["included"]["hosts"]), [str(self.trip.host_id)])
+
+    def test_resolves_to_the_standard_payload(self):
+        standard = self.get_json(self.upcoming_url, {"ordering": "start_date"})
+        compact = self.get_json(
+            self.upcoming_url, {"ordering": "start_date", "format": "compact"}
+        )
+        included = compact["included"]
+        for standard_row, compact_row in zip(standard["results"], compact["results"]):
+            trip = dict(included["trips"][str(compact_row.pop("trip"))])
+            trip["destination"] = included["locations"][str(trip["destination"])]
+            trip["host"] = included["hosts"][str(trip["host"])]
+            for relation in ("categories", "facilities", "trust_badges"):
+                trip[relation] = [included[relation][str(pk)] for pk in trip[relation]]
+            self.assertEqual({**compact_row, "trip": trip}, standard_row)
+
+    def test_wishlist_read_once(self):
+        with CaptureQueriesContext(connection) as context:
+            self.get_json(self.upcoming_url, {"format": "compact"})
+        wishlist_queries = [
+            query for query in context.captured_queries if "tripwishlist" in query["sql"]
+        ]
+        self.assertEqual(len(wishlist_queries), 1)
+
+    def test_sparse_fieldsets_narrow_included(self):
+        data = self.get_json(
+            self.upcoming_url, {"format": "compact", "fields": "id,trip.name"}
+        )
+        self.assertEqual(set(data["results"][0]), {"id", "trip"})
+        self.assertEqual(
+            data["included"],
+            {
+                "trips": {
+                    str(self.trip.id): {"name": self.trip.name},
+                    str(self.other_trip.id): {"name": self.other_trip.name},
+                }
+            },
+        )
+
+    def test_default_format_is_unchanged(self):
+        data = self.get_json(self.upcoming_url)
+        self.assertNotIn("included", data)
+        self.assertEqual(data["results"][0]["trip"]["host"]["name"], self.trip.host.name)
+
+    def test_unknown_format_is_not_found(self):
+        response = self.client.get(self.upcoming_url, {"format": "bogus"}, headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_destinations(self):
+        data = self.get_json(self.destinations_url, {"format": "compact"})
+        destination = next(
+            row for row in data["results"] if row["slug"] == self.trip.destination.slug
+        )
+        self.assertEqual([row["trip"] for row in destination["schedules"]], [self.trip.id] * 3)
+        self.assertEqual(
+            set(data["included"]["trips"]), {str(self.trip.id), str(self.other_trip.id)}
+        )
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.serializers import ListSerializer
+
+from django_trips.api.cards import prefetch_trip_card_relations
+from django_trips.api.compiled import compile_serializer
+from django_trips.api.serializers import (CompactTripListSerializer,
+                                          LocationSerializer,
+                                          TripListSerializer)
+from django_trips.choices import ScheduleStatus
+from django_trips.models import Trip
+from django_trips.tests.factories import (LocationFactory, TripFactory,
+                                          TripImageFactory,
+                                          TripReviewFactory,
+                                          TripReviewSummaryFactory,
+                                          TripScheduleFactory)
+
+
+@pytest.mark.django_db
+class CompiledTripCardTestCase(TestCase):
+    """The compiled fast path renders exactly what `TripListSerializer` does."""
+
+    maxDiff = None
+
+    @classmethod
+    def setUpTestData(cls):
+        province = LocationFactory(name="Gilgit-Baltistan")
+        trips = [
+            TripFactory(trip_schedule=None, destination=LocationFactory(parent=province)),
+            TripFactory(trip_schedule=None, slug="hunza-ümit"),
+            TripFactory(trip_schedule=None),
+        ]
+        for index, trip in enumerate(trips[:2]):
+            TripImageFactory.create_batch(2, trip=trip)
+            TripScheduleFactory(
+                trip=trip,
+                start_date=timezone.now().date() + timedelta(days=index + 3),
+                end_date=timezone.now().date() + timedelta(days=index + 6),
+                status=ScheduleStatus.PUBLISHED,
+            )
+            TripReviewFactory(trip=trip, is_verified=True)
+        TripReviewSummaryFactory(trip=trips[0])
+
+    def setUp(self):
+        super().setUp()
+        self.context = {"request": RequestFactory().get("/"), "wished_trip_ids": set()}
+
+    def get_trips(self, serializer_class=TripListSerializer):
+        field_names = serializer_class.get_selected_field_names(None, {})
+        return list(prefetch_trip_card_relations(Trip.objects.order_by("pk"), field_names))
+
+    def assert_parity(self, serializer, trips):
+        self.assertEqual(
+            serializer.to_representation(trips),
+            ListSerializer.to_representation(serializer, trips),
+        )
+
+    def test_trip_cards(self):
+        trips = self.get_trips()
+        self.assert_parity(TripListSerializer(many=True, context=self.context), trips)
+
+    def test_without_prefetched_caches(self):
+        trips = list(Trip.objects.order_by("pk"))
+        self.assert_parity(TripListSerializer(many=True, context=self.context), trips)
+
+    def test_sparse_fieldsets(self):
+        serializer = TripListSerializer(
+            many=True,
+            context=self.context,
+            sparse_fields={"name": {}, "trip_url": {}, "host": {}},
+        )
+        trips = self.get_trips()
+        self.assert_parity(serializer, trips)
+        self.assertEqual(set(serializer.to_representation(trips)[0]), {"name", "trip_url", "host"})
+
+    def test_related_fields(self):
+        trips = self.get_trips(CompactTripListSerializer)
+        self.assert_parity(CompactTripListSerializer(many=True, context=self.context), trips)
+
+    def test_compile_serializer(self):
+        location = Trip.objects.first().destination
+        serializer = LocationSerializer(context=self.context)
+        self.assertEqual(
+            compile_serializer(serializer)(location), serializer.to_representation(location)
+        )
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_trip_cards", rows=3, repeat=2, stdout=out)
+        self.assertIn("3 trip cards", out.getvalue())
+        self.assertIn("rows/sec", out.getvalue())
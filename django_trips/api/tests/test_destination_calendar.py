@@ -0,0 +1,137 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from django_trips.choices import LocationType, PackageTier, ScheduleStatus
+from django_trips.models import DestinationDay
+from django_trips.signals import refresh_destination_days
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          LocationFactory, TripFactory,
+                                          TripScheduleFactory)
+
+
+class TestDestinationCalendarAPI(AuthenticatedUserTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.month = (timezone.now().date().replace(day=1) + timedelta(days=62)).replace(day=1)
+        # All of it captured: writes inside the capture would join a rebuild
+        # queued before it, which never runs (see `on_commit_batched()`).
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.galiyat = LocationFactory(name="Galiyat", type=LocationType.REGION)
+            cls.nathia_gali = LocationFactory(
+                name="Nathia Gali", parent=cls.galiyat, type=LocationType.CITY
+            )
+            cls.ayubia = LocationFactory(name="Ayubia", parent=cls.galiyat, type=LocationType.CITY)
+            cls.hunza = LocationFactory(name="Hunza")
+            cls.nathia_trip = cls.trip(cls.nathia_gali, 12000)
+            cls.ayubia_trip = cls.trip(cls.ayubia, 9000)
+            cls.nathia_departure = cls.departure(cls.nathia_trip, 4)
+            cls.departure(cls.nathia_trip, 10, surcharge=1500)
+            cls.departure(cls.ayubia_trip, 4, surcharge=500)
+            cls.departure(cls.ayubia_trip, 7, status=ScheduleStatus.DRAFT)
+
+    @classmethod
+    def trip(cls, destination, base_price):
+        trip = TripFactory(trip_schedule=None, destination=destination)
+        package = trip.packages.get(name=PackageTier.STANDARD)
+        package.base_price = base_price
+        package.save()
+        return trip
+
+    @classmethod
+    def departure(cls, trip, day, surcharge=0, status=ScheduleStatus.PUBLISHED):
+        start = cls.month + timedelta(days=day)
+        return TripScheduleFactory(
+            trip=trip,
+            start_date=start,
+            end_date=start + timedelta(days=3),
+            additional_price=surcharge,
+            status=status,
+        )
+
+    def get_days(self, location):
+        url = reverse("trips-api:destination-calendar", kwargs={"slug": location.slug})
+        params = {"month": self.month.strftime("%Y-%m")}
+        response = self.client.get(url, params, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [
+            (day["date"], day["min_price"], day["departures"]) for day in response.json()["days"]
+        ]
+
+    def day(self, day):
+        return (self.month + timedelta(days=day)).isoformat()
+
+    def test_city_and_region_rollup(self):
+        self.assertEqual(
+            self.get_days(self.nathia_gali),
+            [(self.day(4), "12000", 1), (self.day(10), "13500", 1)],
+        )
+        self.assertEqual(
+            self.get_days(self.galiyat),
+            [(self.day(4), "9500", 2), (self.day(10), "13500", 1)],
+        )
+        self.assertEqual(self.get_days(self.hunza), [])
+
+    def test_single_range_read(self):
+        url = reverse("trips-api:destination-calendar", kwargs={"slug": self.galiyat.slug})
+        with self.assertNumQueries(3):  # user, location, days
+            self.client.get(url, {"month": self.month.strftime("%Y-%m")}, headers=self.headers)
+
+    def test_follows_package_and_schedule_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            package = self.ayubia_trip.packages.get(name=PackageTier.STANDARD)
+            package.base_price = 15000
+            package.save()
+        self.assertEqual(self.get_days(self.galiyat)[0], (self.day(4), "12000", 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nathia_departure.status = ScheduleStatus.CANCELLED
+            self.nathia_departure.save()
+        self.assertEqual(self.get_days(self.galiyat)[0], (self.day(4), "15500", 1))
+
+    def test_follows_trip_moves(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nathia_trip.destination = self.hunza
+            self.nathia_trip.save()
+        self.assertEqual(self.get_days(self.nathia_gali), [])
+        self.assertEqual(self.get_days(self.galiyat), [(self.day(4), "9500", 1)])
+        self.assertEqual(len(self.get_days(self.hunza)), 2)
+
+    def test_one_rebuild_per_transaction(self):
+        def destination_rebuilds(callbacks):
+            return [
+                callback.ids
+                for callback in callbacks
+                if getattr(callback, "callback", None) is refresh_destination_days
+            ]
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.departure(self.nathia_trip, 12)
+            self.departure(self.nathia_trip, 14)
+            self.departure(self.ayubia_trip, 12)
+        self.assertEqual(destination_rebuilds(callbacks), [{self.nathia_gali.pk, self.ayubia.pk}])
+        self.assertEqual(self.get_days(self.galiyat)[2], (self.day(12), "9000", 2))
+
+        # Only `verified` changing affects which of a host's trips are listed.
+        host = self.nathia_trip.host
+        with self.captureOnCommitCallbacks() as callbacks:
+            host.name = "Galiyat Treks"
+            host.save()
+        self.assertEqual(destination_rebuilds(callbacks), [])
+
+    def test_unknown_destination(self):
+        url = reverse("trips-api:destination-calendar", kwargs={"slug": "atlantis"})
+        self.assertEqual(self.client.get(url, headers=self.headers).status_code, 404)
+
+    def test_refresh_command(self):
+        days = set(DestinationDay.objects.values_list("location", "date", "min_price", "departures"))
+        DestinationDay.objects.all().delete()
+        call_command("refresh_destination_days", stdout=StringIO())
+        self.assertEqual(
+            set(DestinationDay.objects.values_list("location", "date", "min_price", "departures")),
+            days,
+        )
@@ -1,7 +1,22 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
 
-from django_trips.api.filters import TimedeltaFromDaysFilter
-from django_trips.models import TripSchedule
+from django_trips.api.filters import (TimedeltaFromDaysFilter, TripFilter,
+                                      UpcomingTripsFilter)
+from django_trips.choices import LocationType, ScheduleStatus
+from django_trips.geo import grid_cell, near_q
+from django_trips.models import (Location, Trip, TripOrigin, TripSchedule,
+                                 TripTrigram)
+from django_trips.signals import refresh_trip_origins
+from django_trips.tests.factories import (LocationFactory, TripFactory,
+                                          TripPickupLocationFactory,
+                                          TripScheduleFactory)
 
 
 class TimedeltaFromDaysFilterTestCase(TestCase):
@@ -17,3 +32,416 @@ class TimedeltaFromDaysFilterTestCase(TestCase):
         duration_filter = TimedeltaFromDaysFilter(field_name="duration")
         result = duration_filter.filter(TripSchedule.objects.all(), None)
         self.assertEqual(result.count(), TripSchedule.objects.count())
+
+    def test_partial_days_compare_exactly(self):
+        """The `duration_days` prefilter never changes which trips match."""
+        trip = TripFactory(duration=timedelta(days=4, hours=12))
+        for lookup_expr, value, matches in (
+            ("gte", 4, True),
+            ("gte", 4.5, True),
+            ("gte", 4.6, False),
+            ("lte", 4, False),
+            ("lte", 4.5, True),
+            ("lte", 5, True),
+        ):
+            duration_filter = TimedeltaFromDaysFilter(field_name="duration", lookup_expr=lookup_expr)
+            result = duration_filter.filter(Trip.objects.all(), value)
+            self.assertEqual(trip in result, matches, (lookup_expr, value))
+
+
+class PartySizeFilterTestCase(TestCase):
+    """`adults`/`children` keep only what the whole party can book."""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.now().date()
+
+        def departure(trip, seats_left, days=10, status=ScheduleStatus.PUBLISHED):
+            return TripScheduleFactory(
+                trip=trip,
+                start_date=today + timedelta(days=days),
+                end_date=today + timedelta(days=days + 3),
+                available_seats=seats_left + 2,
+                booked_seats=2,
+                status=status,
+            )
+
+        cls.roomy_trip = TripFactory(
+            trip_schedule=None, passenger_limit_min=0, passenger_limit_max=0
+        )
+        cls.roomy_departure = departure(cls.roomy_trip, seats_left=8)
+        # Seats, but only on a past departure and a draft one.
+        cls.past_trip = TripFactory(
+            trip_schedule=None, passenger_limit_min=0, passenger_limit_max=0
+        )
+        departure(cls.past_trip, seats_left=8, days=-10)
+        departure(cls.past_trip, seats_left=8, status=ScheduleStatus.DRAFT)
+        # Enough seats on one departure, but a party of 6 is over its limit.
+        cls.small_group_trip = TripFactory(
+            trip_schedule=None, passenger_limit_min=2, passenger_limit_max=5
+        )
+        departure(cls.small_group_trip, seats_left=8)
+        cls.tight_departure = departure(cls.small_group_trip, seats_left=3, days=20)
+
+    def filter_trips(self, **params):
+        return set(TripFilter(params, queryset=Trip.objects.all()).qs)
+
+    def filter_departures(self, **params):
+        # Published only: past_trip's draft departure has the seats, and
+        # the passenger limits, to admit any of these parties.
+        queryset = TripSchedule.objects.upcoming().filter(status=ScheduleStatus.PUBLISHED)
+        return set(UpcomingTripsFilter(params, queryset=queryset).qs)
+
+    def test_seats_left_kept_in_sync(self):
+        self.assertEqual(self.roomy_departure.seats_left, 8)
+        self.roomy_departure.booked_seats = 9
+        self.roomy_departure.save(update_fields=["booked_seats"])
+        self.roomy_departure.refresh_from_db()
+        self.assertEqual(self.roomy_departure.seats_left, 1)
+
+    def test_trips(self):
+        self.assertEqual(
+            self.filter_trips(adults=4, children=2), {self.roomy_trip}
+        )
+        self.assertEqual(
+            self.filter_trips(adults=2, children=1), {self.roomy_trip, self.small_group_trip}
+        )
+        # Below small_group_trip's passenger_limit_min.
+        self.assertEqual(self.filter_trips(adults=1), {self.roomy_trip})
+
+    def test_departures(self):
+        self.assertEqual(
+            self.filter_departures(adults=2, children=2),
+            {self.roomy_departure}
+            | set(self.small_group_trip.schedules.exclude(pk=self.tight_departure.pk)),
+        )
+        self.assertIn(self.tight_departure, self.filter_departures(children=3))
+
+    def test_no_party_is_a_noop(self):
+        self.assertEqual(self.filter_trips(adults=0), set(Trip.objects.all()))
+
+    def test_invalid_count(self):
+        for value in ("-1", "2.5", "many"):
+            party_filter = TripFilter({"adults": value}, queryset=Trip.objects.all())
+            self.assertFalse(party_filter.is_valid(), value)
+
+
+class DepartureFilterTestCase(TestCase):
+    """`departure` matches a trip's departure city or an upcoming published pickup."""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.now().date()
+        cls.punjab = LocationFactory(name="Punjab", type=LocationType.REGION)
+        cls.lahore = LocationFactory(name="Lahore", parent=cls.punjab, type=LocationType.CITY)
+        cls.islamabad = LocationFactory(name="Islamabad", type=LocationType.CITY)
+
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.lahore_trip = TripFactory(trip_schedule=None, departure=cls.lahore)
+            cls.pickup_trip = TripFactory(trip_schedule=None, departure=cls.islamabad)
+            cls.pickup_schedule = TripScheduleFactory(
+                trip=cls.pickup_trip,
+                start_date=today + timedelta(days=10),
+                end_date=today + timedelta(days=13),
+                status=ScheduleStatus.PUBLISHED,
+            )
+            TripPickupLocationFactory(schedule=cls.pickup_schedule, location=cls.lahore)
+            # Lahore pickups, but only on a past departure and a draft one.
+            cls.stale_trip = TripFactory(trip_schedule=None, departure=cls.islamabad)
+            for days, status in ((-10, ScheduleStatus.PUBLISHED), (10, ScheduleStatus.DRAFT)):
+                TripPickupLocationFactory(
+                    location=cls.lahore,
+                    schedule=TripScheduleFactory(
+                        trip=cls.stale_trip,
+                        start_date=today + timedelta(days=days),
+                        end_date=today + timedelta(days=days + 3),
+                        status=status,
+                    ),
+                )
+
+    def filter_trips(self, departure):
+        return set(TripFilter({"departure": departure}, queryset=Trip.objects.all()).qs)
+
+    def test_departure_city_or_pickup(self):
+        self.assertEqual(self.filter_trips("lahore"), {self.lahore_trip, self.pickup_trip})
+        self.assertEqual(
+            self.filter_trips("islamabad"), {self.pickup_trip, self.stale_trip}
+        )
+
+    def test_region_matches_child_locations(self):
+        self.assertEqual(self.filter_trips("punjab"), {self.lahore_trip, self.pickup_trip})
+
+    def test_origins_follow_schedule_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pickup_schedule.status = ScheduleStatus.CANCELLED
+            self.pickup_schedule.save()
+        self.assertEqual(self.filter_trips("lahore"), {self.lahore_trip})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            draft = self.stale_trip.schedules.get(status=ScheduleStatus.DRAFT)
+            draft.status = ScheduleStatus.PUBLISHED
+            draft.save()
+        self.assertEqual(self.filter_trips("lahore"), {self.lahore_trip, self.stale_trip})
+
+    def test_origins_follow_pickup_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pickup_schedule.pickup_locations.all().delete()
+        self.assertEqual(self.filter_trips("lahore"), {self.lahore_trip})
+
+    def test_origins_deleted_with_trip(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pickup_trip.delete()
+        self.assertFalse(TripOrigin.objects.filter(trip_id=self.pickup_schedule.trip_id))
+
+    def test_one_rebuild_per_transaction(self):
+        def origin_rebuilds(callbacks):
+            return [
+                callback.ids
+                for callback in callbacks
+                if getattr(callback, "callback", None) is refresh_trip_origins
+            ]
+
+        today = timezone.now().date()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for days in (20, 21, 22):
+                TripScheduleFactory(
+                    trip=self.lahore_trip,
+                    start_date=today + timedelta(days=days),
+                    end_date=today + timedelta(days=days + 3),
+                )
+            self.pickup_schedule.save()
+        self.assertEqual(
+            origin_rebuilds(callbacks), [{self.lahore_trip.pk, self.pickup_trip.pk}]
+        )
+
+        # A rolled-back savepoint takes its rebuild with it; later writes queue another.
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.pickup_schedule.save()
+                raise RuntimeError
+            self.lahore_trip.save()
+        self.assertEqual(origin_rebuilds(callbacks), [{self.lahore_trip.pk}])
+
+    def test_refresh_command(self):
+        origins = set(TripOrigin.objects.values_list("trip", "location", "latest_departure"))
+        TripOrigin.objects.all().delete()
+        call_command("refresh_trip_origins", stdout=StringIO())
+        self.assertEqual(
+            set(TripOrigin.objects.values_list("trip", "location", "latest_departure")), origins
+        )
+
+
+class FuzzyMatchFilterTestCase(TestCase):
+    """Typo-tolerant `name` and `destination` matching."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.galiyat = LocationFactory(name="Galiyat", type=LocationType.REGION)
+        cls.nathia_gali = LocationFactory(name="Nathia Gali", parent=cls.galiyat)
+        cls.hunza = LocationFactory(name="Hunza Valley")
+        cls.hunza_trip = TripFactory(name="Hunza Valley Explorer", destination=cls.hunza)
+        cls.gali_trip = TripFactory(name="Nathia Gali Weekend", destination=cls.nathia_gali)
+
+    def filter_trips(self, **params):
+        return set(TripFilter(params, queryset=Trip.objects.all()).qs)
+
+    def test_name_contains_first(self):
+        self.assertEqual(self.filter_trips(name="weekend"), {self.gali_trip})
+
+    def test_name_typo_falls_back_to_trigrams(self):
+        self.assertEqual(self.filter_trips(name="hunza valey"), {self.hunza_trip})
+        self.assertEqual(self.filter_trips(name="nathiagali"), {self.gali_trip})
+        self.assertEqual(self.filter_trips(name="karachi"), set())
+
+    def test_best_match_first(self):
+        close_trip = TripFactory(name="Hunza Vally Camp", destination=self.hunza)
+        trips = TripFilter({"name": "hunza valey"}, queryset=Trip.objects.all()).qs
+        self.assertEqual(list(trips), [self.hunza_trip, close_trip])
+        self.assertGreater(trips[0].name_match_score, trips[1].name_match_score)
+        with self.assertNumQueries(1):
+            list(TripFilter({"name": "hunza valey"}, queryset=Trip.objects.all()).qs)
+
+    def test_upcoming_name_typo(self):
+        today = timezone.now().date()
+        for trip in (self.hunza_trip, self.gali_trip):
+            TripScheduleFactory(
+                trip=trip,
+                start_date=today + timedelta(days=10),
+                end_date=today + timedelta(days=13),
+                status=ScheduleStatus.PUBLISHED,
+            )
+        queryset = TripSchedule.objects.upcoming()
+        schedules = UpcomingTripsFilter({"name": "hunza valey"}, queryset=queryset).qs
+        self.assertEqual({schedule.trip for schedule in schedules}, {self.hunza_trip})
+
+    def test_destination_typo_and_region_rollup(self):
+        self.assertEqual(self.filter_trips(destination="hunza-valey"), {self.hunza_trip})
+        self.assertEqual(self.filter_trips(destination="galiyaat"), {self.gali_trip})
+
+    def test_trigrams_follow_renames(self):
+        self.hunza_trip.name = "Fairy Meadows"
+        self.hunza_trip.save()
+        self.assertEqual(TripTrigram.match("fairy medows"), [self.hunza_trip.pk])
+        self.assertEqual(TripTrigram.match("hunza valey"), [])
+
+    def test_refresh_command(self):
+        trigram_rows = set(TripTrigram.objects.values_list("trip", "trigram"))
+        TripTrigram.objects.all().delete()
+        call_command("refresh_trip_trigrams", stdout=StringIO())
+        self.assertEqual(set(TripTrigram.objects.values_list("trip", "trigram")), trigram_rows)
+
+
+class FlexibleDateFilterTestCase(TestCase):
+    """`date`/`flex_days` keep published departures near a date, nearest first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.target = timezone.now().date() + timedelta(days=30)
+
+        def departure(trip, days, status=ScheduleStatus.PUBLISHED):
+            return TripScheduleFactory(
+                trip=trip,
+                start_date=cls.target + timedelta(days=days),
+                end_date=cls.target + timedelta(days=days + 3),
+                available_seats=10,
+                booked_seats=0,
+                status=status,
+            )
+
+        cls.exact_trip = TripFactory(trip_schedule=None)
+        cls.exact_departure = departure(cls.exact_trip, 0)
+        cls.near_trip = TripFactory(trip_schedule=None)
+        departure(cls.near_trip, 5)
+        cls.near_departure = departure(cls.near_trip, -2)
+        # Only a draft departure in the window.
+        cls.draft_trip = TripFactory(trip_schedule=None)
+        departure(cls.draft_trip, 1, status=ScheduleStatus.DRAFT)
+
+    def filter_trips(self, **params):
+        return list(TripFilter(params, queryset=Trip.objects.all()).qs)
+
+    def test_trips_nearest_first(self):
+        self.assertEqual(self.filter_trips(date=self.target), [self.exact_trip])
+        trips = self.filter_trips(date=self.target, flex_days=3)
+        self.assertEqual(trips, [self.exact_trip, self.near_trip])
+        self.assertEqual([trip.date_distance.days for trip in trips], [0, 2])
+        self.assertEqual(
+            [trip._prefetched_nearest_departures for trip in trips],
+            [[self.exact_departure], [self.near_departure]],
+        )
+
+    def test_combined_with_party_size(self):
+        self.exact_departure.booked_seats = self.exact_departure.available_seats
+        self.exact_departure.save()
+        self.near_trip.passenger_limit_min = self.near_trip.passenger_limit_max = 0
+        self.near_trip.save()
+        self.assertEqual(
+            self.filter_trips(date=self.target, flex_days=3, adults=1), [self.near_trip]
+        )
+
+    def test_departures_nearest_first(self):
+        schedules = UpcomingTripsFilter(
+            {"date": self.target, "flex_days": 5}, queryset=TripSchedule.objects.upcoming()
+        ).qs
+        self.assertEqual(
+            [(schedule.trip, schedule.date_distance.days) for schedule in schedules],
+            [(self.exact_trip, 0), (self.near_trip, 2), (self.near_trip, 5)],
+        )
+
+    def test_api_reports_distance(self):
+        params = {"date": self.target.isoformat(), "flex_days": 3}
+        trips = self.client.get(reverse("trips-api:trip-list"), params).json()["results"]
+        self.assertEqual(
+            [(trip["slug"], trip["nearest_departure"], trip["date_distance"]) for trip in trips],
+            [
+                (self.exact_trip.slug, self.target.isoformat(), 0),
+                (self.near_trip.slug, self.near_departure.start_date.isoformat(), 2),
+            ],
+        )
+        rows = self.client.get(reverse("trips-api:upcoming-trips-list"), params).json()
+        self.assertEqual([row["date_distance"] for row in rows["results"]], [0, 2])
+
+    def test_flex_days_bounds(self):
+        for value in ("-1", str(TripFilter.MAX_FLEX_DAYS + 1)):
+            date_filter = TripFilter(
+                {"date": self.target, "flex_days": value}, queryset=Trip.objects.all()
+            )
+            self.assertFalse(date_filter.is_valid(), value)
+
+
+class NearFilterTestCase(TestCase):
+    """`near`/`radius_km` keep trips whose destination or departure is in range, nearest first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gilgit = (35.92, 74.31)
+        cls.hunza = LocationFactory(name="Hunza", lat=36.32, lon=74.65)
+        cls.skardu = LocationFactory(name="Skardu", lat=35.30, lon=75.63)
+        cls.karachi = LocationFactory(name="Karachi", lat=24.86, lon=67.01)
+        cls.lahore = LocationFactory(name="Lahore", lat=31.55, lon=74.34)
+
+        def trip(destination, departure):
+            trip = TripFactory(trip_schedule=None, destination=destination, departure=departure)
+            start = timezone.now().date() + timedelta(days=30)
+            TripScheduleFactory(trip=trip, start_date=start, end_date=start + timedelta(days=3))
+            return trip
+
+        cls.hunza_trip = trip(cls.hunza, cls.karachi)
+        # Matches by where it leaves from.
+        cls.skardu_trip = trip(cls.lahore, cls.skardu)
+        cls.lahore_trip = trip(cls.lahore, cls.karachi)
+
+    def filter_trips(self, **params):
+        return list(TripFilter(params, queryset=Trip.objects.all()).qs)
+
+    def test_grid_cell_kept_in_sync(self):
+        self.assertEqual(self.hunza.grid_cell, grid_cell(36.32, 74.65))
+        Location.objects.filter(pk=self.hunza.pk).update(lat=-33.9, lon=-179.5, grid_cell=None)
+        Location.objects.filter(pk=self.skardu.pk).update(lat=None)
+        Location.objects.sync_grid_cells()
+        self.hunza.refresh_from_db()
+        self.skardu.refresh_from_db()
+        self.assertEqual(self.hunza.grid_cell, grid_cell(-33.9, -179.5))
+        self.assertIsNone(self.skardu.grid_cell)
+
+    def test_bounding_box_across_the_antimeridian(self):
+        fiji = LocationFactory(name="Fiji", lat=-17.8, lon=179.9)
+        taveuni = LocationFactory(name="Taveuni", lat=-17.9, lon=-179.9)
+        self.assertEqual(
+            set(Location.objects.filter(near_q(-17.8, 179.95, 50))), {fiji, taveuni}
+        )
+
+    def test_trips_nearest_first(self):
+        trips = self.filter_trips(near="35.92,74.31", radius_km=200)
+        self.assertEqual(trips, [self.hunza_trip, self.skardu_trip])
+        self.assertEqual([round(trip.distance_km) for trip in trips], [54, 138])
+        # Within the default radius of Karimabad, Hunza.
+        self.assertEqual(self.filter_trips(near="36.32,74.66"), [self.hunza_trip])
+
+    def test_departures(self):
+        schedules = UpcomingTripsFilter(
+            {"near": "35.92,74.31", "radius_km": 200}, queryset=TripSchedule.objects.upcoming()
+        ).qs
+        self.assertEqual(
+            {schedule.trip for schedule in schedules}, {self.hunza_trip, self.skardu_trip}
+        )
+
+    def test_api_reports_distance(self):
+        params = {"near": "35.92,74.31", "radius_km": 200}
+        trips = self.client.get(reverse("trips-api:trip-list"), params).json()["results"]
+        self.assertEqual(
+            [(trip["slug"], round(trip["distance_km"])) for trip in trips],
+            [(self.hunza_trip.slug, 54), (self.skardu_trip.slug, 138)],
+        )
+        rows = self.client.get(reverse("trips-api:upcoming-trips-list"), params).json()
+        self.assertEqual([round(row["distance_km"]) for row in rows["results"]], [54, 138])
+
+    def test_invalid_point_or_radius(self):
+        for params in (
+            {"near": "35.92"},
+            {"near": "lat,lon"},
+            {"near": "95,74.31"},
+            {"near": "35.92,74.31", "radius_km": TripFilter.MAX_RADIUS_KM + 1},
+        ):
+            near_filter = TripFilter(params, queryset=Trip.objects.all())
+            self.assertFalse(near_filter.is_valid(), params)
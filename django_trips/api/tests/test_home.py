@@ -0,0 +1,190 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from django_trips.api.home import HomeSection, get_home
+from django_trips.choices import FeaturedType
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          CategoryFactory, TestimonialFactory,
+                                          TripFactory, TripScheduleFactory,
+                                          TripWishlistFactory)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+# Worker threads have database connections of their own, which can't see
+# a TestCase's uncommitted rows - so sections are built in the test's thread
+# here, and the thread pool is exercised below: on its own, and against the
+# database by a TransactionTestCase.
+@override_settings(CACHES=LOCMEM_CACHE, DJANGO_TRIPS_HOME_MAX_WORKERS=0)
+class TestHomeAPI(AuthenticatedUserTestCase):
+    url = reverse("trips-api:home")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.featured = TripFactory(featured=FeaturedType.BESTSELLER, trip_schedule=None)
+        cls.plain = TripFactory(trip_schedule=None)
+        cls.later = cls.departure(cls.plain, days=30)
+        cls.sooner = cls.departure(cls.featured, days=3)
+        TripWishlistFactory(user=cls.user, trip=cls.featured)
+        TestimonialFactory()
+
+    @classmethod
+    def departure(cls, trip, days):
+        start_date = timezone.now() + timedelta(days=days)
+        return TripScheduleFactory(
+            trip=trip, start_date=start_date, end_date=start_date + timedelta(days=2)
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_home(self, params=None, headers=None):
+        headers = self.headers if headers is None else headers
+        response = self.client.get(self.url, params or {}, headers=headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_sections(self):
+        home = self.get_home()
+        self.assertEqual(home["unavailable"], [])
+        self.assertEqual([trip["slug"] for trip in home["featured_trips"]], [self.featured.slug])
+        self.assertTrue(home["featured_trips"][0]["is_wished"])
+        self.assertEqual(
+            [departure["id"] for departure in home["upcoming_departures"]],
+            [self.sooner.pk, self.later.pk],
+        )
+        self.assertEqual(len(home["testimonials"]), 1)
+        for section in ("top_destinations", "categories", "hosts"):
+            self.assertTrue(home[section], section)
+
+    def test_sections_match_their_endpoints(self):
+        for section, url_name in (("categories", "categories"), ("hosts", "hosts")):
+            response = self.client.get(reverse(f"trips-api:{url_name}"), headers=self.headers)
+            rows = response.json()["results"]
+            with override_settings(DJANGO_TRIPS_HOME_SECTION_LIMIT=2):
+                self.assertEqual(self.get_home()[section], rows[:2])
+                cache.clear()
+
+    def test_query_params_ignored(self):
+        home = self.get_home({"fields": "name", "ordering": "-start_date"})
+        self.assertIn("slug", home["featured_trips"][0])
+        self.assertEqual(home["upcoming_departures"][0]["id"], self.sooner.pk)
+
+    def test_cached_until_catalog_changes(self):
+        self.get_home()
+        with self.assertNumQueries(1):  # the user lookup only
+            self.get_home()
+
+        # Trip cards are cached per user, for their `is_wished`.
+        anonymous = self.get_home(headers={})
+        self.assertFalse(anonymous["featured_trips"][0]["is_wished"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CategoryFactory(name="Rafting")
+        self.assertIn("Rafting", [row["name"] for row in self.get_home()["categories"]])
+
+
+class TestHomeSections(SimpleTestCase):
+    class Section(HomeSection):
+        def __init__(self, name, build):
+            super().__init__(name, view_class=None)
+            self.build = build
+
+    def setUp(self):
+        super().setUp()
+        self.request = type("Request", (), {"user": AnonymousUser()})()
+        self.release = threading.Event()
+        self.calls = []
+
+    def tearDown(self):
+        self.release.set()
+        super().tearDown()
+
+    def rows(self, name):
+        def build(request, limit):
+            self.calls.append(name)
+            return [name] * limit
+
+        return build
+
+    def slow(self, request, limit):
+        self.release.wait(5)
+        return self.rows("slow")(request, limit)
+
+    @staticmethod
+    def broken(request, limit):
+        raise RuntimeError("section unavailable")
+
+    @override_settings(
+        CACHES=LOCMEM_CACHE,
+        DJANGO_TRIPS_HOME_SECTION_LIMIT=2,
+        DJANGO_TRIPS_HOME_SECTION_TIMEOUT=0.2,
+    )
+    def test_late_or_failed_sections_left_empty(self):
+        sections = [
+            self.Section("fast", self.rows("fast")),
+            self.Section("slow", self.slow),
+            self.Section("broken", self.broken),
+        ]
+        with self.assertLogs("django_trips.api.home", "WARNING"):
+            home = get_home(self.request, sections)
+        self.assertEqual(
+            home,
+            {"fast": ["fast", "fast"], "slow": [], "broken": [], "unavailable": ["slow", "broken"]},
+        )
+
+        # A request meanwhile waits on the build already running rather than starting another.
+        with self.assertLogs("django_trips.api.home", "WARNING"):
+            self.assertEqual(get_home(self.request, sections)["unavailable"], ["slow", "broken"])
+
+        # The late section still finishes, and caches its rows for the next request.
+        self.release.set()
+        slow_key = sections[1].get_cache_key(self.request, 2)
+        deadline = time.monotonic() + 5
+        while cache.get(slow_key) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with self.assertLogs("django_trips.api.home", "ERROR"):
+            home = get_home(self.request, sections)
+        self.assertEqual(home["slow"], ["slow", "slow"])
+        self.assertEqual(home["unavailable"], ["broken"])
+        self.assertEqual(self.calls, ["fast", "slow"])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, DJANGO_TRIPS_HOME_MAX_WORKERS=2)
+class TestHomeThreadedAPI(TransactionTestCase):
+    """The sections built on the thread pool, whose connections see committed rows only."""
+
+    url = reverse("trips-api:home")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.featured = TripFactory(featured=FeaturedType.BESTSELLER, trip_schedule=None)
+        CategoryFactory(name="Rafting")
+
+    @override_settings(DJANGO_TRIPS_HOME_SECTION_TIMEOUT=10)
+    def test_sections_built_on_the_pool(self):
+        for _ in range(2):
+            cache.clear()
+            home = self.client.get(self.url).json()
+            self.assertEqual(home["unavailable"], [])
+            self.assertEqual(
+                [trip["slug"] for trip in home["featured_trips"]], [self.featured.slug]
+            )
+            self.assertIn("Rafting", [row["name"] for row in home["categories"]])
+        # One pool, reused across requests.
+        pool_threads = [
+            thread
+            for thread in threading.enumerate()
+            if thread.name.startswith("django-trips-home")
+        ]
+        self.assertLessEqual(len(pool_threads), 2)
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import pytest
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from django_trips.api.memo import MEMO_CONTEXT_KEY, SerializationMemo
+from django_trips.api.serializers import (TripListSerializer,
+                                          TripScheduleSerializer)
+from django_trips.choices import ScheduleStatus
+from django_trips.models import TripSchedule
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          TripFactory, TripScheduleFactory)
+
+
+class SerializationMemoTestCase(TestCase):
+    def test_builds_each_key_once(self):
+        memo = SerializationMemo()
+        built = []
+
+        def build(value):
+            built.append(value)
+            return {"value": value}
+
+        first = memo.get_or_build(("trip", 1), lambda: build(1))
+        self.assertIs(memo.get_or_build(("trip", 1), lambda: build(1)), first)
+        memo.get_or_build(("trip", 2), lambda: build(2))
+        self.assertEqual(built, [1, 2])
+        self.assertEqual((memo.hits, memo.misses), (1, 2))
+
+
+def make_departures(trip, days):
+    for day in days:
+        TripScheduleFactory(
+            trip=trip,
+            start_date=timezone.now().date() + timedelta(days=day),
+            end_date=timezone.now().date() + timedelta(days=day + 2),
+            status=ScheduleStatus.PUBLISHED,
+        )
+
+
+@pytest.mark.django_db
+class MemoizedTripSerializationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.trip = TripFactory(trip_schedule=None)
+        cls.other_trip = TripFactory(trip_schedule=None)
+        make_departures(cls.trip, (3, 5, 7))
+        make_departures(cls.other_trip, (4,))
+
+    def serialize_schedules(self, **kwargs):
+        schedules = TripSchedule.objects.order_by("start_date")
+        context = {"request": RequestFactory().get("/"), **kwargs}
+        return TripScheduleSerializer(schedules, many=True, context=context).data
+
+    def test_nested_trip_rendered_once_per_trip(self):
+        memo = SerializationMemo()
+        memoized = self.serialize_schedules(**{MEMO_CONTEXT_KEY: memo})
+        self.assertEqual((memo.hits, memo.misses), (2, 2))
+        self.assertEqual(memoized, self.serialize_schedules())
+
+    def test_sparse_selection_is_part_of_the_key(self):
+        memo = SerializationMemo()
+        context = {"request": RequestFactory().get("/"), MEMO_CONTEXT_KEY: memo}
+        schedule = TripSchedule.objects.filter(trip=self.trip).first()
+        full = TripScheduleSerializer(schedule, context=context).data
+        narrow = TripScheduleSerializer(
+            schedule, context=context, sparse_fields={"trip": {"name": {}}}
+        ).data
+        self.assertEqual(narrow["trip"], {"name": self.trip.name})
+        self.assertGreater(len(full["trip"]), 1)
+        self.assertEqual(memo.misses, 2)
+
+    def test_list_items_not_memoized(self):
+        memo = SerializationMemo()
+        context = {"request": RequestFactory().get("/"), MEMO_CONTEXT_KEY: memo}
+        TripListSerializer([self.trip, self.other_trip], many=True, context=context).data
+        self.assertEqual((memo.hits, memo.misses), (0, 0))
+
+
+@pytest.mark.django_db
+class TestSerializationMemoViews(AuthenticatedUserTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.trip = TripFactory(trip_schedule=None)
+        make_departures(cls.trip, (3, 5, 7))
+
+    def test_upcoming_trips_logs_memo_counters(self):
+        url = reverse("trips-api:upcoming-trips-list")
+        with self.assertLogs("django_trips.api.memo", "DEBUG") as logs:
+            response = self.client.get(url, headers=self.headers)
+        rows = response.json()["results"]
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(row["trip"] == rows[0]["trip"] for row in rows))
+        self.assertEqual(
+            logs.output,
+            [
+                f"DEBUG:django_trips.api.memo:GET {url}: "
+                "serialization memo 2 hits, 1 misses"
+            ],
+        )
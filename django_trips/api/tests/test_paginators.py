@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from django_trips.cache import (CATALOG_VERSION_CACHE_KEY, bump_catalog_version,
+                                 catalog_cache_key, get_catalog_version)
+from django_trips.choices import ScheduleStatus
+from django_trips.models import TripSchedule
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          TripFactory, TripScheduleFactory)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CatalogCacheKeyTestCase(AuthenticatedUserTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_key_is_stable_within_a_version(self):
+        self.assertEqual(
+            catalog_cache_key("count", "/trips/", [["name", ["hunza"]]]),
+            catalog_cache_key("count", "/trips/", [["name", ["hunza"]]]),
+        )
+
+    def test_bump_changes_key(self):
+        before = catalog_cache_key("count", "/trips/")
+        bump_catalog_version()
+        self.assertNotEqual(before, catalog_cache_key("count", "/trips/"))
+
+    def test_bumped_once_the_writes_commit(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            TripFactory()
+            TripFactory()
+            self.assertEqual(get_catalog_version(), version)
+        self.assertEqual(get_catalog_version(), version + 1)
+
+    def test_evicted_version_restarts_past_earlier_ones(self):
+        bump_catalog_version()
+        version = get_catalog_version()
+        cache.delete(CATALOG_VERSION_CACHE_KEY)
+        self.assertGreater(get_catalog_version(), version)
+
+        version = get_catalog_version()
+        cache.delete(CATALOG_VERSION_CACHE_KEY)
+        bump_catalog_version()
+        self.assertGreater(get_catalog_version(), version)
+
+
+@pytest.mark.django_db
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestCachedCountLimitOffsetPaginator(AuthenticatedUserTestCase):
+    """`/trips/` caches its total per filter set instead of re-counting on every page."""
+
+    url = reverse("trips-api:trip-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for _ in range(3):
+            TripScheduleFactory(
+                trip=TripFactory(trip_schedule=None),
+                start_date=timezone.now().date() + timedelta(days=5),
+                end_date=timezone.now().date() + timedelta(days=10),
+                status=ScheduleStatus.PUBLISHED,
+            )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_response(self, params=None):
+        response = self.client.get(self.url, params or {}, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.json())
+        return response.json()
+
+    def count_queries(self, params=None):
+        with CaptureQueriesContext(connection) as context:
+            self.get_response(params)
+        return len(context.captured_queries)
+
+    def test_exact_count_is_reported(self):
+        data = self.get_response()
+        self.assertEqual(data["count"], 3)
+        self.assertFalse(data["count_is_estimate"])
+
+    def test_second_page_skips_the_count_query(self):
+        first = self.count_queries({"limit": 1})
+        second = self.count_queries({"limit": 1, "offset": 1})
+        self.assertEqual(second, first - 1)
+
+    def test_ordering_and_param_order_share_a_cache_entry(self):
+        first = self.count_queries({"name": "a", "duration_from": 1})
+        second = self.count_queries({"duration_from": 1, "name": "a", "ordering": "-price"})
+        self.assertEqual(second, first - 1)
+
+    def test_fieldsets_and_format_share_a_cache_entry(self):
+        params = {"name": "a", "fields": "name,slug", "omit": "slug"}
+        uncached = self.count_queries(params)
+        cache.clear()
+        self.get_response({"name": "a"})
+        self.assertEqual(self.count_queries(params), uncached - 1)
+
+    def test_different_filters_are_counted_separately(self):
+        self.get_response()
+        data = self.get_response({"name": "no such trip"})
+        self.assertEqual(data["count"], 0)
+
+    def test_catalog_write_invalidates_cached_count(self):
+        self.assertEqual(self.get_response()["count"], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            TripFactory()
+        self.assertEqual(self.get_response()["count"], 4)
+
+    def test_booking_seat_save_keeps_cached_count(self):
+        self.get_response()
+        cached = self.count_queries()
+        schedule = TripSchedule.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.save(update_fields=["booked_seats"])  # what a booking saves
+        self.assertEqual(self.count_queries(), cached)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.save()
+        self.assertEqual(self.count_queries(), cached + 1)
+
+    @override_settings(DJANGO_TRIPS_EXACT_COUNT_LIMIT=2)
+    def test_count_past_the_limit_is_an_estimate(self):
+        data = self.get_response({"limit": 1})
+        self.assertTrue(data["count_is_estimate"])
+        self.assertEqual(data["count"], 2)
+        self.assertIsNotNone(data["next"])
+
+    @override_settings(DJANGO_TRIPS_EXACT_COUNT_LIMIT=3)
+    def test_count_at_the_limit_is_exact(self):
+        data = self.get_response({"limit": 1})
+        self.assertFalse(data["count_is_estimate"])
+        self.assertEqual(data["count"], 3)
+
+    @override_settings(DJANGO_TRIPS_EXACT_COUNT_LIMIT=2)
+    def test_estimate_never_cuts_off_later_pages(self):
+        data = self.get_response({"limit": 1, "offset": 2})
+        self.assertEqual(len(data["results"]), 1)
+        self.assertGreaterEqual(data["count"], 3)
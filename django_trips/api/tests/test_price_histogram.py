@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from django_trips.api.histogram import nice_width
+from django_trips.choices import PackageTier, ScheduleStatus
+from django_trips.models import TripPackage
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          LocationFactory, TripFactory,
+                                          TripScheduleFactory)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def set_price(trip, base_price):
+    package = trip.packages.get(name=PackageTier.STANDARD)
+    package.base_price = base_price
+    package.save()
+
+
+class NiceWidthTestCase(TestCase):
+    def test_rounds_up_to_1_2_5_steps(self):
+        self.assertEqual(nice_width(2300, 100), 5000)
+        self.assertEqual(nice_width(1500, 100), 2000)
+        self.assertEqual(nice_width(1000, 100), 1000)
+        self.assertEqual(nice_width(6000, 100), 10000)
+
+    def test_never_finer_than_resolution(self):
+        self.assertEqual(nice_width(0, 100), 100)
+        self.assertEqual(nice_width(30, 100), 100)
+
+
+class StoredPricesTestCase(TestCase):
+    """`Trip.min_price`/`TripSchedule.resolved_price` follow package and schedule writes."""
+
+    def setUp(self):
+        self.trip = TripFactory(trip_schedule=None)
+        self.schedule = TripScheduleFactory(trip=self.trip, additional_price=500)
+
+    def assert_prices(self, min_price, resolved_price):
+        self.trip.refresh_from_db()
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.trip.min_price, min_price)
+        self.assertEqual(self.schedule.resolved_price, resolved_price)
+
+    def test_follows_packages(self):
+        self.assert_prices(0, 500)
+        stale_trip = type(self.trip).objects.get(pk=self.trip.pk)
+        set_price(self.trip, 20000)
+        self.assert_prices(20000, 20500)
+        premium = TripPackage.objects.create(
+            trip=self.trip, name=PackageTier.PREMIUM, description="", base_price=15000
+        )
+        self.assert_prices(15000, 15500)
+        # A full save of an instance loaded before the package writes keeps them.
+        stale_trip.save()
+        self.assert_prices(15000, 15500)
+        premium.delete()
+        self.assert_prices(20000, 20500)
+
+    def test_follows_surcharge(self):
+        self.schedule.additional_price = 1000
+        self.schedule.save(update_fields=["additional_price"])
+        self.assert_prices(0, 1000)
+
+
+@pytest.mark.django_db
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestPriceHistogramAPI(AuthenticatedUserTestCase):
+    trips_url = reverse("trips-api:trip-price-histogram")
+    upcoming_url = reverse("trips-api:upcoming-trips-price-histogram")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        start = timezone.now().date() + timedelta(days=10)
+        cls.hunza = LocationFactory(name="Hunza")
+        for base_price, surcharge in ((9500, 0), (12000, 2000), (18000, 0), (31000, 500)):
+            trip = TripFactory(trip_schedule=None, destination=cls.hunza)
+            set_price(trip, base_price)
+            TripScheduleFactory(
+                trip=trip,
+                start_date=start,
+                end_date=start + timedelta(days=3),
+                additional_price=surcharge,
+                status=ScheduleStatus.PUBLISHED,
+            )
+        TripFactory(trip_schedule=None)  # elsewhere, at the Standard package's 0
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_histogram(self, url, params=None):
+        response = self.client.get(url, params or {}, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_trip_histogram(self):
+        histogram = self.get_histogram(self.trips_url, {"destination": self.hunza.slug})
+        # 4 prices -> 3 target buckets over 9,500..31,000 -> width 10,000.
+        self.assertEqual(
+            histogram,
+            {
+                "count": 4,
+                "min": 9500,
+                "max": 31000,
+                "bucket_width": 10000,
+                "buckets": [
+                    {"from": 0, "to": 10000, "count": 1},
+                    {"from": 10000, "to": 20000, "count": 2},
+                    {"from": 20000, "to": 30000, "count": 0},
+                    {"from": 30000, "to": 40000, "count": 1},
+                ],
+            },
+        )
+
+    def test_upcoming_histogram_uses_resolved_price(self):
+        histogram = self.get_histogram(self.upcoming_url, {"price_from": 14000, "buckets": 1})
+        self.assertEqual(histogram["count"], 3)
+        self.assertEqual((histogram["min"], histogram["max"]), (14000, 31500))
+        self.assertEqual(len(histogram["buckets"]), 1)
+
+    def test_no_matches(self):
+        histogram = self.get_histogram(self.trips_url, {"name": "no such trip anywhere"})
+        self.assertEqual(histogram["count"], 0)
+        self.assertEqual(histogram["buckets"], [])
+
+    def test_cached_per_filter_set(self):
+        params = {"destination": self.hunza.slug, "ordering": "price"}
+        self.get_histogram(self.trips_url, params)
+        with self.assertNumQueries(1):  # the user behind the JWT
+            self.get_histogram(self.trips_url, {"destination": self.hunza.slug})
@@ -0,0 +1,80 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+import pytest
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from django_trips.api import renderers
+from django_trips.api.renderers import MessagePackRenderer, OrjsonRenderer
+from django_trips.tests.factories import AuthenticatedUserTestCase, TripFactory
+
+SAMPLE = {
+    "price": Decimal("15000.50"),
+    "start_date": date(2026, 5, 1),
+    "created": datetime(2026, 5, 1, 9, 30, 15, 123456, tzinfo=timezone.utc),
+    "duration": timedelta(days=3, hours=2),
+    "name": "Hunza\u2028Valley",
+    1: ["int keys", None, True],
+}
+
+
+@skipUnless(renderers.orjson, "orjson is not installed")
+class OrjsonRendererTestCase(TestCase):
+    def test_matches_json_renderer(self):
+        self.assertEqual(OrjsonRenderer().render(SAMPLE), JSONRenderer().render(SAMPLE))
+
+    def test_indent(self):
+        rendered = OrjsonRenderer().render(SAMPLE, "application/json; indent=2")
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(SAMPLE)))
+        self.assertIn(b"\n  ", rendered)
+
+    def test_none_renders_empty(self):
+        self.assertEqual(OrjsonRenderer().render(None), b"")
+
+
+@skipUnless(renderers.msgpack, "msgpack is not installed")
+class MessagePackRendererTestCase(TestCase):
+    def test_same_data_as_json_renderer(self):
+        unpacked = renderers.msgpack.unpackb(
+            MessagePackRenderer().render(SAMPLE), strict_map_key=False
+        )
+        expected = json.loads(JSONRenderer().render(SAMPLE))
+        expected[1] = expected.pop("1")
+        self.assertEqual(unpacked, expected)
+
+
+@pytest.mark.django_db
+class TestRendererNegotiation(AuthenticatedUserTestCase):
+    url = reverse("trips-api:trip-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        TripFactory.create_batch(2)
+
+    def test_json_is_the_default(self):
+        response = self.client.get(self.url, headers=self.headers)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json()["count"], 2)
+
+    @skipUnless(renderers.msgpack, "msgpack is not installed")
+    def test_msgpack_by_accept_header(self):
+        json_data = self.client.get(self.url, headers=self.headers).json()
+        response = self.client.get(
+            self.url, headers={**self.headers, "Accept": "application/msgpack"}
+        )
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(renderers.msgpack.unpackb(response.content), json_data)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_renderers", rows=2, repeat=2, stdout=out)
+        output = out.getvalue()
+        self.assertIn("trips: 2 rows", output)
+        self.assertIn("OrjsonRenderer", output)
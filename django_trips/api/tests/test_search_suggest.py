@@ -0,0 +1,118 @@
+"""Tests for the search-as-you-type suggestions endpoint."""
+
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from django_trips.choices import LocationType
+from django_trips.models import Category
+from django_trips.suggestions import suggestion_index
+from django_trips.tests.factories import (
+    AuthenticatedUserTestCase,
+    CategoryFactory,
+    HostFactory,
+    LocationFactory,
+    TripFactory,
+)
+
+
+@pytest.mark.django_db
+class TestSearchSuggestAPI(AuthenticatedUserTestCase):
+    url = reverse("trips-api:search-suggest")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.gilgit = LocationFactory(name="Gilgit-Baltistan", type=LocationType.PROVINCE)
+        cls.hunza = LocationFactory(name="Hunza", parent=cls.gilgit)
+        cls.trip = TripFactory(name="Hunza Valley Explorer", trip_schedule=None)
+        cls.category = CategoryFactory(name="Hiking")
+        cls.host = HostFactory(name="Hunza Guides", verified=True)
+        cls.unverified_host = HostFactory(name="Hunza Cabs", verified=False)
+
+    def setUp(self):
+        super().setUp()
+        # The index is per process, and outlives each test's rolled-back data.
+        suggestion_index.reset()
+
+    def suggest(self, q, **params):
+        response = self.client.get(self.url, {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(item["type"], item["slug"]) for item in response.json()["results"]]
+
+    def test_typed_suggestions(self):
+        response = self.client.get(self.url, {"q": "hun"})
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"type": "location", "slug": self.hunza.slug, "name": "Hunza",
+                 "region": "Gilgit-Baltistan"},
+                {"type": "host", "slug": self.host.slug, "name": "Hunza Guides", "region": None},
+                {"type": "trip", "slug": self.trip.slug, "name": "Hunza Valley Explorer",
+                 "region": None},
+            ],
+        )
+
+    def test_matches_later_words(self):
+        self.assertEqual(self.suggest("explo"), [("trip", self.trip.slug)])
+        self.assertEqual(self.suggest("valley exp"), [("trip", self.trip.slug)])
+        self.assertEqual(self.suggest("hunza "), [("host", self.host.slug), ("trip", self.trip.slug)])
+
+    def test_limit_and_empty_query(self):
+        self.assertEqual(len(self.suggest("hun", limit=1)), 1)
+        self.assertEqual(self.suggest(""), [])
+        self.assertEqual(self.suggest("-"), [])
+
+    def test_served_without_the_database(self):
+        self.suggest("hik")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest("hik"), [("category", self.category.slug)])
+
+    def test_follows_writes(self):
+        self.suggest("hik")
+        self.category.name = "Hill Walking"
+        self.category.save()
+        self.assertEqual(self.suggest("hik"), [])
+        self.assertEqual(self.suggest("hill"), [("category", self.category.slug)])
+
+        self.gilgit.name = "GB"
+        self.gilgit.save()
+        response = self.client.get(self.url, {"q": "hunza"})
+        self.assertEqual(response.json()["results"][0]["region"], "GB")
+
+        self.unverified_host.verified = True
+        self.unverified_host.save()
+        self.assertIn(("host", self.unverified_host.slug), self.suggest("hunza c"))
+
+        self.trip.delete()
+        self.assertNotIn(("trip", self.trip.slug), self.suggest("hunza"))
+
+    def test_rebuilt_after_ttl(self):
+        self.suggest("hik")
+        Category.objects.filter(pk=self.category.pk).update(name="Trekking")
+        # Rebuilt in the background, the stale index answering meanwhile.
+        with override_settings(DJANGO_TRIPS_SUGGEST_INDEX_TTL=0), mock.patch.object(
+            suggestion_index, "rebuild"
+        ) as rebuild:
+            with self.assertNumQueries(0):
+                self.assertEqual(self.suggest("trek"), [])
+                self.assertEqual(self.suggest("hik"), [("category", self.category.slug)])
+            suggestion_index.rebuild_thread.join(5)
+        rebuild.assert_called()
+
+        suggestion_index.rebuild()
+        self.assertEqual(self.suggest("trek"), [("category", self.category.slug)])
+
+    def test_inactive_hosts_left_out(self):
+        inactive_host = HostFactory(name="Hunza Tours", verified=True, is_active=False)
+        self.assertNotIn(("host", inactive_host.slug), self.suggest("hunza t"))
+
+        inactive_host.is_active = True
+        inactive_host.save()
+        self.assertIn(("host", inactive_host.slug), self.suggest("hunza t"))
+
+        self.host.is_active = False
+        self.host.save()
+        self.assertNotIn(("host", self.host.slug), self.suggest("hunza g"))
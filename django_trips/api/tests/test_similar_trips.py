@@ -0,0 +1,164 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from django_trips.choices import (BookingStatus, LocationType, PackageTier,
+                                  SimilarityKind)
+from django_trips.models import TripSimilarity
+from django_trips.similarity import SimilarityIndex
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          CategoryFactory, LocationFactory,
+                                          TripBookingFactory, TripFactory,
+                                          TripScheduleFactory,
+                                          TripWishlistFactory, UserFactory)
+
+
+class SimilarityIndexTestCase(SimpleTestCase):
+    def test_cosine_neighbours(self):
+        index = SimilarityIndex(
+            {
+                1: {"category:1": 1.0, "region:5": 1.0},
+                2: {"category:1": 1.0, "region:5": 1.0, "tag:3": 1.0},
+                3: {"category:1": 1.0},
+                4: {"tag:9": 1.0},
+            }
+        )
+        neighbours = index.neighbours(1, limit=5)
+        self.assertEqual([trip_id for trip_id, _score in neighbours], [2, 3])
+        self.assertAlmostEqual(neighbours[0][1], 2 / (2**0.5 * 3**0.5))
+        self.assertAlmostEqual(neighbours[1][1], 1 / 2**0.5)
+        self.assertEqual(index.neighbours(1, limit=1), neighbours[:1])
+        self.assertEqual(index.neighbours(4, limit=5), [])
+        self.assertEqual(index.neighbours(1, limit=5, min_shared=2), neighbours[:1])
+
+
+class TestSimilarTripsAPI(AuthenticatedUserTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        northern_areas = LocationFactory(name="Northern Areas", type=LocationType.REGION)
+        hunza = LocationFactory(name="Hunza", parent=northern_areas)
+        skardu = LocationFactory(name="Skardu", parent=northern_areas)
+        lahore = LocationFactory(name="Lahore", parent=None)
+        hiking = CategoryFactory(name="Hiking")
+        food = CategoryFactory(name="Food")
+
+        cls.trip = cls.create_trip(hunza, [hiking], days=5, price=12000)
+        cls.twin = cls.create_trip(hunza, [hiking], days=5, price=13000)
+        cls.cousin = cls.create_trip(skardu, [hiking], days=7, price=15000)
+        cls.stranger = cls.create_trip(lahore, [food], days=1, price=40000, tags=["Food"])
+        call_command("refresh_trip_similarities", stdout=StringIO())
+
+    @classmethod
+    def create_trip(cls, destination, categories, days, price, tags=("Adventure",)):
+        trip = TripFactory(
+            destination=destination,
+            categories=categories,
+            duration=timedelta(days=days),
+            tags=list(tags),
+        )
+        package = trip.packages.get(name=PackageTier.STANDARD)
+        package.base_price = price
+        package.save()
+        return trip
+
+    def get_similar(self, trip, **params):
+        url = reverse("trips-api:trip-similar", kwargs={"identifier": trip.slug})
+        response = self.client.get(url, params, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["slug"] for row in response.json()]
+
+    def test_most_similar_first(self):
+        self.assertEqual(self.get_similar(self.trip), [self.twin.slug, self.cousin.slug])
+        self.assertEqual(self.get_similar(self.stranger), [])
+        self.assertEqual(
+            list(
+                TripSimilarity.objects.filter(trip=self.cousin, kind=SimilarityKind.CONTENT)
+                .order_by("rank")
+                .values_list("similar_trip", flat=True)
+            ),
+            [self.trip.pk, self.twin.pk],
+        )
+
+    def test_single_indexed_read(self):
+        url = reverse("trips-api:trip-similar", kwargs={"identifier": self.trip.pk})
+        with self.assertNumQueries(2):  # the trip, its similar trips
+            self.client.get(url, {"fields": "name,slug"})
+
+    def test_unlisted_trips_dropped(self):
+        self.twin.is_active = False
+        self.twin.save()
+        self.assertEqual(self.get_similar(self.trip), [self.cousin.slug])
+
+        call_command("refresh_trip_similarities", stdout=StringIO())
+        self.assertFalse(TripSimilarity.objects.filter(trip=self.twin).exists())
+        self.assertFalse(TripSimilarity.objects.filter(similar_trip=self.twin).exists())
+
+    def test_limit(self):
+        call_command("refresh_trip_similarities", "--limit=1", stdout=StringIO())
+        self.assertEqual(self.get_similar(self.trip), [self.twin.slug])
+
+
+class TestAlsoLikedAPI(AuthenticatedUserTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.trip, cls.popular, cls.niche, cls.once = (
+            TripFactory(trip_schedule=None) for _ in range(4)
+        )
+        first, second, third = UserFactory.create_batch(3)
+        for user, trips in (
+            (first, [cls.trip, cls.popular, cls.once]),
+            (second, [cls.trip, cls.popular]),
+            (third, [cls.trip, cls.niche]),
+        ):
+            for trip in trips:
+                TripWishlistFactory(user=user, trip=trip)
+        # A guest's bookings count as one traveller, whatever the email's case.
+        cls.book(cls.trip, email="sam@example.com")
+        cls.book(cls.niche, email="Sam@Example.com")
+        # Cancelled bookings don't count: `once` shares only `first` with `trip`.
+        cls.book(cls.trip, email="alex@example.com", status=BookingStatus.CANCELLED)
+        cls.book(cls.once, email="alex@example.com", status=BookingStatus.CANCELLED)
+        call_command("refresh_trip_similarities", "--kind=also_liked", stdout=StringIO())
+
+    @classmethod
+    def book(cls, trip, email, status=BookingStatus.PENDING):
+        schedule = TripScheduleFactory(trip=trip, available_seats=10, booked_seats=0)
+        TripBookingFactory(
+            schedule=schedule, email=email, created_by=None, adults=1, status=status
+        )
+
+    def get_also_liked(self, trip):
+        url = reverse("trips-api:trip-also-liked", kwargs={"identifier": trip.slug})
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["slug"] for row in response.json()]
+
+    def test_most_in_common_first(self):
+        # `niche` shares a wishlist and a (heavier) booking with `trip`,
+        # `popular` two wishlists; `once` has a single traveller in common.
+        self.assertEqual(self.get_also_liked(self.trip), [self.niche.slug, self.popular.slug])
+        self.assertEqual(self.get_also_liked(self.popular), [self.trip.slug])
+        self.assertEqual(self.get_also_liked(self.once), [])
+
+    def test_batches_agree(self):
+        def stored():
+            return list(
+                TripSimilarity.objects.filter(kind=SimilarityKind.ALSO_LIKED)
+                .order_by("trip", "rank")
+                .values_list("trip", "similar_trip", "score")
+            )
+
+        rows = stored()
+        # Each batch reads only its own travellers' interactions.
+        TripSimilarity.refresh(SimilarityKind.ALSO_LIKED, batch_size=1)
+        self.assertEqual(stored(), rows)
+        self.assertFalse(
+            TripSimilarity.objects.filter(
+                kind=SimilarityKind.CONTENT, trip__in=[self.trip, self.popular]
+            ).exists()
+        )
@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from django_trips.api.fieldsets import parse_field_tree
+from django_trips.api.serializers import TripListSerializer
+from django_trips.choices import ScheduleStatus
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          TripBookingFactory, TripFactory,
+                                          TripImageFactory,
+                                          TripScheduleFactory)
+
+
+class ParseFieldTreeTestCase(TestCase):
+    def test_dotted_paths_nest(self):
+        self.assertEqual(
+            parse_field_tree("name, trip.slug,trip.host.name"),
+            {"name": {}, "trip": {"slug": {}, "host": {"name": {}}}},
+        )
+
+    def test_blank_values_are_ignored(self):
+        self.assertEqual(parse_field_tree(",, ."), {})
+        self.assertEqual(parse_field_tree(None), {})
+
+    def test_selected_field_names(self):
+        self.assertEqual(
+            TripListSerializer.get_selected_field_names(
+                {"name": {}, "host": {"name": {}}, "bogus": {}}, {"host": {}}
+            ),
+            {"name"},
+        )
+
+
+@pytest.mark.django_db
+class TestTripListSparseFieldsets(AuthenticatedUserTestCase):
+    url = reverse("trips-api:trip-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for _ in range(2):
+            trip = TripFactory(trip_schedule=None)
+            TripScheduleFactory(
+                trip=trip,
+                start_date=timezone.now().date() + timedelta(days=5),
+                end_date=timezone.now().date() + timedelta(days=10),
+                status=ScheduleStatus.PUBLISHED,
+            )
+            TripImageFactory.create_batch(2, trip=trip)
+
+    def get_results(self, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, params, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.json())
+        self.captured_queries = context.captured_queries
+        return response.json()["results"]
+
+    def test_fields_keeps_only_requested_fields(self):
+        results = self.get_results({"fields": "name,slug,trip_url"})
+        self.assertEqual(set(results[0]), {"name", "slug", "trip_url"})
+
+    def test_omit_drops_fields(self):
+        results = self.get_results({"omit": "host,schedules,description"})
+        self.assertNotIn("host", results[0])
+        self.assertNotIn("schedules", results[0])
+        self.assertIn("images", results[0])
+
+    def test_unrequested_relations_are_not_loaded(self):
+        self.get_results({})
+        full_query_count = len(self.captured_queries)
+
+        self.get_results({"fields": "name,slug"})
+        # All 7 prefetch batches (schedules, packages, reviews, images,
+        # categories, facilities, trust badges) drop out - the auth/
+        # wishlist/count/page queries stay.
+        self.assertEqual(len(self.captured_queries), full_query_count - 7)
+
+    def test_heavy_columns_are_deferred(self):
+        self.get_results({"fields": "name,slug"})
+        page_query = self.captured_queries[-1]["sql"]
+        for column in ("description", "included", "travel_tips"):
+            self.assertNotIn(f'"{column}"', page_query)
+
+    def test_description_is_loaded_when_requested(self):
+        results = self.get_results({"fields": "name,description"})
+        self.assertTrue(results[0]["description"])
+
+
+@pytest.mark.django_db
+class TestNestedSparseFieldsets(AuthenticatedUserTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.trip = TripFactory(trip_schedule=None)
+        cls.schedule = TripScheduleFactory(
+            trip=cls.trip,
+            start_date=timezone.now().date() + timedelta(days=5),
+            end_date=timezone.now().date() + timedelta(days=10),
+            status=ScheduleStatus.PUBLISHED,
+        )
+        cls.booking = TripBookingFactory(schedule=cls.schedule, created_by=cls.user)
+
+    def test_upcoming_list_selects_into_trip(self):
+        response = self.client.get(
+            reverse("trips-api:upcoming-trips-list"),
+            {"fields": "id,start_date,trip.name"},
+            headers=self.headers,
+        )
+        result = response.json()["results"][0]
+        self.assertEqual(set(result), {"id", "start_date", "trip"})
+        self.assertEqual(result["trip"], {"name": self.trip.name})
+
+    def test_upcoming_list_omits_nested_field(self):
+        response = self.client.get(
+            reverse("trips-api:upcoming-trips-list"),
+            {"omit": "trip.host,trip.schedules"},
+            headers=self.headers,
+        )
+        trip_data = response.json()["results"][0]["trip"]
+        self.assertNotIn("host", trip_data)
+        self.assertNotIn("schedules", trip_data)
+        self.assertIn("name", trip_data)
+
+    def test_booking_retrieve(self):
+        response = self.client.get(
+            reverse("trips-api:booking-detail", kwargs={"number": self.booking.number}),
+            {"fields": "number,status,schedule_details.start_date"},
+            headers=self.headers,
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                "number": self.booking.number,
+                "status": self.booking.status,
+                "schedule_details": {"start_date": self.schedule.start_date.isoformat()},
+            },
+        )
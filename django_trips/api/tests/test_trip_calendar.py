@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from django_trips.cache import get_catalog_version, get_trip_version
+from django_trips.choices import PackageTier, ScheduleStatus
+from django_trips.models import TripPackage
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          TripBookingFactory, TripFactory,
+                                          TripScheduleFactory)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestTripCalendarAPI(AuthenticatedUserTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # The first day of a month wholly in the future, so no day is past.
+        cls.month = (timezone.now().date().replace(day=1) + timedelta(days=62)).replace(day=1)
+        cls.trip = TripFactory(trip_schedule=None)
+        cls.trip.packages.filter(name=PackageTier.STANDARD).update(
+            base_price=10000, base_child_price=6000
+        )
+        TripPackage.objects.create(
+            trip=cls.trip,
+            name=PackageTier.PREMIUM,
+            base_price=16000,
+            base_child_price=9000,
+        )
+
+        def departure(day, seats_left, surcharge=0, status=ScheduleStatus.PUBLISHED):
+            start = cls.month + timedelta(days=day)
+            return TripScheduleFactory(
+                trip=cls.trip,
+                start_date=start,
+                end_date=start + timedelta(days=3),
+                available_seats=seats_left,
+                booked_seats=0,
+                additional_price=surcharge,
+                additional_child_price=surcharge,
+                status=status,
+            )
+
+        cls.weekday = departure(4, seats_left=12)
+        # Two departures on the 12th, one with a weekend surcharge.
+        departure(11, seats_left=5, surcharge=2000)
+        departure(11, seats_left=3)
+        departure(15, seats_left=20, status=ScheduleStatus.DRAFT)
+        departure(40, seats_left=20)  # next month
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_calendar(self, month=None):
+        url = reverse("trips-api:trip-calendar", kwargs={"identifier": self.trip.slug})
+        params = {"month": month.strftime("%Y-%m")} if month else {}
+        return self.client.get(url, params, headers=self.headers)
+
+    def test_days_with_seats_and_package_prices(self):
+        response = self.get_calendar(self.month)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        prices = [
+            {"package": PackageTier.STANDARD, "price": "10000", "child_price": "6000"},
+            {"package": PackageTier.PREMIUM, "price": "16000", "child_price": "9000"},
+        ]
+        self.assertEqual(
+            response.json(),
+            {
+                "month": self.month.strftime("%Y-%m"),
+                "days": [
+                    {
+                        "date": (self.month + timedelta(days=4)).isoformat(),
+                        "departures": 1,
+                        "seats_left": 12,
+                        "min_price": "10000",
+                        "prices": prices,
+                    },
+                    {
+                        # The cheaper of the day's two departures, per package.
+                        "date": (self.month + timedelta(days=11)).isoformat(),
+                        "departures": 2,
+                        "seats_left": 8,
+                        "min_price": "10000",
+                        "prices": prices,
+                    },
+                ],
+            },
+        )
+
+    def test_defaults_to_this_month(self):
+        response = self.get_calendar()
+        self.assertEqual(response.json()["month"], timezone.now().strftime("%Y-%m"))
+
+    def test_invalid_month(self):
+        url = reverse("trips-api:trip-calendar", kwargs={"identifier": self.trip.pk})
+        response = self.client.get(url, {"month": "august"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("month", response.json())
+
+    def test_cached_until_schedule_package_or_booking_changes(self):
+        self.get_calendar(self.month)
+        with self.assertNumQueries(2):  # the user and trip lookups only
+            self.get_calendar(self.month)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TripBookingFactory(schedule=self.weekday, adults=2)
+        with self.assertNumQueries(3):
+            self.get_calendar(self.month)
+
+        self.weekday.booked_seats = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            self.weekday.save()
+        first_day = self.get_calendar(self.month).json()["days"][0]
+        self.assertEqual(first_day["seats_left"], 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trip.packages.get(name=PackageTier.STANDARD).delete()
+        first_day = self.get_calendar(self.month).json()["days"][0]
+        self.assertEqual(first_day["min_price"], "16000")
+
+    def test_booking_refreshes_calendar_not_catalog(self):
+        self.get_calendar(self.month)
+        catalog_version = get_catalog_version()
+        # As a booking saves its seats - only its trip's calendar goes stale.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.weekday.booked_seats = 5
+            self.weekday.save(update_fields=["booked_seats"])
+            TripBookingFactory(schedule=self.weekday, adults=5)
+        self.assertEqual(get_catalog_version(), catalog_version)
+        first_day = self.get_calendar(self.month).json()["days"][0]
+        self.assertEqual(first_day["seats_left"], 7)
+
+    def test_booking_bumps_trip_version_once_it_commits(self):
+        trip_version = get_trip_version(self.trip.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            TripBookingFactory(schedule=self.weekday, adults=2)
+            # Bumped any sooner, a calendar read before the seat count is
+            # saved would be cached under the new version.
+            self.assertEqual(get_trip_version(self.trip.pk), trip_version)
+            self.weekday.booked_seats = 2
+            self.weekday.save(update_fields=["booked_seats"])
+        self.assertEqual(get_trip_version(self.trip.pk), trip_version + 1)
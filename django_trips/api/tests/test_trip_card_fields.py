@@ -1,15 +1,18 @@
 """Tests for the trip-card fields added to TripListSerializer/TripDetailSerializer:
 poster, images, facilities, passenger limits, starting_price, duration
-formatting, and review_summary.
+formatting, review_summary, and the capped images/schedules with
+next_departure/departures_count.
 """
 
 from datetime import timedelta
 
 import pytest
 from django.core.files.base import ContentFile
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 
-from django_trips.choices import LocationType, PackageTier
+from django_trips.choices import LocationType, PackageTier, ScheduleStatus
 from django_trips.tests.factories import (
     AuthenticatedUserTestCase,
     FacilityFactory,
@@ -19,6 +22,7 @@ from django_trips.tests.factories import (
     TripPackageFactory,
     TripReviewFactory,
     TripReviewSummaryFactory,
+    TripScheduleFactory,
 )
 from django_trips.utils import format_trip_duration
 
@@ -111,6 +115,60 @@ class TestTripCardFields(AuthenticatedUserTestCase):
         TripImageFactory(trip=other_trip)
         self.assertEqual(self.get_detail(trip)["images"], [])
 
+    @override_settings(DJANGO_TRIPS_CARD_IMAGES_LIMIT=2)
+    def test_list_images_capped_per_trip(self):
+        """A card carries only the first few images of each trip's gallery;
+        the detail endpoint still has the whole gallery."""
+        trips = [TripFactory(trip_schedule=None) for _ in range(2)]
+        for trip in trips:
+            for order in (3, 1, 2):
+                TripImageFactory(
+                    trip=trip, order=order, image=f"https://example.com/{trip.pk}-{order}.jpg"
+                )
+
+        for trip in trips:
+            self.assertEqual(
+                [image["order"] for image in self.get_list_item(trip)["images"]], [1, 2]
+            )
+        self.assertEqual(len(self.get_detail(trips[0])["images"]), 3)
+
+    # -- schedules / next_departure / departures_count ----------------------
+
+    def make_departures(self, trip, days):
+        today = timezone.now().date()
+        return [
+            TripScheduleFactory(
+                trip=trip,
+                status=ScheduleStatus.PUBLISHED,
+                start_date=today + timedelta(days=day),
+                end_date=today + timedelta(days=day + 2),
+            )
+            for day in days
+        ]
+
+    @override_settings(DJANGO_TRIPS_CARD_SCHEDULES_LIMIT=2)
+    def test_list_schedules_capped_with_next_departure_and_count(self):
+        trip = TripFactory(trip_schedule=None)
+        other_trip = TripFactory(trip_schedule=None)
+        departures = self.make_departures(trip, (30, 10, 20))
+        self.make_departures(other_trip, (5,))
+
+        card = self.get_list_item(trip)
+        self.assertEqual(
+            [schedule["id"] for schedule in card["schedules"]],
+            [departures[1].id, departures[2].id],
+        )
+        self.assertEqual(card["next_departure"], departures[1].start_date.isoformat())
+        self.assertEqual(card["departures_count"], 3)
+        self.assertEqual(self.get_list_item(other_trip)["departures_count"], 1)
+
+    def test_next_departure_none_without_departures(self):
+        trip = TripFactory(trip_schedule=None)
+        card = self.get_list_item(trip)
+        self.assertEqual(card["schedules"], [])
+        self.assertIsNone(card["next_departure"])
+        self.assertEqual(card["departures_count"], 0)
+
     # -- facilities ------------------------------------------------------
 
     def test_facilities_present_on_list_endpoint(self):
@@ -3,6 +3,7 @@ from unittest.mock import ANY
 
 import ddt
 import pytest
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -308,6 +309,17 @@ class TestTripListFiltersAPI(AuthenticatedUserTestCase):
         data = self.get_results({"category": self.honeymoon.slug})
         self.assertEqual({t["name"] for t in data}, {"Skardu Explorer"})
 
+    def test_filter_by_all_categories(self):
+        TripFactory(name="Multi Category Trip", categories=[self.hiking, self.honeymoon])
+        data = self.get_results({"category_all": f"{self.hiking.slug},{self.honeymoon.slug}"})
+        self.assertEqual({t["name"] for t in data}, {"Multi Category Trip"})
+        data = self.get_results({"category_all": self.hiking.slug})
+        self.assertEqual({t["name"] for t in data}, {"Hunza Adventure", "Multi Category Trip"})
+
+    def test_filter_by_all_with_unknown_slug(self):
+        data = self.get_results({"category_all": f"{self.hiking.slug},no-such-category"})
+        self.assertEqual(data, [])
+
     def test_filter_by_verified_host(self):
         """Both fixture trips have verified hosts, so ?verified_host=true is a no-op here -
         the meaningful case is that an unverified host's trip stays excluded (below)."""
@@ -344,6 +356,22 @@ class TestTripListFiltersAPI(AuthenticatedUserTestCase):
         names = [t["name"] for t in data]
         self.assertEqual(names, ["Skardu Explorer", "Hunza Adventure"])
 
+    def test_ordering_by_popularity(self):
+        Trip.objects.filter(pk=self.trip_skardu.pk).update(popularity=12.5)
+        Trip.objects.filter(pk=self.trip_hunza.pk).update(popularity=3)
+        names = [t["name"] for t in self.get_results({"ordering": "-popularity"})]
+        self.assertEqual(names, ["Skardu Explorer", "Hunza Adventure"])
+        with override_settings(DJANGO_TRIPS_TRIP_LIST_ORDERING=["popularity", "-id"]):
+            names = [t["name"] for t in self.get_results()]
+        self.assertEqual(names, ["Hunza Adventure", "Skardu Explorer"])
+
+        # Tied trips come back newest first, the same on every page.
+        Trip.objects.update(popularity=0)
+        slugs = [t["slug"] for t in self.get_results({"ordering": "-popularity"})]
+        self.assertEqual(
+            slugs, list(Trip.objects.active().order_by("-id").values_list("slug", flat=True))
+        )
+
     def test_no_duplicate_rows_from_multi_category_join(self):
         """A trip matching >1 filtered category shouldn't be duplicated by the join fan-out."""
         TripFactory(name="Multi Category Trip", categories=[self.hiking, self.honeymoon])
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from django_trips.choices import PackageTier
+from django_trips.tests.factories import (AuthenticatedUserTestCase,
+                                          LocationFactory, TripFactory)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestTripMapAPI(AuthenticatedUserTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.hunza = LocationFactory(name="Hunza", lat=36.32, lon=74.65)
+        cls.passu = LocationFactory(name="Passu", lat=36.48, lon=74.88)
+        cls.skardu = LocationFactory(name="Skardu", lat=35.30, lon=75.63)
+        cls.fiji = LocationFactory(name="Fiji", lat=-17.8, lon=179.9)
+        cls.hunza_trip = cls.trip(cls.hunza, 12000)
+        cls.trip(cls.passu, 9000)
+        cls.trip(cls.skardu, 15000)
+        cls.trip(cls.fiji, 30000)
+
+    @classmethod
+    def trip(cls, destination, base_price):
+        trip = TripFactory(destination=destination)
+        package = trip.packages.get(name=PackageTier.STANDARD)
+        package.base_price = base_price
+        package.save()
+        return trip
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_map(self, **params):
+        response = self.client.get(reverse("trips-api:trip-map"), params, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def clusters(self, **params):
+        clusters = self.get_map(**params)["clusters"]
+        return [(cluster["count"], cluster["min_price"]) for cluster in clusters]
+
+    def test_clusters_by_zoom(self):
+        # 90-degree cells: the Karakoram trips share one.
+        self.assertEqual(self.clusters(zoom=0), [(1, "30000"), (3, "9000")])
+        # ~0.7-degree cells: Skardu splits off.
+        self.assertEqual(self.clusters(zoom=7), [(1, "30000"), (1, "15000"), (2, "9000")])
+        # ~0.09-degree cells: every destination on its own.
+        data = self.get_map(zoom=10)
+        self.assertEqual(len(data["clusters"]), 4)
+        self.assertEqual(data["cell_size"], 90 / 2**10)
+
+    def test_centroid(self):
+        cluster = self.get_map(zoom=7, bbox="74,36,75,37")["clusters"]
+        self.assertEqual(len(cluster), 1)
+        self.assertAlmostEqual(cluster[0]["lat"], 36.4)
+        self.assertAlmostEqual(cluster[0]["lon"], 74.765)
+
+    def test_bbox(self):
+        self.assertEqual(self.clusters(zoom=7, bbox="75,35,76,36"), [(1, "15000")])
+        # Across the antimeridian.
+        self.assertEqual(self.clusters(zoom=7, bbox="170,-20,-170,-10"), [(1, "30000")])
+
+    def test_cached_per_zoom_until_catalog_changes(self):
+        self.get_map(zoom=7)
+        with self.assertNumQueries(1):  # the user lookup only
+            self.get_map(zoom=7, bbox="75,35,76,36")
+
+        self.hunza.lat, self.hunza.lon = 35.31, 75.64
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hunza.save()
+        self.assertEqual(self.clusters(zoom=7, bbox="75,35,76,36"), [(2, "12000")])
+
+        self.hunza_trip.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hunza_trip.save()
+        self.assertEqual(self.clusters(zoom=7, bbox="75,35,76,36"), [(1, "15000")])
+
+    def test_invalid_params(self):
+        url = reverse("trips-api:trip-map")
+        for params in ({"zoom": "far"}, {"bbox": "1,2,3"}, {"bbox": "0,80,10,95"}):
+            response = self.client.get(url, params, headers=self.headers)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.json())
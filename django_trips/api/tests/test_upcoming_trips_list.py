@@ -8,11 +8,13 @@ from django.core.files.base import ContentFile
 from django.urls import reverse
 from django.utils import timezone
 
-from django_trips.choices import LocationType, PackageTier
+from django_trips.choices import LocationType, PackageTier, ScheduleStatus
 from django_trips.models import TripSchedule
 from django_trips.tests.factories import (AuthenticatedUserTestCase,
                                           LocationFactory, TripFactory,
-                                          TripScheduleFactory)
+                                          TripImageFactory,
+                                          TripScheduleFactory,
+                                          TripWishlistFactory)
 
 current_time = timezone.now().date()
 seven_days_ago = current_time - timedelta(days=7)
@@ -415,3 +417,58 @@ class TestUpcomingTripsListAPI(AuthenticatedUserTestCase):
         poster = results["Uploaded Poster Town"]["poster"]
         self.assertNotEqual(poster, "https://example.com/external.jpg")
         self.assertIn("poster.jpg", poster)
+
+
+@pytest.mark.django_db
+class TestUpcomingTripsListQueryCount(AuthenticatedUserTestCase):
+    """
+    Pins `/trips/upcoming/`'s query count, like `TestTripListQueryCount`
+    does for `/trips/`: each row's trip card is loaded through one
+    `Prefetch("trip", ...)` - every distinct trip on the page once - and
+    the card relations batch-load over those trips, so adding trips (and
+    departures of the same trip) adds no queries.
+
+    12 is auth, the paginator's count, the schedule page, the trips, one
+    batch per prefetched card relation (schedules, images, packages,
+    reviews, categories, facilities, trust badges), and the user's
+    wishlist.
+    """
+
+    url = reverse("trips-api:upcoming-trips-list")
+
+    def make_trip_with_departures(self):
+        trip = TripFactory(trip_schedule=None)
+        for days in (5, 12):
+            TripScheduleFactory(
+                trip=trip,
+                start_date=current_time + timedelta(days=days),
+                end_date=current_time + timedelta(days=days + 3),
+                status=ScheduleStatus.PUBLISHED,
+            )
+        TripImageFactory.create_batch(2, trip=trip)
+        return trip
+
+    def test_query_count_does_not_scale_with_row_count(self):
+        self.make_trip_with_departures()
+        with self.assertNumQueries(12):
+            response = self.client.get(self.url, headers=self.headers)
+        self.assertEqual(response.json()["count"], 2)
+
+        wished_trip = self.make_trip_with_departures()
+        TripWishlistFactory(user=self.user, trip=wished_trip)
+        with self.assertNumQueries(12):
+            response = self.client.get(self.url, headers=self.headers)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 4)
+        self.assertEqual(
+            {row["trip"]["slug"] for row in results if row["trip"]["is_wished"]},
+            {wished_trip.slug},
+        )
+
+    def test_trip_not_loaded_when_not_selected(self):
+        self.make_trip_with_departures()
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                self.url, {"fields": "id,start_date"}, headers=self.headers
+            )
+        self.assertEqual(set(response.json()["results"][0]), {"id", "start_date"})
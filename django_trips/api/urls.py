@@ -3,8 +3,8 @@ from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
                                    SpectacularSwaggerView)
 from rest_framework.routers import DefaultRouter
 
-from django_trips.api.views import (booking, category, host, review,
-                                    testimonial, trip, trust_badge)
+from django_trips.api.views import (booking, category, home, host, review,
+                                    search, testimonial, trip, trust_badge)
 from django_trips.api.views.trip import (ActiveDestinationsWithSchedulesView,
                                          TripViewSet)
 
@@ -22,11 +22,21 @@ app_urlpatterns = [
         trip.UpcomingTripsListAPIView.as_view(),
         name="upcoming-trips-list",
     ),
+    path(
+        "trips/upcoming/price-histogram/",
+        trip.UpcomingTripsPriceHistogramView.as_view(),
+        name="upcoming-trips-price-histogram",
+    ),
     path(
         "destinations/",
         trip.ActiveDestinationsWithSchedulesView.as_view(),
         name="destinations",
     ),
+    path(
+        "destinations/<slug:slug>/calendar/",
+        trip.DestinationCalendarView.as_view(),
+        name="destination-calendar",
+    ),
     path(
         "categories/",
         category.ActiveCategoriesListAPIView.as_view(),
@@ -42,6 +52,16 @@ app_urlpatterns = [
         trust_badge.ActiveTrustBadgesListAPIView.as_view(),
         name="trust-badges",
     ),
+    path(
+        "search/suggest/",
+        search.SearchSuggestView.as_view(),
+        name="search-suggest",
+    ),
+    path(
+        "home/",
+        home.HomeView.as_view(),
+        name="home",
+    ),
     path(
         "testimonials/",
         testimonial.ActiveTestimonialsListAPIView.as_view(),
@@ -12,7 +12,9 @@ from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from django_trips.api.fieldsets import SparseFieldsetViewMixin
 from django_trips.api.filters import TripBookingFilterSet
+from django_trips.api.memo import SerializationMemoViewMixin
 from django_trips.api.paginators import TripBookingsPagination
 from django_trips.api.schema_meta import (
     booking_cancel_schema,
@@ -32,7 +34,9 @@ from django_trips.models import TripBooking
     update=booking_update_schema,
     cancel=booking_cancel_schema,
 )
-class TripBookingRetrieveUpdateViewSet(GenericViewSet, generics.RetrieveUpdateAPIView):
+class TripBookingRetrieveUpdateViewSet(
+    SparseFieldsetViewMixin, GenericViewSet, generics.RetrieveUpdateAPIView
+):
     queryset = TripBooking.objects.all()
     permission_classes = [IsAuthenticated]
     authentication_classes = [SessionAuthentication, JWTAuthentication]
@@ -79,7 +83,7 @@ class TripBookingRetrieveUpdateViewSet(GenericViewSet, generics.RetrieveUpdateAP
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TripBookingBaseViewSet(generics.GenericAPIView):
+class TripBookingBaseViewSet(SparseFieldsetViewMixin, generics.GenericAPIView):
     queryset = TripBooking.objects.all()
     permission_classes = [IsAuthenticated]
     authentication_classes = [SessionAuthentication, JWTAuthentication]
@@ -91,7 +95,9 @@ class TripBookingBaseViewSet(generics.GenericAPIView):
 
 
 @extend_schema_view(get=booking_list_schema)
-class TripBookingListView(TripBookingBaseViewSet, generics.ListAPIView):
+class TripBookingListView(
+    SerializationMemoViewMixin, TripBookingBaseViewSet, generics.ListAPIView
+):
     pagination_class = TripBookingsPagination
     permission_classes = (IsAdminUser,)
     serializer_class = TripBookingSerializer
@@ -126,7 +132,7 @@ class TripBookingCreateView(TripBookingBaseViewSet, generics.CreateAPIView):
 
 
 @extend_schema_view(get=booking_lookup_schema)
-class TripBookingLookupView(generics.RetrieveAPIView):
+class TripBookingLookupView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
     """
     Anonymous "look up my booking" endpoint.
 
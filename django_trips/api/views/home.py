@@ -0,0 +1,28 @@
+# pylint:disable=import-error
+from drf_spectacular.utils import extend_schema_view
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from django_trips.api.home import get_home
+from django_trips.api.schema_meta import home_schema
+
+
+@extend_schema_view(get=home_schema)
+class HomeView(APIView):
+    """
+    Public endpoint - no authentication required. Every landing-page
+    section in one response, the sections missing from the cache built
+    concurrently; a section that's late or fails comes back empty and
+    named under `unavailable` (see api/home.py).
+
+    Authenticates (Session and JWT) only so trip cards carry the user's `is_wished`.
+    """
+
+    authentication_classes = [SessionAuthentication, JWTAuthentication]
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        return Response(get_home(request))
@@ -0,0 +1,35 @@
+# pylint:disable=import-error
+from drf_spectacular.utils import extend_schema_view
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from django_trips.api.schema_meta import search_suggest_schema
+from django_trips.api.serializers import SearchSuggestionSerializer
+from django_trips.suggestions import suggestion_index
+
+
+@extend_schema_view(get=search_suggest_schema)
+class SearchSuggestView(APIView):
+    """
+    Public endpoint - no authentication required. Hit on every keystroke,
+    so it answers from the per-process `suggestion_index` rather than the
+    database - which is also why it authenticates no one: the default
+    JWT/session authentication would load the user from the database.
+    """
+
+    authentication_classes = []
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    default_limit = 10
+    max_limit = 25
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    def get(self, request):
+        suggestions = suggestion_index.search(request.query_params.get("q", ""), self.get_limit())
+        return Response({"results": SearchSuggestionSerializer(suggestions, many=True).data})
@@ -1,51 +1,111 @@
 # pylint:disable=import-error
-from django.db.models import Count, DecimalField, ExpressionWrapper, F, Min, Prefetch, Q
+from django.conf import settings
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Min,
+    Prefetch,
+    Q,
+)
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema_view
 from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter
-from rest_framework.generics import ListAPIView
+from rest_framework.generics import GenericAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from django_trips.api.filters import TripFilter, UpcomingTripsFilter
-from django_trips.api.paginators import CustomLimitOffsetPaginator
+from django_trips.api.cards import prefetch_trip_card_relations
+from django_trips.api.compact import CompactFormatViewMixin
+from django_trips.api.departure_calendar import (
+    get_departure_calendar,
+    parse_month,
+    upcoming_days,
+)
+from django_trips.api.fieldsets import SparseFieldsetViewMixin, get_nested_selection
+from django_trips.api.filters import (
+    StableOrderingFilter,
+    TripFilter,
+    UpcomingTripsFilter,
+)
+from django_trips.api.histogram import PriceHistogramViewMixin
+from django_trips.api.map_clusters import get_map_clusters, parse_bbox, parse_zoom
+from django_trips.api.memo import SerializationMemoViewMixin
+from django_trips.api.paginators import CachedCountLimitOffsetPaginator
 from django_trips.api.schema_meta import (
+    destination_calendar_schema,
     destinations_list_schema,
+    trip_also_liked_schema,
+    trip_calendar_schema,
     trip_list_schema,
+    trip_map_schema,
+    trip_price_histogram_schema,
     trip_retrieve_schema,
+    trip_similar_schema,
     trip_wishlist_toggle_schema,
     upcoming_trips_list_schema,
+    upcoming_trips_price_histogram_schema,
 )
 from django_trips.api.serializers import (
+    CompactTripScheduleSerializer,
+    DestinationCalendarSerializer,
     DestinationWithSchedulesSerializer,
+    TripCalendarSerializer,
     TripDetailSerializer,
     TripListSerializer,
+    TripMapSerializer,
     TripWishlistToggleSerializer,
     UpcomingTripListSerializer,
 )
-from django_trips.choices import LocationType, ScheduleStatus
+from django_trips.choices import LocationType, SimilarityKind
 from django_trips.models import (
+    DestinationDay,
     Location,
     Trip,
-    TripPackage,
-    TripReview,
     TripSchedule,
     TripWishlist,
 )
 
 
+def get_trip_list_ordering():
+    """
+    How `/trips/` is ordered without `?ordering=` - newest first unless
+    `DJANGO_TRIPS_TRIP_LIST_ORDERING` says otherwise, e.g.
+    `["-popularity", "-id"]` to rank by `Trip.popularity` by default.
+    """
+    return getattr(settings, "DJANGO_TRIPS_TRIP_LIST_ORDERING", Trip._meta.ordering)  # pylint:disable=protected-access
+
+
+def get_wished_trip_ids(user) -> set:
+    """
+    Ids of the trips `user` has wishlisted, fetched once per request for
+    the `wished_trip_ids` serializer context `get_is_wished` reads from.
+    """
+    if not user.is_authenticated:
+        return set()
+    return set(TripWishlist.objects.filter(user=user).values_list("trip_id", flat=True))
+
+
 @extend_schema_view(
     list=trip_list_schema,
     retrieve=trip_retrieve_schema,
     wishlist=trip_wishlist_toggle_schema,
+    price_histogram=trip_price_histogram_schema,
+    calendar=trip_calendar_schema,
+    map_clusters=trip_map_schema,
+    similar=trip_similar_schema,
+    also_liked=trip_also_liked_schema,
 )
-class TripViewSet(ReadOnlyModelViewSet):  # pylint:disable=too-many-ancestors
+class TripViewSet(  # pylint:disable=too-many-ancestors
+    PriceHistogramViewMixin, SparseFieldsetViewMixin, ReadOnlyModelViewSet
+):
     """
     Public, read-only catalog of Trips.
 
@@ -56,6 +116,20 @@ class TripViewSet(ReadOnlyModelViewSet):  # pylint:disable=too-many-ancestors
 
     Notes:
     - Lookup field supports ID or slug as `{id}`.
+    - `?fields=`/`?omit=` narrow the response (see api/fieldsets.py); on the
+      list, unrequested relations/columns aren't loaded at all.
+    - `/trips/price-histogram/` (trip-price-histogram) takes the list's
+      filters and returns the distribution of their starting prices (see
+      api/histogram.py).
+    - `/trips/<id>/calendar/?month=YYYY-MM` (trip-calendar) returns the
+      trip's departures in that month by day, with seats left and each
+      package's price (see api/departure_calendar.py).
+    - `/trips/<id>/similar/` (trip-similar) lists the trips most like this
+      one, and `/trips/<id>/also-liked/` (trip-also-liked) the trips its
+      travellers also wishlisted or booked - both from the precomputed
+      `TripSimilarity` table (see similarity.py).
+    - `/trips/map/?zoom=&bbox=` (trip-map) returns the listable trips
+      clustered by destination grid cell (see api/map_clusters.py).
     - List/retrieve (GET) are public. Trip management (create/update/delete) is not
       part of this surface - it lives in the tenancy-aware operator API (destipak),
       which imports TripCreateSerializer from this module directly.
@@ -73,9 +147,9 @@ class TripViewSet(ReadOnlyModelViewSet):  # pylint:disable=too-many-ancestors
     authentication_classes = [SessionAuthentication, JWTAuthentication]
     permission_classes = [IsAuthenticatedOrReadOnly]
     http_method_names = ["get", "post"]
-    pagination_class = CustomLimitOffsetPaginator
+    pagination_class = CachedCountLimitOffsetPaginator
 
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StableOrderingFilter]
     filterset_class = TripFilter
     # DRF's OrderingFilter validates/orders by the literal client-supplied term
     # (a 2-tuple only supplies a display label, it isn't an alias) so the
@@ -83,73 +157,31 @@ class TripViewSet(ReadOnlyModelViewSet):  # pylint:disable=too-many-ancestors
     # work. It's still distinct from the `starting_price` model property:
     # annotating under that name would make Django try to setattr() a value
     # onto a property with no setter, raising AttributeError per row.
-    ordering_fields = ["name", "duration", "price"]
+    ordering_fields = ["name", "duration", "price", "popularity"]
     queryset = Trip.objects.active()
 
     serializer_class = TripDetailSerializer
 
     lookup_field = "identifier"
+    price_histogram_field = "min_price"
 
     def get_queryset(self):
         queryset = super().get_queryset()
         if self.action == "list":
             # annotate() with an aggregate silently drops Trip.Meta's default
             # ordering (Django stops applying it once GROUP BY is involved),
-            # so re-assert it explicitly here. Otherwise, with no ?ordering=
-            # param, row order is whatever MySQL's query plan happens to
-            # produce for that particular filter combination — same rows,
-            # different order, from one request to the next.
+            # so re-assert it (or DJANGO_TRIPS_TRIP_LIST_ORDERING) explicitly
+            # here. Otherwise, with no ?ordering= param, row order is
+            # whatever MySQL's query plan happens to produce for that
+            # particular filter combination — same rows, different order,
+            # from one request to the next.
             queryset = (
                 queryset.annotate(price=Min("packages__base_price"))
                 .distinct()
-                .order_by(*Trip._meta.ordering)
-            )  # pylint:disable=protected-access
-            # Single-valued relations TripListSerializer renders per row
-            # (destination, its parent for Location.region, the review
-            # summary, and the host -> host.type/host.ratings chain) - safe
-            # to select_related alongside the annotate()/distinct() above
-            # since none of these add extra rows, unlike the M2M/reverse-FK
-            # relations below.
-            queryset = queryset.select_related(
-                "destination",
-                "destination__parent",
-                "host",
-                "host__type",
-                "host__ratings",
-                "review_summary",
+                .order_by(*get_trip_list_ordering())
             )
-            # Backs TripListSerializer.schedules - prefetched once per page here
-            # (to_attr caches it off each trip instance) rather than one query per
-            # row inside the serializer.
-            queryset = queryset.prefetch_related(
-                Prefetch(
-                    "schedules",
-                    queryset=TripSchedule.objects.upcoming()
-                    .filter(status=ScheduleStatus.PUBLISHED)
-                    .order_by("start_date"),
-                    to_attr="_prefetched_upcoming_schedules",
-                ),
-                # Backs TripListSerializer.get_starting_price - same to_attr
-                # trick as schedules above, since the model's starting_price
-                # property builds its own fresh `.order_by().first()` query
-                # that a plain prefetch_related("packages") wouldn't satisfy.
-                Prefetch(
-                    "packages",
-                    queryset=TripPackage.objects.order_by("base_price"),
-                    to_attr="_prefetched_packages_by_price",
-                ),
-                # Backs get_trip_review_summary_data's reviews_count - same
-                # reasoning as packages above (trip.reviews.filter(...).count()
-                # is a fresh query the ORM can't satisfy from a bare prefetch).
-                Prefetch(
-                    "reviews",
-                    queryset=TripReview.objects.filter(is_verified=True),
-                    to_attr="_prefetched_verified_reviews",
-                ),
-                "images",
-                "categories",
-                "facilities",
-                "trust_badges",
+            queryset = prefetch_trip_card_relations(
+                queryset, self.get_selected_field_names()
             )
         return queryset
 
@@ -166,14 +198,7 @@ class TripViewSet(ReadOnlyModelViewSet):  # pylint:disable=too-many-ancestors
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        user = self.request.user
-        context["wished_trip_ids"] = (
-            set(
-                TripWishlist.objects.filter(user=user).values_list("trip_id", flat=True)
-            )
-            if user.is_authenticated
-            else set()
-        )
+        context["wished_trip_ids"] = get_wished_trip_ids(self.request.user)
         return context
 
     @action(
@@ -194,9 +219,51 @@ class TripViewSet(ReadOnlyModelViewSet):  # pylint:disable=too-many-ancestors
         serializer = TripWishlistToggleSerializer({"is_wished": created})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["get"], url_path="price-histogram")
+    def price_histogram(self, request, *args, **kwargs):  # pylint:disable=unused-argument
+        """Starting-price distribution of the trips the list's filters match (api/histogram.py)."""
+        return self.price_histogram_response(request)
+
+    @action(detail=True, methods=["get"], url_path="calendar")
+    def calendar(self, request, *args, **kwargs):  # pylint:disable=unused-argument
+        """Seats and per-package prices by day for a month (api/departure_calendar.py)."""
+        month = parse_month(request.query_params.get("month"))
+        calendar_data = get_departure_calendar(self.get_object(), month)
+        return Response(TripCalendarSerializer(calendar_data).data)
+
+    def similar_trips_response(self, kind):
+        """The trip's precomputed `kind` neighbours, most similar first (similarity.py)."""
+        trip = self.get_object()
+        queryset = prefetch_trip_card_relations(
+            Trip.objects.active()
+            .filter(similar_for__trip=trip, similar_for__kind=kind)
+            .order_by("similar_for__rank"),
+            self.get_selected_field_names(),
+        )
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @action(detail=True, methods=["get"], url_path="similar")
+    def similar(self, request, *args, **kwargs):  # pylint:disable=unused-argument
+        """Trips most like this one by content (similarity.py)."""
+        return self.similar_trips_response(SimilarityKind.CONTENT)
+
+    @action(detail=True, methods=["get"], url_path="also-liked")
+    def also_liked(self, request, *args, **kwargs):  # pylint:disable=unused-argument
+        """Trips this one's travellers also wishlisted or booked (similarity.py)."""
+        return self.similar_trips_response(SimilarityKind.ALSO_LIKED)
+
+    @action(detail=False, methods=["get"], url_path="map", url_name="map")
+    def map_clusters(self, request, *args, **kwargs):  # pylint:disable=unused-argument
+        """Trips clustered by destination for a map viewport (api/map_clusters.py)."""
+        zoom = parse_zoom(request.query_params.get("zoom"))
+        bbox = parse_bbox(request.query_params.get("bbox"))
+        return Response(TripMapSerializer(get_map_clusters(zoom, bbox)).data)
+
 
 @extend_schema_view(get=upcoming_trips_list_schema)
-class UpcomingTripsListAPIView(ListAPIView):
+class UpcomingTripsListAPIView(  # pylint:disable=too-many-ancestors
+    SerializationMemoViewMixin, CompactFormatViewMixin, SparseFieldsetViewMixin, ListAPIView
+):
     """
     API view to list upcoming (not-yet-started) trip schedules with optional filtering.
 
@@ -212,16 +279,22 @@ class UpcomingTripsListAPIView(ListAPIView):
       - price_to: maximum resolved price, same basis as price_from (inclusive)
       - date_from: trips starting on or after this date (YYYY-MM-DD)
       - date_to: trips ending on or before this date (YYYY-MM-DD)
+      - date/flex_days: published departures starting within flex_days of
+        date, nearest first, each with its `date_distance` in days
+      - near/radius_km: trips whose destination or departure city is within
+        radius_km of near (lat,lon), nearest first, with their `distance_km`
       - destination: exact slug of destination (case-insensitive)
       - duration_from: minimum trip duration in days (inclusive)
       - duration_to: maximum trip duration in days (inclusive)
+      - format=compact: rows carry their trip's id, with each trip rendered
+        once under `included` (see api/compact.py)
     """
 
     authentication_classes = [SessionAuthentication, JWTAuthentication]
-    pagination_class = CustomLimitOffsetPaginator
+    pagination_class = CachedCountLimitOffsetPaginator
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StableOrderingFilter]
     filterset_class = UpcomingTripsFilter
     # Same annotation-name-must-match-ordering-field convention as
     # TripViewSet.ordering_fields/get_queryset() above - `price` here is the
@@ -233,9 +306,11 @@ class UpcomingTripsListAPIView(ListAPIView):
         "price",
         "start_date",
         "trip__duration",
+        "trip__popularity",
     ]
 
     serializer_class = UpcomingTripListSerializer
+    compact_serializer_class = CompactTripScheduleSerializer
     queryset = TripSchedule.objects.upcoming()
 
     def get_queryset(self):
@@ -243,7 +318,7 @@ class UpcomingTripsListAPIView(ListAPIView):
         # base_price plus this specific date's surcharge - packages aren't
         # date-bound, so this is the same "cheapest tier" a traveler would
         # see if they picked this date, not an arbitrary reference price.
-        return (
+        queryset = (
             super()
             .get_queryset()
             .annotate(
@@ -256,11 +331,68 @@ class UpcomingTripsListAPIView(ListAPIView):
                 )
             )
         )
+        if not self.is_compact() and "trip" in self.get_selected_field_names():
+            # Each row renders its trip as a full TripListSerializer card.
+            # Prefetching `trip` (rather than select_related) loads each
+            # distinct trip on the page once - several departures of one
+            # trip share the same instance - and lets the card's own
+            # relations batch-load over those trips exactly as on /trips/,
+            # so the page costs the same fixed number of queries whatever
+            # its size.
+            trip_field_names = TripListSerializer.get_selected_field_names(
+                *get_nested_selection(*self.get_sparse_fieldset(), "trip")
+            )
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "trip",
+                    queryset=prefetch_trip_card_relations(
+                        Trip.objects.all(), trip_field_names
+                    ),
+                )
+            )
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if "trip" in self.get_selected_field_names():
+            context["wished_trip_ids"] = get_wished_trip_ids(self.request.user)
+        return context
+
+
+@extend_schema_view(get=upcoming_trips_price_histogram_schema)
+class UpcomingTripsPriceHistogramView(PriceHistogramViewMixin, GenericAPIView):
+    """
+    Resolved-price distribution of the departures `/trips/upcoming/`'s
+    filters match (see api/histogram.py). Public endpoint - no
+    authentication required.
+    """
+
+    authentication_classes = [SessionAuthentication, JWTAuthentication]
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UpcomingTripsFilter
+    queryset = TripSchedule.objects.upcoming()
+    price_histogram_field = "resolved_price"
+
+    def get_queryset(self):
+        # UpcomingTripsFilter's price_from/price_to filter on `price`, which
+        # the list annotates from packages - the stored column is the same value.
+        return super().get_queryset().annotate(price=F("resolved_price"))
+
+    def get(self, request):
+        return self.price_histogram_response(request)
 
 
 @extend_schema_view(get=destinations_list_schema)
-class ActiveDestinationsWithSchedulesView(ListAPIView):
-    """Public endpoint - no authentication required."""
+class ActiveDestinationsWithSchedulesView(
+    SerializationMemoViewMixin, CompactFormatViewMixin, ListAPIView
+):
+    """
+    Public endpoint - no authentication required.
+
+    `?format=compact` renders each destination's schedules as rows pointing
+    at trips listed once under `included` (see api/compact.py).
+    """
 
     permission_classes = [IsAuthenticatedOrReadOnly]
     serializer_class = DestinationWithSchedulesSerializer
@@ -302,3 +434,28 @@ class ActiveDestinationsWithSchedulesView(ListAPIView):
             .prefetch_related("destination_trips", "children__destination_trips")
             .order_by("-trips_count", "name")
         )
+
+
+@extend_schema_view(get=destination_calendar_schema)
+class DestinationCalendarView(APIView):
+    """
+    Public endpoint - no authentication required.
+
+    `/destinations/<slug>/calendar/?month=YYYY-MM`: the cheapest departure
+    per day across the destination's trips (a region's rolled up from its
+    children), read off the precomputed `DestinationDay` table in one range
+    scan.
+    """
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request, slug):
+        location = get_object_or_404(Location.objects.active(), slug=slug)
+        month = parse_month(request.query_params.get("month"))
+        days = (
+            DestinationDay.objects.filter(location=location, date__range=upcoming_days(month))
+            .order_by("date")
+            .values("date", "min_price", "departures")
+        )
+        calendar_data = {"destination": slug, "month": month.strftime("%Y-%m"), "days": days}
+        return Response(DestinationCalendarSerializer(calendar_data).data)
@@ -0,0 +1,76 @@
+"""
+Catalog-wide cache versioning.
+
+Anything cached off the public catalog (list counts, etc.) is keyed under
+the current catalog version rather than deleted key by key - a write to any
+catalog model bumps the version (see the receivers in signals.py), which
+orphans every previously cached entry at once. The orphans simply age out
+under their own TTL.
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+CATALOG_VERSION_CACHE_KEY = "django_trips:catalog_version"
+
+
+def initial_version() -> int:
+    """
+    The version a cold (or evicted) version key starts from: the time in
+    microseconds. Versions only ever go up by one per write, so a key
+    evicted and restarted later lands past any version its live entries
+    were cached under - unless it was bumped more than once a microsecond
+    on average, which no catalog is written at.
+    """
+    return time.time_ns() // 1000
+
+
+def get_catalog_version() -> int:
+    """The current catalog version, starting at `initial_version()` on a cold cache."""
+    return cache.get_or_set(CATALOG_VERSION_CACHE_KEY, initial_version, timeout=None)
+
+
+def bump_catalog_version() -> None:
+    """Invalidate everything cached under the current catalog version."""
+    try:
+        cache.incr(CATALOG_VERSION_CACHE_KEY)
+    except ValueError:
+        # Evicted (or never set): restart past every earlier version.
+        cache.set(CATALOG_VERSION_CACHE_KEY, initial_version(), timeout=None)
+
+
+def trip_version_cache_key(trip_id: int) -> str:
+    return f"django_trips:trip_version:{trip_id}"
+
+
+def get_trip_version(trip_id: int) -> int:
+    """
+    A per-trip version, for caches that also go stale on writes outside the
+    catalog (e.g. a trip's bookings) without those orphaning every trip's.
+    """
+    return cache.get_or_set(trip_version_cache_key(trip_id), initial_version, timeout=None)
+
+
+def bump_trip_version(trip_id: int) -> None:
+    """Invalidate everything cached under `trip_id`'s current version."""
+    try:
+        cache.incr(trip_version_cache_key(trip_id))
+    except ValueError:
+        cache.set(trip_version_cache_key(trip_id), initial_version(), timeout=None)
+
+
+def catalog_cache_key(namespace: str, *parts) -> str:
+    """
+    Cache key for `parts` under `namespace`, scoped to the current catalog
+    version. `parts` may be any JSON-serializable values (e.g. a request
+    path plus its normalized query params) - they're hashed, so the key
+    length stays bounded regardless of how long the filter set is.
+    """
+    digest = hashlib.md5(
+        json.dumps(parts, sort_keys=True, default=str).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f"django_trips:{namespace}:v{get_catalog_version()}:{digest}"
@@ -47,6 +47,13 @@ class ScheduleStatus(models.TextChoices):
     FULL = "full", "Fully Booked"
 
 
+class SimilarityKind(models.TextChoices):
+    """What a `TripSimilarity` neighbour list is based on (see similarity.py)."""
+
+    CONTENT = "content", "Similar trips"
+    ALSO_LIKED = "also_liked", "Travellers also liked"
+
+
 class BookingStatus(models.TextChoices):
     """
     Represents the lifecycle states of a booking with allowed transitions.
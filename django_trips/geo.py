@@ -0,0 +1,86 @@
+"""
+Distance search over `Location.lat`/`lon` without a spatial extension.
+
+Every location with coordinates stores the 1-degree grid cell it falls in
+(`Location.grid_cell`, indexed). A "within R km of (lat, lon)" lookup is:
+
+1. the grid cells overlapping the circle's bounding box - an indexed
+   `grid_cell IN (...)`,
+2. the bounding box itself on `lat`/`lon`, to drop the corners of those
+   cells, and
+3. the exact great-circle (haversine) distance, computed by the database
+   as one expression over what's left (`distance_km_expression()`) -
+   plain SIN/COS/ASIN/SQRT, which MySQL has and Django registers on SQLite.
+"""
+
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Floor, Mod, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+#: Grid columns - one per degree of longitude.
+GRID_COLUMNS = 360
+
+
+def grid_cell(lat, lon):
+    """The grid cell (lat, lon) falls in - None without both coordinates."""
+    if lat is None or lon is None:
+        return None
+    return math.floor(lat + 90) * GRID_COLUMNS + math.floor(lon + 180) % GRID_COLUMNS
+
+
+def grid_cell_expression(prefix=""):
+    """`grid_cell()` as a database expression, for bulk updates."""
+    lat, lon = F(f"{prefix}lat"), F(f"{prefix}lon")
+    return Floor(lat + 90) * GRID_COLUMNS + Mod(Floor(lon + 180), GRID_COLUMNS)
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    (min_lat, max_lat, min_lon, max_lon) around the circle; the longitudes
+    may run past +/-180 (the box crosses the antimeridian), and are None
+    when the circle takes in a pole - every longitude is then in range.
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+    delta_lon = math.degrees(
+        math.asin(min(math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)), 1))
+    )
+    return min_lat, max_lat, lon - delta_lon, lon + delta_lon
+
+
+def near_q(lat, lon, radius_km, prefix=""):
+    """
+    Steps 1 and 2 (see the module docstring) - the locations at `prefix`
+    that may be within `radius_km` of (lat, lon).
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    rows = range(math.floor(min_lat + 90), math.floor(max_lat + 90) + 1)
+    if min_lon is None or max_lon - min_lon >= 360:
+        columns = range(GRID_COLUMNS)
+        lon_q = Q()
+    else:
+        columns = {
+            column % GRID_COLUMNS
+            for column in range(math.floor(min_lon + 180), math.floor(max_lon + 180) + 1)
+        }
+        lon_q = Q(**{f"{prefix}lon__range": (min_lon, max_lon)})
+        if min_lon < -180:
+            lon_q |= Q(**{f"{prefix}lon__gte": min_lon + 360})
+        if max_lon > 180:
+            lon_q |= Q(**{f"{prefix}lon__lte": max_lon - 360})
+    cells = [row * GRID_COLUMNS + column for row in rows for column in columns]
+    return Q(**{f"{prefix}grid_cell__in": cells, f"{prefix}lat__range": (min_lat, max_lat)}) & lon_q
+
+
+def distance_km_expression(lat, lon, prefix=""):
+    """Haversine distance in km from (lat, lon) to the location at `prefix`."""
+    lat1, lon1 = Radians(Value(lat, FloatField())), Radians(Value(lon, FloatField()))
+    lat2, lon2 = Radians(F(f"{prefix}lat")), Radians(F(f"{prefix}lon"))
+    half_chord = Power(Sin((lat2 - lat1) / 2), 2) + Cos(lat1) * Cos(lat2) * Power(
+        Sin((lon2 - lon1) / 2), 2
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(half_chord))
@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from django_trips.api.cards import prefetch_trip_card_relations
+from django_trips.api.renderers import MessagePackRenderer, OrjsonRenderer
+from django_trips.api.serializers import TripListSerializer, UpcomingTripListSerializer
+from django_trips.models import Trip, TripSchedule
+
+RENDERER_CLASSES = (JSONRenderer, OrjsonRenderer, MessagePackRenderer)
+
+
+class Command(BaseCommand):
+    """
+    Microbenchmark of the API renderers (api/renderers.py) on real serializer
+    output: a `/trips/`-style page of `TripListSerializer` rows and a
+    `/trips/upcoming/`-style page of `UpcomingTripListSerializer` rows, built
+    from the trips/schedules currently in the database.
+
+    Reports the best render time out of `--repeat` runs and the payload size
+    for each renderer. Serialization itself happens once, up front, and isn't
+    part of the timing.
+
+    EXAMPLE USAGE:
+        ./manage.py benchmark_renderers --rows=100 --repeat=50
+    """
+
+    help = "Compare render time and payload size of the API renderers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=100, help="rows per rendered page"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=50, help="renders timed per renderer"
+        )
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        if rows < 1 or repeat < 1:
+            raise CommandError("--rows and --repeat must be positive.")
+
+        field_names = TripListSerializer.get_selected_field_names(None, {})
+        trips = prefetch_trip_card_relations(Trip.objects.active(), field_names)[:rows]
+        schedules = TripSchedule.objects.upcoming().select_related("trip")[:rows]
+        pages = (
+            ("trips", TripListSerializer(trips, many=True).data),
+            ("upcoming", UpcomingTripListSerializer(schedules, many=True).data),
+        )
+
+        for label, data in pages:
+            self.stdout.write(f"{label}: {len(data)} rows, best of {repeat}")
+            if not data:
+                self.stdout.write("  (no rows - generate some with generate_trips)")
+                continue
+            for renderer_class in RENDERER_CLASSES:
+                self.stdout.write("  " + self.benchmark(renderer_class(), data, repeat))
+
+    @staticmethod
+    def benchmark(renderer, data, repeat):
+        name = type(renderer).__name__
+        try:
+            payload = renderer.render(data, renderer.media_type, {})
+        except Exception as error:  # pylint:disable=broad-except
+            return f"{name:<22} skipped ({error})"
+
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            renderer.render(data, renderer.media_type, {})
+            best = min(best, time.perf_counter() - started)
+        return f"{name:<22} {best * 1000:>9.3f} ms {len(payload):>10} bytes"
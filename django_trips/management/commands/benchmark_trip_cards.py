@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.serializers import ListSerializer
+
+from django_trips.api.cards import prefetch_trip_card_relations
+from django_trips.api.serializers import TripListSerializer
+from django_trips.models import Trip
+
+
+class Command(BaseCommand):
+    """
+    Microbenchmark of trip card rendering: DRF's per-instance
+    `TripListSerializer.to_representation` against the compiled fast path
+    (api/compiled.py) `TripListSerializer(many=True)` now renders through,
+    on the same prefetched page of active trips from the database.
+
+    Loading the page isn't part of the timing - only rendering it. Reports
+    the best of `--repeat` runs as rows/sec, and checks both paths agree.
+
+    EXAMPLE USAGE:
+        ./manage.py benchmark_trip_cards --rows=100 --repeat=20
+    """
+
+    help = "Compare trip card rendering rows/sec, DRF vs the compiled fast path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="trips per page")
+        parser.add_argument("--repeat", type=int, default=20, help="renders timed per path")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        if rows < 1 or repeat < 1:
+            raise CommandError("--rows and --repeat must be positive.")
+
+        field_names = TripListSerializer.get_selected_field_names(None, {})
+        trips = list(prefetch_trip_card_relations(Trip.objects.active(), field_names)[:rows])
+        if not trips:
+            raise CommandError("No active trips - generate some with generate_trips.")
+
+        serializer = TripListSerializer(many=True)
+        paths = (
+            ("TripListSerializer", lambda: ListSerializer.to_representation(serializer, trips)),
+            ("compiled", lambda: serializer.to_representation(trips)),
+        )
+        if paths[0][1]() != paths[1][1]():
+            raise CommandError("Compiled trip cards differ from TripListSerializer's.")
+
+        self.stdout.write(f"{len(trips)} trip cards, best of {repeat}")
+        for label, render in paths:
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                render()
+                best = min(best, time.perf_counter() - started)
+            self.stdout.write(f"  {label:<20} {len(trips) / best:>10.0f} rows/sec")
@@ -0,0 +1,145 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import NotSupportedError, connections
+from django.db.models import Prefetch
+# Private, but Django has no public way to get the query a prefetch runs
+# (with a sliced queryset's ROW_NUMBER() window) short of running it - this
+# is the helper its related managers' own prefetches use (Django 4.2+).
+from django.db.models.fields.related_descriptors import (  # pylint:disable=protected-access
+    _filter_prefetch_queryset,
+)
+from django.http import QueryDict
+from rest_framework.test import APIRequestFactory
+
+from django_trips.api.views.trip import (
+    ActiveDestinationsWithSchedulesView,
+    TripViewSet,
+    UpcomingTripsListAPIView,
+)
+
+#: endpoint name -> (URL shown in the output, view class, view initkwargs)
+ENDPOINTS = {
+    "trips": ("/trips/", TripViewSet, {"action_map": {"get": "list"}}),
+    "upcoming": ("/trips/upcoming/", UpcomingTripsListAPIView, {}),
+    "destinations": ("/destinations/", ActiveDestinationsWithSchedulesView, {}),
+}
+
+
+class Command(BaseCommand):
+    """
+    Prints the database's EXPLAIN plan for the queries behind each list
+    endpoint, against the current database: the filtered, ordered page
+    query exactly as the view builds it, and each reverse-FK prefetch that
+    page triggers (e.g. a trip card's `schedules`), scoped to the page's own
+    rows. Use it to check a filter/ordering combination actually hits the
+    indexes it's meant to.
+
+    EXAMPLE USAGE:
+        ./manage.py explain_queries
+        ./manage.py explain_queries --endpoint=trips --params="duration_from=3&ordering=price"
+        ./manage.py explain_queries --endpoint=upcoming --format=json
+    """
+
+    help = "Print EXPLAIN plans for each list endpoint's queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=sorted(ENDPOINTS),
+            help="endpoint(s) to explain; all of them by default",
+        )
+        parser.add_argument(
+            "--params", default="", help="query string to apply, e.g. 'name=hunza&ordering=price'"
+        )
+        parser.add_argument("--limit", type=int, default=20, help="page size")
+        parser.add_argument(
+            "--format", dest="explain_format", help="EXPLAIN output format, e.g. json/tree"
+        )
+        parser.add_argument(
+            "--analyze", action="store_true", help="EXPLAIN ANALYZE (runs the queries)"
+        )
+
+    def handle(self, *args, **options):
+        explain_options = {"format": options["explain_format"]}
+        if options["analyze"]:
+            explain_options["analyze"] = True
+
+        for name in options["endpoint"] or sorted(ENDPOINTS):
+            url, view_class, initkwargs = ENDPOINTS[name]
+            params = QueryDict(options["params"])
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"== {name}: GET {url}?{params.urlencode()}")
+            )
+            page = self.get_page_queryset(view_class, initkwargs, url, params, options["limit"])
+            self.explain(page, explain_options)
+
+            for relation, queryset in self.get_prefetch_querysets(page):
+                self.stdout.write(self.style.MIGRATE_LABEL(f"-- prefetch {relation}"))
+                self.explain(queryset, explain_options)
+
+    def explain(self, queryset, explain_options):
+        """
+        Writes `queryset`'s plan. Same as `queryset.explain()`, except the
+        EXPLAIN prefix goes on the compiled SQL rather than on the query:
+        Django compiles a window-filtered queryset (a sliced, i.e. top-N
+        per trip, prefetch) as an outer SELECT around an inner one, and
+        would put the prefix on both.
+        """
+        connection = connections[queryset.db]
+        try:
+            prefix = connection.ops.explain_query_prefix(**explain_options)
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"{prefix} {sql}", params)
+                rows = cursor.fetchall()
+        except (ValueError, NotImplementedError, NotSupportedError) as error:
+            raise CommandError(f"EXPLAIN failed: {error}") from error
+
+        # Flattened into lines the way QuerySet.explain() does it.
+        explain_format = explain_options["format"]
+        output_formatter = (
+            json.dumps if explain_format and explain_format.lower() == "json" else str
+        )
+        for row in rows:
+            if len(row) == 1 and isinstance(row[0], str):
+                self.stdout.write(row[0])
+            else:
+                self.stdout.write(" ".join(output_formatter(column) for column in row))
+
+    @staticmethod
+    def get_page_queryset(view_class, initkwargs, url, params, limit):
+        """The queryset `view_class` serves for `params`, sliced to one page."""
+        request = APIRequestFactory().get(url, params)
+        view = view_class(**initkwargs)
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        view.format_kwarg = None
+        return view.filter_queryset(view.get_queryset())[:limit]
+
+    @staticmethod
+    def get_prefetch_querysets(page):
+        """`(relation, queryset)` for each reverse-FK prefetch on `page`, scoped to its rows."""
+        model = page.model
+        prefetches = [
+            lookup
+            for lookup in page._prefetch_related_lookups  # pylint:disable=protected-access
+            if isinstance(lookup, Prefetch) or "__" not in lookup
+        ]
+        if not prefetches:
+            return
+        page_ids = list(page.values_list("pk", flat=True))
+        if not page_ids:
+            return
+        for lookup in prefetches:
+            relation = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+            field = model._meta.get_field(relation)  # pylint:disable=protected-access
+            if not field.one_to_many:
+                continue
+            queryset = getattr(lookup, "queryset", None)
+            if queryset is None:
+                queryset = field.related_model.objects.all()
+            # Scoped exactly as Django's prefetch does it - including a sliced
+            # (top-N per row) queryset's ROW_NUMBER() window.
+            yield relation, _filter_prefetch_queryset(queryset.all(), field.field.name, page_ids)
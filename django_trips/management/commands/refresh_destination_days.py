@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from django_trips.models import DestinationDay, Location
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the `DestinationDay` table behind the destination calendar.
+
+    Trip, schedule, package, host and location saves already keep it in
+    sync (signals.py); this is for after writes that skip signals - a bulk
+    `.update()` of schedule statuses, raw SQL, a data import - and for
+    re-parented locations, whose former region keeps its rows until then.
+    Run it daily too, to drop the days that have passed.
+
+    EXAMPLE USAGE:
+        ./manage.py refresh_destination_days
+        ./manage.py refresh_destination_days --batch-size=200
+    """
+
+    help = "Rebuild the cheapest-departure-per-destination-and-day table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="locations per rebuild")
+
+    def handle(self, *args, **options):
+        location_ids = list(Location.objects.order_by("pk").values_list("pk", flat=True))
+        batch_size = max(options["batch_size"], 1)
+        for start in range(0, len(location_ids), batch_size):
+            DestinationDay.refresh(location_ids[start:start + batch_size])
+        self.stdout.write(
+            f"Rebuilt {DestinationDay.objects.count()} days for {len(location_ids)} locations."
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from django_trips.models import Trip, TripOrigin
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the `TripOrigin` table behind the trips `departure` filter.
+
+    Trip, schedule and pickup saves/deletes already keep it in sync
+    (signals.py); this is for after writes that skip signals - a bulk
+    `.update()` of schedule statuses, raw SQL, a data import.
+
+    EXAMPLE USAGE:
+        ./manage.py refresh_trip_origins
+        ./manage.py refresh_trip_origins --batch-size=200
+    """
+
+    help = "Rebuild the trip -> departure/pickup location table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="trips per rebuild")
+
+    def handle(self, *args, **options):
+        trip_ids = list(Trip.objects.order_by("pk").values_list("pk", flat=True))
+        batch_size = max(options["batch_size"], 1)
+        for start in range(0, len(trip_ids), batch_size):
+            TripOrigin.refresh(trip_ids[start:start + batch_size])
+        self.stdout.write(
+            f"Rebuilt {TripOrigin.objects.count()} origins for {len(trip_ids)} trips."
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from django_trips.models import Trip
+
+
+class Command(BaseCommand):
+    """
+    Recomputes every trip's `popularity` - the score behind
+    `?ordering=popularity` - from recent bookings, wishlist adds, verified
+    reviews and departure fill rates.
+
+    Nothing keeps it current between runs, by design: schedule it, e.g.
+    hourly or nightly from cron.
+
+    EXAMPLE USAGE:
+        ./manage.py refresh_trip_popularity
+    """
+
+    help = "Recompute the popularity score trips can be ranked by"
+
+    def handle(self, *args, **options):
+        updated = Trip.objects.sync_popularity()
+        self.stdout.write(f"Recomputed popularity for {updated} trips.")
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from django_trips.choices import SimilarityKind
+from django_trips.models import TripSimilarity
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the `TripSimilarity` table behind `/trips/<id>/similar/` and
+    `/trips/<id>/also-liked/` - each listed trip's nearest neighbours by
+    categories, facilities, tags, destination, duration and price, and by
+    the travellers who wishlisted or booked both (see similarity.py).
+
+    Nothing keeps it current between runs, by design: schedule it, e.g.
+    nightly from cron.
+
+    EXAMPLE USAGE:
+        ./manage.py refresh_trip_similarities
+        ./manage.py refresh_trip_similarities --kind=also_liked
+        ./manage.py refresh_trip_similarities --limit=20 --batch-size=200
+    """
+
+    help = "Rebuild the similar-trips and travellers-also-liked tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            choices=SimilarityKind.values,
+            action="append",
+            help="which lists to rebuild (default: all)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="trips per transaction")
+        parser.add_argument(
+            "--limit", type=int, default=None, help="neighbours kept per trip"
+        )
+
+    def handle(self, *args, **options):
+        for kind in options["kind"] or SimilarityKind.values:
+            stored = TripSimilarity.refresh(
+                kind, batch_size=max(options["batch_size"], 1), limit=options["limit"]
+            )
+            self.stdout.write(f"Stored {stored} {SimilarityKind(kind).label.lower()}.")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from django_trips.models import Trip, TripTrigram
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the `TripTrigram` table behind typo-tolerant trip name search.
+
+    Trip saves already keep it in sync (signals.py); this is for after
+    writes that skip signals - a bulk `.update()` of names, raw SQL, a data
+    import.
+
+    EXAMPLE USAGE:
+        ./manage.py refresh_trip_trigrams
+        ./manage.py refresh_trip_trigrams --batch-size=200
+    """
+
+    help = "Rebuild the trip name trigram table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="trips per rebuild")
+
+    def handle(self, *args, **options):
+        trip_ids = list(Trip.objects.order_by("pk").values_list("pk", flat=True))
+        batch_size = max(options["batch_size"], 1)
+        for start in range(0, len(trip_ids), batch_size):
+            TripTrigram.refresh(trip_ids[start:start + batch_size])
+        self.stdout.write(
+            f"Rebuilt {TripTrigram.objects.count()} trigrams for {len(trip_ids)} trips."
+        )
@@ -0,0 +1,92 @@
+"""Test the explain_queries command and the query plans it reports."""
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from django_trips.models import Trip, TripPackage, TripReview, TripSchedule
+from django_trips.tests import factories
+
+
+class ExplainQueriesCommandTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for days in (3, 5, 8):
+            factories.TripFactory(duration=timedelta(days=days))
+
+    def run_explain_queries_command(self, *args, **kwargs):
+        out = StringIO()
+        call_command("explain_queries", *args, stdout=out, no_color=True, **kwargs)
+        return out.getvalue()
+
+    def test_explains_every_endpoint(self):
+        output = self.run_explain_queries_command()
+        for heading in (
+            "== trips: GET /trips/?",
+            "== upcoming: GET /trips/upcoming/?",
+            "== destinations: GET /destinations/?",
+            "-- prefetch schedules",
+        ):
+            self.assertIn(heading, output)
+
+    def test_applies_params(self):
+        output = self.run_explain_queries_command(
+            endpoint=["trips"], params="duration_from=4&ordering=price"
+        )
+        self.assertIn("== trips: GET /trips/?duration_from=4&ordering=price", output)
+        self.assertNotIn("== upcoming", output)
+
+    def test_unsupported_explain_option(self):
+        if connection.vendor == "mysql":
+            self.skipTest("MySQL supports EXPLAIN ANALYZE")
+        with self.assertRaises(CommandError):
+            self.run_explain_queries_command(endpoint=["upcoming"], analyze=True)
+
+
+class IndexPackTestCase(TestCase):
+    """The composite indexes exist in the database with their columns in order."""
+
+    def assert_index(self, model, columns):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+        self.assertIn(
+            columns,
+            [constraint["columns"] for constraint in constraints.values() if constraint["index"]],
+        )
+
+    def test_indexes(self):
+        self.assert_index(TripSchedule, ["trip_id", "status", "start_date"])
+        self.assert_index(Trip, ["is_active", "host_id", "created_at"])
+        self.assert_index(Trip, ["duration_days"])
+        self.assert_index(TripPackage, ["trip_id", "base_price"])
+        self.assert_index(TripReview, ["trip_id", "is_verified", "created_at"])
+
+
+@skipUnless(connection.vendor == "sqlite", "asserts on SQLite's EXPLAIN QUERY PLAN output")
+class QueryPlanTestCase(TestCase):
+    """Plan regressions: the hot query shapes keep hitting their indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        factories.TripFactory.create_batch(3)
+
+    def get_plan(self, *args, **kwargs):
+        out = StringIO()
+        call_command("explain_queries", *args, stdout=out, no_color=True, **kwargs)
+        return out.getvalue()
+
+    def test_schedules_prefetch_uses_composite_index(self):
+        plan = self.get_plan(endpoint=["trips"])
+        schedules_plan = plan.split("-- prefetch schedules")[1].split("-- prefetch")[0]
+        self.assertIn(TripSchedule._meta.indexes[0].name, schedules_plan)
+
+    def test_duration_filter_uses_duration_days_index(self):
+        plan = self.get_plan(endpoint=["trips"], params="duration_from=3&duration_to=9")
+        trips_plan = plan.split("-- prefetch")[0]
+        self.assertIn("duration_days", trips_plan)
+        self.assertRegex(trips_plan, r"USING INDEX \w*duration_days\w*")
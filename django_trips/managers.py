@@ -1,7 +1,29 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
 from django.utils import timezone
 from django.utils.timezone import now
 
+from django_trips.choices import BookingStatus, ScheduleStatus, TripStatus
+from django_trips.geo import grid_cell_expression
+
 
 class ActiveQuerySet(models.QuerySet):
     def active(self):
@@ -9,12 +31,205 @@ class ActiveQuerySet(models.QuerySet):
 
 
 class LocationQuerySet(ActiveQuerySet):
-    pass
+    def sync_grid_cells(self):
+        """
+        Recomputes `grid_cell` from `lat`/`lon` for every location in this
+        queryset, in one UPDATE - for bulk writes that bypass save().
+        """
+        self.filter(Q(lat__isnull=True) | Q(lon__isnull=True)).update(grid_cell=None)
+        return self.filter(lat__isnull=False, lon__isnull=False).update(
+            grid_cell=grid_cell_expression()
+        )
 
 
 class TripQuerySet(ActiveQuerySet):
     def active(self):
-        return super().active().filter(host__verified=True)
+        """
+        Trips the public catalog lists - one indexed column, see
+        `Trip.is_listable` - rather than joining Host for `verified` on
+        every catalog query.
+        """
+        return self.filter(is_listable=True)
+
+    def sync_listable(self):
+        """
+        Recomputes `is_listable` for every trip in this queryset in one
+        set-based UPDATE - for writes that bypass `Trip.save()`: a Host's
+        `verified` changing, or a bulk `.update()` of `is_active`/`status`.
+        """
+        host_model = self.model._meta.get_field("host").related_model  # pylint:disable=protected-access
+        host_verified = Exists(host_model.objects.filter(pk=OuterRef("host_id"), verified=True))
+        return self.update(
+            is_listable=Case(
+                When(Q(is_active=True, status=TripStatus.PUBLISHED) & Q(host_verified), then=True),
+                default=False,
+            )
+        )
+
+    def sync_prices(self):
+        """
+        Recomputes `min_price` for every trip in this queryset, then the
+        `resolved_price` of their schedules - two set-based UPDATEs, for a
+        package write (signals.py) or a bulk `.update()` of package prices.
+        """
+        package_model = self.model._meta.get_field("packages").related_model  # pylint:disable=protected-access
+        schedule_model = self.model._meta.get_field("schedules").related_model  # pylint:disable=protected-access
+        cheapest = (
+            package_model.objects.filter(trip=OuterRef("pk"))
+            .order_by("base_price")
+            .values("base_price")[:1]
+        )
+        updated = self.update(min_price=Subquery(cheapest))
+        schedule_model.objects.filter(trip__in=self.values("pk")).sync_prices()
+        return updated
+
+    def sync_popularity(self, as_of=None):
+        """
+        Recomputes `popularity` (see `Trip.popularity`) for every trip in
+        this queryset, as of `as_of` (default: now), in one UPDATE - each
+        signal a correlated aggregate subquery. Meant for a periodic batch
+        job (`./manage.py refresh_trip_popularity`), not per write.
+        """
+        as_of = as_of or timezone.now()
+        half_life_days = get_popularity_half_life_days()
+        weights = get_popularity_weights()
+        schedule_model = self.model._meta.get_field("schedules").related_model  # pylint:disable=protected-access
+        booking_model = schedule_model._meta.get_field("bookings").related_model  # pylint:disable=protected-access
+        wishlist_model = self.model._meta.get_field("wishlisted_by").related_model  # pylint:disable=protected-access
+        review_model = self.model._meta.get_field("reviews").related_model  # pylint:disable=protected-access
+
+        bookings = (
+            booking_model.objects.filter(schedule__trip=OuterRef("pk"))
+            .exclude(status=BookingStatus.CANCELLED)
+            .values("schedule__trip")
+            .annotate(score=Sum(decay_weight("created", as_of, half_life_days)))
+            .values("score")
+        )
+        wishlist_adds = (
+            wishlist_model.objects.filter(trip=OuterRef("pk"))
+            .values("trip")
+            .annotate(score=Sum(decay_weight("created_at", as_of, half_life_days)))
+            .values("score")
+        )
+        # Average overall rating (1-5) scaled to 0-1, damped towards 0 while
+        # there are few verified reviews to go on.
+        review_count = Cast(Count("pk"), FloatField())
+        reviews = (
+            review_model.objects.filter(trip=OuterRef("pk"), is_verified=True)
+            .values("trip")
+            .annotate(
+                score=Avg("overall", output_field=FloatField())
+                / 5
+                * review_count
+                / (review_count + POPULARITY_REVIEW_PRIOR)
+            )
+            .values("score")
+        )
+        fill_rate = (
+            schedule_model.objects.filter(
+                trip=OuterRef("pk"),
+                status=ScheduleStatus.PUBLISHED,
+                start_date__gte=as_of.date(),
+                available_seats__gt=0,
+            )
+            .values("trip")
+            .annotate(
+                score=Cast(Sum("booked_seats"), FloatField())
+                / Cast(Sum("available_seats"), FloatField())
+            )
+            .values("score")
+        )
+
+        def weighted(subquery, signal):
+            return Coalesce(
+                Subquery(subquery, output_field=FloatField()), Value(0.0)
+            ) * Value(float(weights[signal]))
+
+        return self.update(
+            popularity=weighted(bookings, "bookings")
+            + weighted(wishlist_adds, "wishlist_adds")
+            + weighted(reviews, "reviews")
+            + weighted(fill_rate, "fill_rate")
+        )
+
+    def sync_members(self, *relations):
+        """
+        Rebuilds the `Trip.MEMBER_FIELDS` columns of `relations` (all of
+        them by default) for every trip in this queryset - for M2M writes
+        that bypass m2m_changed, e.g. deleting a Facility (see signals.py)
+        or a raw through table import. One query per relation plus a bulk UPDATE.
+        """
+        relations = relations or tuple(self.model.MEMBER_FIELDS)
+        trip_ids = list(self.values_list("pk", flat=True))
+        rows = {trip_id: self.model(pk=trip_id) for trip_id in trip_ids}
+        for relation in relations:
+            field = self.model._meta.get_field(relation)  # pylint:disable=protected-access
+            source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+            members = defaultdict(list)
+            for trip_id, member_id in field.remote_field.through.objects.filter(
+                **{f"{source}__in": trip_ids}
+            ).values_list(f"{source}_id", f"{target}_id"):
+                members[trip_id].append(member_id)
+            for trip_id, row in rows.items():
+                setattr(row, self.model.MEMBER_FIELDS[relation], encode_members(members[trip_id]))
+        fields = [self.model.MEMBER_FIELDS[relation] for relation in relations]
+        return self.model.objects.bulk_update(rows.values(), fields, batch_size=500)
+
+
+#: What each popularity signal is worth: per (time-decayed) booking and
+#: wishlist add, and for a perfect review score / fully booked departures.
+POPULARITY_WEIGHTS = {"bookings": 3, "wishlist_adds": 1, "reviews": 10, "fill_rate": 10}
+#: Verified reviews at which the review signal reaches half its weight.
+POPULARITY_REVIEW_PRIOR = 5
+#: Time decay halves a booking/wishlist add's weight in this many steps.
+POPULARITY_DECAY_STEPS = 6
+
+
+def get_popularity_weights():
+    return {**POPULARITY_WEIGHTS, **getattr(settings, "DJANGO_TRIPS_POPULARITY_WEIGHTS", {})}
+
+
+def get_popularity_half_life_days():
+    return getattr(settings, "DJANGO_TRIPS_POPULARITY_HALF_LIFE_DAYS", 14)
+
+
+def decay_weight(field, as_of, half_life_days):
+    """
+    What a row created at `field` counts for as of `as_of`: 1 within the
+    first half-life, halving with each further one, and 0 past
+    `POPULARITY_DECAY_STEPS` of them - a stepped exponential decay, as a
+    CASE over date cut-offs every database can evaluate.
+    """
+    return Case(
+        *(
+            When(
+                **{f"{field}__gte": as_of - timedelta(days=half_life_days * step)},
+                then=Value(0.5 ** (step - 1)),
+            )
+            for step in range(1, POPULARITY_DECAY_STEPS + 1)
+        ),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def encode_members(ids):
+    """
+    `ids` as a `Trip.*_members` column value: sorted, comma-delimited and
+    comma-wrapped (",3,7,12,"), so every id - first and last included - can
+    be tested with one `contains` of `member_token(id)`.
+    """
+    return f",{','.join(str(pk) for pk in sorted(set(ids)))}," if ids else ""
+
+
+def decode_members(value):
+    """The ids in a `Trip.*_members` column value - `encode_members()` reversed."""
+    return [int(pk) for pk in value.strip(",").split(",") if pk]
+
+
+def member_token(pk):
+    """What a `Trip.*_members` column contains when `pk` is a member."""
+    return f",{pk},"
 
 
 class TestimonialQuerySet(ActiveQuerySet):
@@ -29,6 +244,15 @@ class TripScheduleQuerySet(models.QuerySet):
     def upcoming(self):
         return self.filter(start_date__gte=now())
 
+    def sync_prices(self):
+        """
+        Recomputes `resolved_price` (the trip's `min_price` plus
+        `additional_price`) for every schedule in this queryset, in one UPDATE.
+        """
+        trip_model = self.model._meta.get_field("trip").related_model  # pylint:disable=protected-access
+        min_price = trip_model.objects.filter(pk=OuterRef("trip_id")).values("min_price")[:1]
+        return self.update(resolved_price=Subquery(min_price) + F("additional_price"))
+
 
 class HostManager(models.QuerySet):
     def active(self):
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:37
+
+from django.db import migrations, models
+
+
+def backfill_duration_days(apps, schema_editor):
+    """`Trip.save()` keeps `duration_days` in sync going forward; fill it in
+    for the trips that already exist."""
+    Trip = apps.get_model("django_trips", "Trip")
+    trips = []
+    for trip in Trip.objects.exclude(duration=None).only("id", "duration").iterator():
+        trip.duration_days = trip.duration.days
+        trips.append(trip)
+    Trip.objects.bulk_update(trips, ["duration_days"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0013_tripstatusevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='duration_days',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_duration_days, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['is_active', 'host', 'created_at'], name='django_trip_is_acti_8de1cb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trippackage',
+            index=models.Index(fields=['trip', 'base_price'], name='django_trip_trip_id_46fd8a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tripreview',
+            index=models.Index(fields=['trip', 'is_verified', 'created_at'], name='django_trip_trip_id_9d91b1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tripschedule',
+            index=models.Index(fields=['trip', 'status', 'start_date'], name='django_trip_trip_id_5069fc_idx'),
+        ),
+    ]
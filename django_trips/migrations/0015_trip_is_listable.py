@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:55
+
+from django.db import migrations, models
+
+
+def backfill_is_listable(apps, schema_editor):
+    """`Trip.save()` and the Host signal keep `is_listable` in sync going
+    forward; set it for the trips that already exist."""
+    Trip = apps.get_model("django_trips", "Trip")
+    Trip.objects.filter(is_active=True, status="PUBLISHED", host__verified=True).update(
+        is_listable=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0014_index_pack_and_trip_duration_days'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='is_listable',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(backfill_is_listable, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['is_listable', 'created_at'], name='django_trip_is_list_4b9b73_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:59
+
+from django.db import migrations, models
+from django.db.models import Case, F, When
+
+
+def backfill_seats_left(apps, schema_editor):
+    """`TripSchedule.save()` keeps `seats_left` in sync going forward; set it
+    for the schedules that already exist, in one UPDATE."""
+    TripSchedule = apps.get_model("django_trips", "TripSchedule")
+    TripSchedule.objects.update(
+        seats_left=Case(
+            When(
+                available_seats__gt=F("booked_seats"),
+                then=F("available_seats") - F("booked_seats"),
+            ),
+            default=0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0015_trip_is_listable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tripschedule',
+            name='seats_left',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_seats_left, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tripschedule',
+            index=models.Index(fields=['status', 'seats_left'], name='django_trip_status_9f7c62_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_trip_origins(apps, schema_editor):
+    """Signals keep `TripOrigin` in sync going forward (`TripOrigin.refresh()`);
+    build it for the trips that already exist - same rows, computed here on
+    the historical models."""
+    Trip = apps.get_model("django_trips", "Trip")
+    TripOrigin = apps.get_model("django_trips", "TripOrigin")
+    TripPickupLocation = apps.get_model("django_trips", "TripPickupLocation")
+
+    latest_departures = {
+        (pickup["schedule__trip"], pickup["location"]): pickup["latest_departure"]
+        for pickup in TripPickupLocation.objects.filter(schedule__status="published")
+        .values("schedule__trip", "location")
+        .annotate(latest_departure=models.Max("schedule__start_date"))
+    }
+    for trip_id, departure_id in Trip.objects.filter(departure__isnull=False).values_list(
+        "pk", "departure"
+    ):
+        latest_departures[(trip_id, departure_id)] = None
+    TripOrigin.objects.bulk_create(
+        (
+            TripOrigin(trip_id=trip_id, location_id=location_id, latest_departure=latest)
+            for (trip_id, location_id), latest in latest_departures.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0016_schedule_seats_left'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripOrigin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latest_departure', models.DateField(blank=True, null=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='origin_trips', to='django_trips.location')),
+                ('trip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='origins', to='django_trips.trip')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['location', 'latest_departure'], name='django_trip_locatio_a4f8e2_idx')],
+                'unique_together': {('trip', 'location')},
+            },
+        ),
+        migrations.RunPython(backfill_trip_origins, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:09
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+MEMBER_FIELDS = {
+    "facilities": "facility_members",
+    "trust_badges": "trust_badge_members",
+    "categories": "category_members",
+    "locations": "location_members",
+}
+
+
+def backfill_trip_members(apps, schema_editor):
+    """m2m_changed keeps the `*_members` columns in sync going forward
+    (`TripQuerySet.sync_members()`); fill them for the trips that already
+    exist - same ",3,7," encoding, computed on the historical models."""
+    Trip = apps.get_model("django_trips", "Trip")
+    members = defaultdict(lambda: defaultdict(list))
+    for relation in MEMBER_FIELDS:
+        field = Trip._meta.get_field(relation)
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        for trip_id, member_id in field.remote_field.through.objects.values_list(
+            f"{source}_id", f"{target}_id"
+        ):
+            members[trip_id][relation].append(member_id)
+
+    trips = []
+    for trip_id, relations in members.items():
+        trip = Trip(pk=trip_id)
+        for relation, ids in relations.items():
+            setattr(trip, MEMBER_FIELDS[relation], f",{','.join(map(str, sorted(set(ids))))},")
+        trips.append(trip)
+    Trip.objects.bulk_update(trips, list(MEMBER_FIELDS.values()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0017_trip_origins'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='category_members',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='facility_members',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='location_members',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='trust_badge_members',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_trip_members, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:22
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def trigrams(text):
+    """`django_trips.trigrams.trigrams()` as of this migration."""
+    words = re.findall(r"[^\W_]+", (text or "").lower())
+    if len(words) > 1:
+        words.append("".join(words))
+    grams = set()
+    for word in words:
+        padded = f"$${word}$"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def backfill_trip_trigrams(apps, schema_editor):
+    """Trip saves keep `TripTrigram` in sync going forward
+    (`TripTrigram.refresh()`); index the names of the trips that already
+    exist."""
+    Trip = apps.get_model("django_trips", "Trip")
+    TripTrigram = apps.get_model("django_trips", "TripTrigram")
+    TripTrigram.objects.bulk_create(
+        (
+            TripTrigram(trip_id=trip_id, trigram=gram)
+            for trip_id, name in Trip.objects.values_list("pk", "name").iterator()
+            for gram in trigrams(name)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0018_trip_members'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('trip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='django_trips.trip')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trigram', 'trip'], name='django_trip_trigram_997d9c_idx')],
+                'unique_together': {('trip', 'trigram')},
+            },
+        ),
+        migrations.RunPython(backfill_trip_trigrams, migrations.RunPython.noop),
+    ]
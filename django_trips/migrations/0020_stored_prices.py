@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:35
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def backfill_prices(apps, schema_editor):
+    """Package writes and saves keep `Trip.min_price`/`TripSchedule.resolved_price`
+    in sync going forward (`TripQuerySet.sync_prices()`); set them for what
+    already exists, in two UPDATEs."""
+    Trip = apps.get_model("django_trips", "Trip")
+    TripPackage = apps.get_model("django_trips", "TripPackage")
+    TripSchedule = apps.get_model("django_trips", "TripSchedule")
+    Trip.objects.update(
+        min_price=Subquery(
+            TripPackage.objects.filter(trip=OuterRef("pk"))
+            .order_by("base_price")
+            .values("base_price")[:1]
+        )
+    )
+    TripSchedule.objects.update(
+        resolved_price=Subquery(
+            Trip.objects.filter(pk=OuterRef("trip_id")).values("min_price")[:1]
+        )
+        + F("additional_price")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0019_trip_trigrams'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='min_price',
+            field=models.DecimalField(blank=True, decimal_places=0, editable=False, max_digits=7, null=True),
+        ),
+        migrations.AddField(
+            model_name='tripschedule',
+            name='resolved_price',
+            field=models.DecimalField(blank=True, decimal_places=0, editable=False, max_digits=8, null=True),
+        ),
+        migrations.RunPython(backfill_prices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0020_stored_prices'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tripschedule',
+            index=models.Index(fields=['status', 'start_date'], name='django_trip_status_542797_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_destination_days(apps, schema_editor):
+    """Signals keep `DestinationDay` in sync going forward
+    (`DestinationDay.refresh()`); build it for the departures that already
+    exist - same rows, computed here on the historical models."""
+    DestinationDay = apps.get_model("django_trips", "DestinationDay")
+    Location = apps.get_model("django_trips", "Location")
+    TripSchedule = apps.get_model("django_trips", "TripSchedule")
+
+    regions = set(Location.objects.filter(type="REGION").values_list("pk", flat=True))
+    departures = (
+        TripSchedule.objects.filter(
+            trip__destination__isnull=False,
+            trip__is_listable=True,
+            status="published",
+            start_date__gte=timezone.now().date(),
+            resolved_price__isnull=False,
+        )
+        .values("trip__destination", "trip__destination__parent", "start_date")
+        .annotate(min_price=models.Min("resolved_price"), departures=models.Count("pk"))
+    )
+    days = {}
+    for row in departures:
+        targets = {row["trip__destination"]}
+        if row["trip__destination__parent"] in regions:
+            targets.add(row["trip__destination__parent"])
+        for location_id in targets:
+            day = days.setdefault(
+                (location_id, row["start_date"]),
+                DestinationDay(
+                    location_id=location_id, date=row["start_date"], min_price=row["min_price"]
+                ),
+            )
+            day.min_price = min(day.min_price, row["min_price"])
+            day.departures += row["departures"]
+    DestinationDay.objects.bulk_create(days.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0021_schedule_status_start_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DestinationDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('min_price', models.DecimalField(decimal_places=0, max_digits=8)),
+                ('departures', models.PositiveIntegerField(default=0)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_days', to='django_trips.location')),
+            ],
+            options={
+                'unique_together': {('location', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_destination_days, migrations.RunPython.noop),
+    ]
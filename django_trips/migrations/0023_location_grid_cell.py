@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:02
+
+import math
+
+from django.db import migrations, models
+
+#: `django_trips.geo.GRID_COLUMNS` as of this migration.
+GRID_COLUMNS = 360
+
+
+def grid_cell(lat, lon):
+    """`django_trips.geo.grid_cell()` as of this migration."""
+    if lat is None or lon is None:
+        return None
+    return math.floor(lat + 90) * GRID_COLUMNS + math.floor(lon + 180) % GRID_COLUMNS
+
+
+def backfill_grid_cells(apps, schema_editor):
+    """`Location.save()` keeps `grid_cell` in sync going forward; compute it
+    for the locations that already have coordinates."""
+    Location = apps.get_model("django_trips", "Location")
+    locations = list(Location.objects.filter(lat__isnull=False, lon__isnull=False))
+    for location in locations:
+        location.grid_cell = grid_cell(location.lat, location.lon)
+    Location.objects.bulk_update(locations, ["grid_cell"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0022_destination_days'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='grid_cell',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['grid_cell'], name='django_trip_grid_ce_a4df35_idx'),
+        ),
+        migrations.RunPython(backfill_grid_cells, migrations.RunPython.noop),
+    ]
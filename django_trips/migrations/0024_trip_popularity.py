@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0023_location_grid_cell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='popularity',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['is_listable', 'popularity'], name='django_trip_is_list_726f4e_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0024_trip_popularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Cosine similarity, 0-1')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('similar_trip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_for', to='django_trips.trip')),
+                ('trip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='django_trips.trip')),
+            ],
+            options={
+                'verbose_name_plural': 'Trip similarities',
+                'unique_together': {('trip', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_trips', '0025_trip_similarities'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='tripsimilarity',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='tripsimilarity',
+            name='kind',
+            field=models.CharField(choices=[('content', 'Similar trips'), ('also_liked', 'Travellers also liked')], default='content', max_length=20),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tripsimilarity',
+            unique_together={('trip', 'kind', 'rank')},
+        ),
+    ]
@@ -1,10 +1,12 @@
 """Core data models for the app."""
 
+import math
 import random
 
 # pylint:disable=consider-using-from-import,missing-class-docstring,missing-function-docstring,no-member
 from datetime import UTC, datetime
 from datetime import timedelta
+from decimal import Decimal
 
 from config_models.models import ConfigurationModel
 from django.conf import settings
@@ -25,9 +27,21 @@ from django_trips.choices import (
     LocationType,
     PackageTier,
     ScheduleStatus,
+    SimilarityKind,
     TripStatus,
 )
+from django_trips.geo import grid_cell
 from django_trips.mixins import SlugMixin
+from django_trips.similarity import (
+    SimilarityIndex,
+    co_travelled,
+    get_also_liked_min_travellers,
+    get_similar_trips_limit,
+    interaction_norms,
+    interaction_vectors,
+    trip_vectors,
+)
+from django_trips.trigrams import SIMILARITY_THRESHOLD, trigrams
 
 
 class HostType(models.Model):
@@ -137,6 +151,9 @@ class Location(SlugMixin, models.Model):
         blank=True,
         help_text="Longitude coordinate in decimal degrees (WGS84)",
     )
+    # The 1-degree grid cell `lat`/`lon` fall in (see geo.py), kept in sync
+    # by save() - the indexed prefilter behind the `near` filters.
+    grid_cell = models.PositiveIntegerField(null=True, blank=True, editable=False)
     type = models.CharField(
         max_length=100,
         choices=LocationType.choices,
@@ -182,6 +199,14 @@ class Location(SlugMixin, models.Model):
         ordering = ["name"]
         verbose_name = "Trip Location"
         verbose_name_plural = "Trip Locations"
+        indexes = [models.Index(fields=["grid_cell"])]
+
+    def save(self, *args, **kwargs):
+        self.grid_cell = grid_cell(self.lat, self.lon)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"lat", "lon"} & set(update_fields):
+            kwargs["update_fields"] = set(update_fields) | {"grid_cell"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return str(self.name)
@@ -310,7 +335,7 @@ class Category(SlugMixin, models.Model):
         return f"<Category: {self.name} slug: {self.slug}>"
 
 
-class Trip(SlugMixin, models.Model):
+class Trip(SlugMixin, models.Model):  # pylint:disable=too-many-instance-attributes
     """
     Trip model
 
@@ -374,6 +399,13 @@ class Trip(SlugMixin, models.Model):
         blank=True,
         help_text="Format: DD HH:MM:SS (e.g., '5 00:00:00' for 5 days)",
     )
+    # Whole days of `duration`, kept in sync by save(). DurationField is stored
+    # as microseconds (a bigint on MySQL) - filters narrow on this indexed
+    # integer first (see TimedeltaFromDaysFilter), then apply the exact
+    # `duration` comparison to what's left.
+    duration_days = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, db_index=True
+    )
     passenger_limit_min = models.PositiveIntegerField(
         default=0, null=True, blank=True, help_text="0 means no minimum requirement"
     )
@@ -451,6 +483,35 @@ class Trip(SlugMixin, models.Model):
         default=TripStatus.PUBLISHED,
         help_text="Editorial state (draft/published) - independent of is_active",
     )
+    # Denormalized `is_active and status == PUBLISHED and host.verified` -
+    # what Trip.objects.active() (i.e. every public catalog query) filters on,
+    # so none of them has to join Host. Kept in sync by save() below, by a
+    # Host save (signals.py) and by TripQuerySet.sync_listable() after bulk
+    # updates. Indexed together with created_at in Meta.indexes.
+    is_listable = models.BooleanField(default=False, editable=False)
+    # Denormalized membership of the facilities/trust_badges/categories/
+    # locations M2Ms, as delimited ids (see `encode_members`), so the
+    # "matches all of" filters (`?facility_all=` etc.) test one column per
+    # required item rather than joining the M2M once per item. Kept in sync
+    # from m2m_changed (signals.py); TripQuerySet.sync_members() rebuilds
+    # them after writes that skip it.
+    facility_members = models.TextField(default="", blank=True, editable=False)
+    trust_badge_members = models.TextField(default="", blank=True, editable=False)
+    category_members = models.TextField(default="", blank=True, editable=False)
+    location_members = models.TextField(default="", blank=True, editable=False)
+    # Cheapest package's `base_price` - the price a trip card starts at.
+    # Stored so the price histogram (api/histogram.py) groups one column
+    # rather than aggregating packages per trip. Kept in sync by save()
+    # below and by package writes (signals.py, TripQuerySet.sync_prices()).
+    min_price = models.DecimalField(
+        max_digits=7, decimal_places=0, null=True, blank=True, editable=False
+    )
+    # Ranking score from recent bookings and wishlist adds (time-decayed),
+    # verified reviews and how full upcoming departures are - behind
+    # `?ordering=popularity`. Recomputed in bulk by a periodic batch job
+    # (`refresh_trip_popularity`, TripQuerySet.sync_popularity()), not on
+    # each write. Indexed with is_listable in Meta.indexes.
+    popularity = models.FloatField(default=0, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -468,16 +529,99 @@ class Trip(SlugMixin, models.Model):
     tags = TaggableManager(help_text="Comma-separated tags for search/filtering")
     objects = managers.TripQuerySet.as_manager()
 
+    #: M2M relation -> the column denormalizing its membership.
+    MEMBER_FIELDS = {
+        "facilities": "facility_members",
+        "trust_badges": "trust_badge_members",
+        "categories": "category_members",
+        "locations": "location_members",
+    }
+
     # Transient attribution for the in-flight status change, read by
     # signals.py's post_save receiver - not model fields, so declared here
     # (rather than in a migration) with the same defaults `set_status` uses.
     _status_change_actor = None
     _status_change_reason = ""
+    # The status/destination the row had before the in-flight save - read
+    # by save() (see `read_stored_state`), since Django has no built-in
+    # "did this field change" hook; signals.py's post_save receivers compare
+    # against them (a status transition, a trip moved between calendars).
+    _previous_status = None
+    _previous_destination_id = None
 
     def save(self, *args, **kwargs):
-        self.slug = slugify(f"{self.name}-by-{self.host}-for-{self.destination}")
+        stored = self.read_stored_state()
+        self._previous_status = stored and stored["status"]
+        self._previous_destination_id = stored and stored["destination"]
+
+        host_name, host_verified = self.stored_or_loaded(stored, "host", "name", "verified")
+        (destination_name,) = self.stored_or_loaded(stored, "destination", "name")
+        self.slug = slugify(f"{self.name}-by-{host_name}-for-{destination_name}")
+        self.duration_days = self.duration.days if self.duration is not None else None
+        self.is_listable = self.is_active and self.status == TripStatus.PUBLISHED and host_verified
+        if stored is not None:
+            # Re-read rather than trusted: this instance may predate a package
+            # or M2M write (both kept in sync outside save()), and a full
+            # save() would put its stale values back.
+            self.min_price = stored["cheapest_price"]
+            for member_field in self.MEMBER_FIELDS.values():
+                setattr(self, member_field, stored[member_field])
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "duration" in update_fields:
+                update_fields.add("duration_days")
+            if update_fields & {"is_active", "status", "host"}:
+                update_fields.add("is_listable")
+            kwargs["update_fields"] = update_fields
         super().save(*args, **kwargs)
 
+    def read_stored_state(self):
+        """
+        What `save()` needs of the row as stored, in one query: its previous
+        status and destination, the columns kept in sync outside `save()`,
+        and the host/destination fields the slug and `is_listable` derive
+        from - None for a trip not saved yet.
+        """
+        if self.pk is None:
+            return None
+        cheapest = (
+            TripPackage.objects.filter(trip=models.OuterRef("pk"))
+            .order_by("base_price")
+            .values("base_price")[:1]
+        )
+        return (
+            Trip.objects.filter(pk=self.pk)
+            .annotate(cheapest_price=models.Subquery(cheapest))
+            .values(
+                "status",
+                "cheapest_price",
+                "host",
+                "host__name",
+                "host__verified",
+                "destination",
+                "destination__name",
+                *self.MEMBER_FIELDS.values(),
+            )
+            .first()
+        )
+
+    def stored_or_loaded(self, stored, relation, *field_names):
+        """
+        `field_names` of the `relation` object (None without one) - read off
+        the instance if it's loaded (or repointed since `stored` was read),
+        else from `stored` rather than loading it.
+        """
+        descriptor = getattr(Trip, relation)
+        if (
+            stored is not None
+            and not descriptor.is_cached(self)
+            and stored[relation] == getattr(self, descriptor.field.attname)
+        ):
+            return tuple(stored[f"{relation}__{field_name}"] for field_name in field_names)
+        related = getattr(self, relation)
+        return tuple(getattr(related, field_name, None) for field_name in field_names)
+
     def set_status(self, status, changed_by=None, reason=""):
         """
         Updates `status` and attributes the resulting TripStatusEvent to
@@ -496,6 +640,12 @@ class Trip(SlugMixin, models.Model):
         indexes = [
             models.Index(fields=["is_active"]),
             models.Index(fields=["featured"]),
+            # Trip.objects.active() with the default "-created_at" ordering.
+            models.Index(fields=["is_listable", "created_at"]),
+            # Per-host listings of a host's active trips.
+            models.Index(fields=["is_active", "host", "created_at"]),
+            # Trip.objects.active() ranked by popularity.
+            models.Index(fields=["is_listable", "popularity"]),
         ]
         ordering = ["-created_at", "-id"]
 
@@ -851,6 +1001,17 @@ class TripSchedule(models.Model):
     end_date = models.DateField(null=True, blank=True)
     available_seats = models.PositiveSmallIntegerField(default=0)
     booked_seats = models.PositiveSmallIntegerField(default=0)
+    # `available_seats - booked_seats` floored at 0, kept in sync by save() -
+    # stored (and indexed) so the `adults`/`children` party-size filters
+    # are a range lookup rather than an expression evaluated per schedule.
+    seats_left = models.PositiveSmallIntegerField(default=0, editable=False)
+    # The trip's cheapest package (`Trip.min_price`) plus this departure's
+    # `additional_price` - the price `/trips/upcoming/` shows and orders by,
+    # stored for the price histogram (api/histogram.py). Kept in sync by
+    # save() and by package writes (TripQuerySet.sync_prices()).
+    resolved_price = models.DecimalField(
+        max_digits=8, decimal_places=0, null=True, blank=True, editable=False
+    )
     status = models.CharField(
         max_length=20,
         choices=ScheduleStatus.choices,
@@ -858,6 +1019,37 @@ class TripSchedule(models.Model):
     )
     objects = managers.TripScheduleQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # A trip's upcoming published departures in date order - the
+            # `schedules` prefetch behind every trip card.
+            models.Index(fields=["trip", "status", "start_date"]),
+            # Published departures across all trips in a date window - the
+            # `?date=`/`?flex_days=` search (see FlexibleDateFilterSet).
+            models.Index(fields=["status", "start_date"]),
+            # Departures with room for a party (see PartySizeFilterSet).
+            models.Index(fields=["status", "seats_left"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.seats_left = max(self.available_seats - self.booked_seats, 0)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"trip", "additional_price"} & set(update_fields):
+            min_price = (
+                Trip.objects.filter(pk=self.trip_id).values_list("min_price", flat=True).first()
+            )
+            self.resolved_price = (
+                None if min_price is None else min_price + Decimal(self.additional_price)
+            )
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {"available_seats", "booked_seats"} & update_fields:
+                update_fields.add("seats_left")
+            if {"trip", "additional_price"} & update_fields:
+                update_fields.add("resolved_price")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.trip} - {self.start_date if self.start_date else 'N/A'}"
 
@@ -871,10 +1063,6 @@ class TripSchedule(models.Model):
             return self.start_date <= today < self.end_date
         return False
 
-    @property
-    def seats_left(self):
-        return max(self.available_seats - self.booked_seats, 0)
-
 
 class TripPackage(models.Model):
     """
@@ -912,6 +1100,11 @@ class TripPackage(models.Model):
     class Meta:
         ordering = ["trip", "base_price"]
         unique_together = ("trip", "name")
+        indexes = [
+            # A trip's cheapest package - `starting_price` and the list
+            # endpoints' `price` annotation.
+            models.Index(fields=["trip", "base_price"]),
+        ]
 
     def __str__(self):
         return str(self.name)
@@ -947,6 +1140,12 @@ class TripReview(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # A trip's verified reviews, newest first.
+            models.Index(fields=["trip", "is_verified", "created_at"]),
+        ]
+
     def __str__(self):
         return f"{self.name}-{self.overall}"
 
@@ -1265,3 +1464,322 @@ class TripPickupLocation(models.Model):
 
     def __repr__(self):
         return f"<TripPickupLocation schedule={self.schedule}-{self.location}>"
+
+
+class TripOrigin(models.Model):
+    """
+    Precomputed trip -> origin location mapping behind the `departure`
+    filter: a trip's own `departure`, plus every pickup point offered on
+    one of its published schedules - so "trips leaving from Lahore" is one
+    indexed semi-join on this table rather than a join across every
+    schedule's pickups.
+
+    `latest_departure` is the start date of the last published schedule
+    offering that pickup (null for the trip's own departure location - always
+    an origin), so the filter can drop pickups whose departures have all
+    passed without anything having to rewrite this table as time goes by.
+    Rebuilt per trip by `refresh()` on trip, schedule and pickup writes
+    (signals.py); `manage.py refresh_trip_origins` rebuilds all of it.
+    """
+
+    trip = models.ForeignKey(Trip, related_name="origins", on_delete=models.CASCADE)
+    location = models.ForeignKey(
+        Location, related_name="origin_trips", on_delete=models.CASCADE
+    )
+    latest_departure = models.DateField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("trip", "location")
+        indexes = [models.Index(fields=["location", "latest_departure"])]
+
+    def __str__(self):
+        return f"{self.trip} from {self.location}"
+
+    @classmethod
+    def refresh(cls, trip_ids):
+        """Rebuilds the origins of the trips in `trip_ids` that (still) exist."""
+        trip_ids = set(trip_ids)
+        latest_departures = {}
+        pickups = (
+            TripPickupLocation.objects.filter(
+                schedule__trip__in=trip_ids,
+                schedule__status=ScheduleStatus.PUBLISHED,
+            )
+            .values("schedule__trip", "location")
+            .annotate(latest_departure=models.Max("schedule__start_date"))
+        )
+        for pickup in pickups:
+            key = (pickup["schedule__trip"], pickup["location"])
+            latest_departures[key] = pickup["latest_departure"]
+        for trip_id, departure_id in Trip.objects.filter(
+            pk__in=trip_ids, departure__isnull=False
+        ).values_list("pk", "departure"):
+            latest_departures[(trip_id, departure_id)] = None
+
+        existing_trip_ids = set(
+            Trip.objects.filter(pk__in=trip_ids).values_list("pk", flat=True)
+        )
+        with transaction.atomic():
+            cls.objects.filter(trip__in=trip_ids).delete()
+            cls.objects.bulk_create(
+                cls(trip_id=trip_id, location_id=location_id, latest_departure=latest)
+                for (trip_id, location_id), latest in latest_departures.items()
+                if trip_id in existing_trip_ids
+            )
+
+
+class TripTrigram(models.Model):
+    """
+    A trigram of a trip's name (see trigrams.py) - the persisted index
+    behind typo-tolerant name search. Candidates for a query are one indexed
+    GROUP BY over the rows holding its trigrams (`match()`), rather than
+    scoring every trip's name in Python.
+
+    Kept in sync by `refresh()` when a trip's name is saved (signals.py);
+    `manage.py refresh_trip_trigrams` rebuilds all of it.
+    """
+
+    trip = models.ForeignKey(Trip, related_name="trigrams", on_delete=models.CASCADE)
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        unique_together = ("trip", "trigram")
+        indexes = [models.Index(fields=["trigram", "trip"])]
+
+    def __str__(self):
+        return f"{self.trip}: {self.trigram!r}"
+
+    @classmethod
+    def refresh(cls, trip_ids):
+        """Brings the trigrams of the trips in `trip_ids` in line with their names."""
+        trip_ids = set(trip_ids)
+        wanted = {
+            (trip_id, gram)
+            for trip_id, name in Trip.objects.filter(pk__in=trip_ids).values_list("pk", "name")
+            for gram in trigrams(name)
+        }
+        existing = {
+            (trip_id, gram): pk
+            for pk, trip_id, gram in cls.objects.filter(trip__in=trip_ids).values_list(
+                "pk", "trip", "trigram"
+            )
+        }
+        with transaction.atomic():
+            cls.objects.filter(pk__in=[existing[key] for key in existing.keys() - wanted]).delete()
+            cls.objects.bulk_create(
+                cls(trip_id=trip_id, trigram=gram) for trip_id, gram in wanted - existing.keys()
+            )
+
+    @classmethod
+    def match(cls, query, threshold=SIMILARITY_THRESHOLD, limit=100):
+        """
+        Up to `limit` ids of the trips whose names score at least `threshold`
+        against `query`, best first.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        return list(
+            cls.objects.filter(trigram__in=query_grams)
+            .values("trip")
+            .annotate(shared=models.Count("pk"))
+            .filter(shared__gte=math.ceil(len(query_grams) * threshold))
+            .order_by("-shared", "trip")
+            .values_list("trip", flat=True)[:limit]
+        )
+
+    @classmethod
+    def shared_count(cls, query_grams, trip):
+        """
+        How many of `query_grams` the trip `trip` (an `OuterRef`) has, as a
+        subquery - NULL for none. One range scan of the (trip, trigram) key.
+        """
+        return models.Subquery(
+            cls.objects.filter(trip=trip, trigram__in=query_grams)
+            .values("trip")
+            .annotate(shared=models.Count("pk"))
+            .values("shared")[:1],
+            output_field=models.IntegerField(),
+        )
+
+
+class DestinationDay(models.Model):
+    """
+    Precomputed cheapest departure per destination and day, behind the
+    destination calendar ("Hunza in July"): one row per location and start
+    date with a published departure of a listed trip destined there - for a
+    REGION, of a trip destined for any of its children too (the rollup
+    `expand_destination_slugs()` does at search time) - so a month is one
+    range read on (location, date) rather than an aggregate over every
+    departure of every trip in the region.
+
+    `min_price` is the lowest `TripSchedule.resolved_price` that day. Only
+    days from today on are kept. Rebuilt per location by `refresh()` on
+    trip, schedule, package and location writes (signals.py);
+    `manage.py refresh_destination_days` rebuilds all of it.
+    """
+
+    location = models.ForeignKey(
+        Location, related_name="calendar_days", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    min_price = models.DecimalField(max_digits=8, decimal_places=0)
+    departures = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("location", "date")
+
+    def __str__(self):
+        return f"{self.location} on {self.date}"
+
+    @staticmethod
+    def rollup_locations(destination_ids):
+        """
+        `destination_ids` plus their parents - the locations whose rows a
+        trip destined for one of them counts towards.
+        """
+        destination_ids = set(destination_ids) - {None}
+        parent_ids = Location.objects.filter(
+            pk__in=destination_ids, parent__isnull=False
+        ).values_list("parent", flat=True)
+        return destination_ids | set(parent_ids)
+
+    @classmethod
+    def refresh(cls, location_ids):
+        """Rebuilds the rows of the locations in `location_ids` (that still exist)."""
+        location_ids = set(location_ids)
+        regions = set(
+            Location.objects.filter(pk__in=location_ids, type=LocationType.REGION).values_list(
+                "pk", flat=True
+            )
+        )
+        departures = (
+            TripSchedule.objects.filter(
+                models.Q(trip__destination__in=location_ids)
+                | models.Q(trip__destination__parent__in=regions),
+                trip__is_listable=True,
+                status=ScheduleStatus.PUBLISHED,
+                start_date__gte=timezone.now().date(),
+                resolved_price__isnull=False,
+            )
+            .values("trip__destination", "trip__destination__parent", "start_date")
+            .annotate(min_price=models.Min("resolved_price"), departures=models.Count("pk"))
+        )
+        days = {}
+        for row in departures:
+            targets = {row["trip__destination"]} & location_ids
+            if row["trip__destination__parent"] in regions:
+                targets.add(row["trip__destination__parent"])
+            for location_id in targets:
+                day = days.setdefault(
+                    (location_id, row["start_date"]),
+                    cls(
+                        location_id=location_id,
+                        date=row["start_date"],
+                        min_price=row["min_price"],
+                    ),
+                )
+                day.min_price = min(day.min_price, row["min_price"])
+                day.departures += row["departures"]
+        existing_location_ids = set(
+            Location.objects.filter(pk__in=location_ids).values_list("pk", flat=True)
+        )
+        with transaction.atomic():
+            cls.objects.filter(location__in=location_ids).delete()
+            cls.objects.bulk_create(
+                day for day in days.values() if day.location_id in existing_location_ids
+            )
+
+
+class TripSimilarity(models.Model):
+    """
+    Precomputed "you may also like" lists per listed trip: its nearest
+    neighbours (see similarity.py) of each `kind` - by content, or by the
+    travellers who wishlisted/booked both - one row each, ranked from 1 -
+    so the detail page's list is one read on the (trip, kind, rank) index
+    rather than a comparison against the whole catalog.
+
+    Rebuilt wholesale by `refresh()` (`manage.py refresh_trip_similarities`),
+    an offline job; readers drop neighbours that have since been unlisted.
+    """
+
+    trip = models.ForeignKey(Trip, related_name="similarities", on_delete=models.CASCADE)
+    similar_trip = models.ForeignKey(
+        Trip, related_name="similar_for", on_delete=models.CASCADE
+    )
+    kind = models.CharField(
+        max_length=20, choices=SimilarityKind.choices, default=SimilarityKind.CONTENT
+    )
+    score = models.FloatField(help_text="Cosine similarity, 0-1")
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ("trip", "kind", "rank")
+        verbose_name_plural = "Trip similarities"
+
+    def __str__(self):
+        return f"{self.trip} ~ {self.similar_trip} ({self.kind})"
+
+    @staticmethod
+    def kind_indexes(kind):
+        """
+        `(trip ids, index_for, min_shared)`: the listed trips `kind` compares,
+        `index_for(batch)` - a `SimilarityIndex` ranking a batch of them - and
+        how many features a pair must share. Content vectors are a few per
+        trip, so one index serves every batch; "also liked" reads only each
+        batch's travellers' interactions (see similarity.py).
+        """
+        if kind == SimilarityKind.ALSO_LIKED:
+            wishlists = TripWishlist.objects.filter(trip__is_listable=True)
+            bookings = TripBooking.objects.filter(schedule__trip__is_listable=True).exclude(
+                status=BookingStatus.CANCELLED
+            )
+            norms = interaction_norms(wishlists, bookings)
+
+            def index_for(batch):
+                vectors = interaction_vectors(*co_travelled(wishlists, bookings, batch))
+                return SimilarityIndex(vectors, norms)
+
+            return sorted(norms), index_for, get_also_liked_min_travellers()
+        index = SimilarityIndex(trip_vectors(Trip.objects.active()))
+        return sorted(index.vectors), lambda batch: index, 1
+
+    @classmethod
+    def refresh(cls, kind=SimilarityKind.CONTENT, batch_size=500, limit=None):
+        """
+        Rebuilds every listed trip's `kind` neighbour list, `batch_size`
+        trips per transaction, and drops those of trips no longer listed
+        or with no neighbours left. Returns the number of rows stored.
+        """
+        limit = limit or get_similar_trips_limit()
+        trip_ids, index_for, min_shared = cls.kind_indexes(kind)
+        stale_trip_ids = sorted(
+            set(cls.objects.filter(kind=kind).values_list("trip", flat=True).distinct())
+            - set(trip_ids)
+        )
+        for start in range(0, len(stale_trip_ids), batch_size):
+            cls.objects.filter(
+                kind=kind, trip__in=stale_trip_ids[start:start + batch_size]
+            ).delete()
+        stored = 0
+        for start in range(0, len(trip_ids), batch_size):
+            batch = trip_ids[start:start + batch_size]
+            index = index_for(batch)
+            rows = [
+                cls(
+                    trip_id=trip_id,
+                    similar_trip_id=similar_trip_id,
+                    kind=kind,
+                    score=score,
+                    rank=rank,
+                )
+                for trip_id in batch
+                for rank, (similar_trip_id, score) in enumerate(
+                    index.neighbours(trip_id, limit, min_shared), start=1
+                )
+            ]
+            with transaction.atomic():
+                cls.objects.filter(kind=kind, trip__in=batch).delete()
+                cls.objects.bulk_create(rows)
+            stored += len(rows)
+        return stored
@@ -1,10 +1,58 @@
 """Signal receivers for django_trips."""
 
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import Signal, receiver
 
+from django_trips.cache import (
+    CATALOG_VERSION_CACHE_KEY,
+    bump_catalog_version,
+    bump_trip_version,
+)
 from django_trips.choices import PackageTier
-from django_trips.models import Trip, TripPackage, TripStatusEvent
+from django_trips.managers import encode_members, member_token
+from django_trips.models import (
+    Category,
+    DestinationDay,
+    Facility,
+    Host,
+    Location,
+    Trip,
+    TripBooking,
+    TripImage,
+    TripOrigin,
+    TripPackage,
+    TripPickupLocation,
+    TripSchedule,
+    TripStatusEvent,
+    TripTrigram,
+    TrustBadge,
+)
+from django_trips.suggestions import suggestion_index
+from django_trips.trigrams import reset_location_index
+
+#: Models whose writes can change what the public catalog returns (which
+#: trips match a filter, their prices/departures, ...) - see cache.py.
+CATALOG_MODELS = (
+    Category,
+    Facility,
+    Host,
+    Location,
+    Trip,
+    TripImage,
+    TripPackage,
+    TripPickupLocation,
+    TripSchedule,
+    TrustBadge,
+)
+
+#: The `TripSchedule` fields a booking saves. A seat count isn't worth
+#: orphaning every catalog cache over - on a busy site that would be every
+#: booking - so saves of only these don't bump the catalog version. The
+#: booked trip's own caches (its departure calendar) go stale through its
+#: per-trip version instead (`invalidate_trip_cache`); cached counts
+#: filtered on seats (`?adults=`) catch up within their timeout.
+SEAT_COUNT_FIELDS = frozenset({"booked_seats", "seats_left"})
 
 #: Sent after a Trip's `status` field actually changes value on save
 #: (never on creation, since there's no prior status to transition from).
@@ -40,23 +88,290 @@ def create_standard_package(sender, instance, created, **kwargs):  # pylint:disa
     )
 
 
-@receiver(pre_save, sender=Trip)
-def _capture_previous_trip_status(sender, instance, **kwargs):  # pylint:disable=unused-argument
+@receiver(post_save, sender=TripPackage)
+@receiver(post_delete, sender=TripPackage)
+def sync_trip_prices(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """
+    A package's price can change its trip's `min_price`, and with it every
+    departure's `resolved_price`.
+    """
+    Trip.objects.filter(pk=instance.trip_id).sync_prices()
+
+
+@receiver(pre_save, sender=Host)
+def _capture_previous_host_verified(sender, instance, **kwargs):  # pylint:disable=unused-argument
     """
-    Stashes the pre-save status on the instance, since Django has no
-    built-in "did this field change" hook - the paired post_save receiver
-    below compares against this to detect an actual transition.
+    Stashes the pre-save `verified` flag - what decides whether the host's
+    trips are listed, and which most host saves (a new logo, a phone
+    number) leave alone.
     """
-    instance._previous_status = (  # pylint:disable=protected-access
-        sender.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+    instance._previous_verified = (  # pylint:disable=protected-access
+        sender.objects.filter(pk=instance.pk).values_list("verified", flat=True).first()
         if instance.pk
         else None
     )
 
 
+def host_verified_changed(instance):
+    return getattr(instance, "_previous_verified", None) != instance.verified
+
+
+@receiver(post_save, sender=Host)
+def sync_host_trips_listable(sender, instance, created, **kwargs):  # pylint:disable=unused-argument
+    """
+    A host's `verified` flag is part of each of its trips' denormalized
+    `Trip.is_listable` - recomputed for all of them in one UPDATE when it changes.
+    """
+    if created or not host_verified_changed(instance):
+        return
+    Trip.objects.filter(host=instance).sync_listable()
+
+
+class OnCommitBatch:
+    """An `on_commit_batched()` callback, and the ids it's to run with."""
+
+    def __init__(self, batches, key, callback):
+        self.batches = batches
+        self.key = key
+        self.callback = callback
+        self.ids = set()
+
+    def __call__(self):
+        if self.batches.get(self.key) is self:
+            del self.batches[self.key]
+        self.callback(self.ids)
+
+
+def on_commit_batched(callback, ids):
+    """
+    Runs `callback(ids)` once the current transaction commits - one call
+    for the whole transaction, with the ids of every `on_commit_batched()`
+    made with the same `callback` in it. `Trip.create_schedules()` saves up
+    to 20 schedules in one transaction; each would otherwise queue the same
+    rebuild. Outside a transaction, `callback` runs straight away.
+
+    Batches are kept per outermost savepoint, so one queued by an enclosing
+    block isn't joined from within a savepoint in it - e.g. a TestCase's
+    class-wide transaction and `captureOnCommitCallbacks()` in a test.
+    """
+    ids = set(ids) - {None}
+    if not ids:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        callback(ids)
+        return
+    batches = connection.__dict__.setdefault("django_trips_on_commit_batches", {})
+    key = (callback, tuple(connection.savepoint_ids[:1]))
+    batch = batches.get(key)
+    queued = {id(func) for _sids, func, _robust in connection.run_on_commit}
+    if batch is None or id(batch) not in queued:
+        # A rolled-back savepoint drops the callbacks queued within it - forget
+        # those batches, and start afresh.
+        for stale_key in [
+            other_key for other_key, other in batches.items() if id(other) not in queued
+        ]:
+            del batches[stale_key]
+        batch = batches[key] = OnCommitBatch(batches, key, callback)
+        transaction.on_commit(batch)
+    batch.ids.update(ids)
+
+
+def bump_catalog_version_once(_keys):
+    bump_catalog_version()
+
+
+def bump_trip_versions(trip_ids):
+    for trip_id in trip_ids:
+        bump_trip_version(trip_id)
+
+
+def bump_catalog_version_on_commit():
+    """
+    Bumps the catalog version once the current transaction commits - once
+    for all the catalog writes in it. Bumped any sooner, a read in between
+    would miss the cache under the new version, read the data as it was
+    before the commit and cache that under the new version until it times out.
+    """
+    on_commit_batched(bump_catalog_version_once, {CATALOG_VERSION_CACHE_KEY})
+
+
+def refresh_trip_origins(trip_ids):
+    TripOrigin.refresh(trip_ids)
+
+
+def refresh_trip_origins_on_commit(trip_id):
+    """
+    Rebuilds `trip_id`'s `TripOrigin` rows once the current transaction
+    commits - by then a cascading delete has finished, and any schedules and
+    pickups saved alongside in the same transaction are in place.
+    """
+    on_commit_batched(refresh_trip_origins, {trip_id})
+
+
+@receiver(post_save, sender=Trip)
+def sync_trip_origins(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """The trip's own `departure` is one of its origins."""
+    refresh_trip_origins_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=TripSchedule)
+@receiver(post_delete, sender=TripSchedule)
+def sync_schedule_trip_origins(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """A schedule's status/dates decide which of its pickups count as origins."""
+    refresh_trip_origins_on_commit(instance.trip_id)
+
+
+@receiver(post_save, sender=TripPickupLocation)
+@receiver(post_delete, sender=TripPickupLocation)
+def sync_pickup_trip_origins(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """Pickup points are origins of their schedule's trip."""
+    refresh_trip_origins_on_commit(
+        TripSchedule.objects.filter(pk=instance.schedule_id)
+        .values_list("trip_id", flat=True)
+        .first()
+    )
+
+
+def refresh_destination_days(destination_ids):
+    DestinationDay.refresh(DestinationDay.rollup_locations(destination_ids))
+
+
+def refresh_destination_days_on_commit(destination_ids):
+    """
+    Rebuilds the `DestinationDay` rows of `destination_ids` and their
+    parents once the current transaction commits - once for all the
+    destinations written in it.
+    """
+    on_commit_batched(refresh_destination_days, destination_ids)
+
+
+def trip_destination_ids(trip_ids):
+    return Trip.objects.filter(pk__in=trip_ids).values_list("destination", flat=True)
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_delete, sender=Trip)
+def sync_trip_destination_days(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """
+    A trip's destination and listability decide which calendars count its
+    departures - both its destination's and, if moved, the one `Trip.save()`
+    read as `_previous_destination_id`.
+    """
+    refresh_destination_days_on_commit(
+        {instance.destination_id, getattr(instance, "_previous_destination_id", None)}
+    )
+
+
+@receiver(post_save, sender=TripSchedule)
+@receiver(post_delete, sender=TripSchedule)
+def sync_schedule_destination_days(sender, instance, update_fields=None, **kwargs):  # pylint:disable=unused-argument
+    """
+    A departure's date, status and price are its destination's calendar - a
+    booking's seat count (`update_fields=["booked_seats"]`) isn't.
+    """
+    calendar_fields = {"trip", "start_date", "status", "additional_price", "resolved_price"}
+    if update_fields is not None and not calendar_fields & set(update_fields):
+        return
+    refresh_destination_days_on_commit(trip_destination_ids([instance.trip_id]))
+
+
+@receiver(post_save, sender=TripPackage)
+@receiver(post_delete, sender=TripPackage)
+def sync_package_destination_days(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """Runs after `sync_trip_prices` has re-resolved the trip's departure prices."""
+    refresh_destination_days_on_commit(trip_destination_ids([instance.trip_id]))
+
+
+@receiver(post_save, sender=Host)
+def sync_host_destination_days(sender, instance, created, **kwargs):  # pylint:disable=unused-argument
+    """A host's `verified` flag decides whether its trips are listed."""
+    if created or not host_verified_changed(instance):
+        return
+    refresh_destination_days_on_commit(
+        Trip.objects.filter(host=instance).values_list("destination", flat=True)
+    )
+
+
+@receiver(post_save, sender=Location)
+def sync_location_destination_days(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """A location's `type`/`parent` decide the region it rolls up to."""
+    refresh_destination_days_on_commit({instance.pk})
+
+
+@receiver(post_save, sender=TripBooking)
+@receiver(post_delete, sender=TripBooking)
+def invalidate_trip_cache(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """
+    Bookings aren't catalog writes - nor are the seat counts they save on
+    the departure (`SEAT_COUNT_FIELDS`) - but they do change what a trip's
+    own cached views show (e.g. its departure calendar's seats); those are
+    keyed under the trip's version too (see cache.py). Bumped once the
+    booking commits, after the seat count it saves alongside it.
+    """
+    trip_id = (
+        TripSchedule.objects.filter(pk=instance.schedule_id)
+        .values_list("trip_id", flat=True)
+        .first()
+    )
+    on_commit_batched(bump_trip_versions, {trip_id})
+
+
+@receiver(post_save, sender=Trip)
+def sync_trip_trigrams(sender, instance, update_fields=None, **kwargs):  # pylint:disable=unused-argument
+    """Keeps the trip's name searchable by `TripTrigram.match()`."""
+    if update_fields is None or "name" in update_fields:
+        TripTrigram.refresh([instance.pk])
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reset_location_trigrams(sender, **kwargs):  # pylint:disable=unused-argument
+    """
+    Another process sees the write through the catalog version bump; this
+    one drops its location index straight away.
+    """
+    reset_location_index()
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Host)
+def update_suggestions(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """
+    Re-indexes the instance for search suggestions in this process (others
+    pick it up on their next `DJANGO_TRIPS_SUGGEST_INDEX_TTL` rebuild).
+    Also what depends on it: a location's children show its name as their
+    region, and a host's `verified` decides whether its trips are listed.
+    """
+    if suggestion_index.built_at is None:
+        return
+    suggestion_index.update(instance)
+    if sender is Location:
+        dependants = instance.children.select_related("parent")
+    elif sender is Host:
+        dependants = Trip.objects.filter(host=instance).only("slug", "name", "is_listable")
+    else:
+        dependants = ()
+    for dependant in dependants:
+        suggestion_index.update(dependant)
+
+
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Host)
+def remove_suggestions(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    suggestion_index.remove(instance)
+
+
 @receiver(post_save, sender=Trip)
 def _dispatch_trip_status_changed(sender, instance, created, **kwargs):  # pylint:disable=unused-argument
-    """Fires `trip_status_changed` once the new status is committed."""
+    """
+    Fires `trip_status_changed` once the new status is committed - if it
+    differs from the `_previous_status` `Trip.save()` read.
+    """
     previous_status = getattr(instance, "_previous_status", None)
     # Consume the attribution set by set_status() (if any) so a later bare
     # `trip.status = ...; trip.save()` on this same instance doesn't
@@ -90,3 +405,101 @@ def log_trip_status_event(  # pylint:disable=unused-argument,too-many-arguments
         changed_by=changed_by,
         reason=reason,
     )
+
+
+#: M2M through model -> its `Trip.MEMBER_FIELDS` relation name.
+MEMBER_RELATIONS = {getattr(Trip, relation).through: relation for relation in Trip.MEMBER_FIELDS}
+
+
+def sync_trip_members(sender, instance, action, reverse, pk_set, **kwargs):  # pylint:disable=unused-argument
+    """Keeps the trips' `Trip.MEMBER_FIELDS` column for this M2M in sync."""
+    relation = MEMBER_RELATIONS[sender]
+    member_field = Trip.MEMBER_FIELDS[relation]
+    if not reverse:
+        # `trip.facilities.add(...)` etc.: rebuild this trip's column, on the
+        # instance too so a later full save() doesn't write back a stale one.
+        if not action.startswith("post_"):
+            return
+        members = encode_members(list(getattr(instance, relation).values_list("pk", flat=True)))
+        setattr(instance, member_field, members)
+        Trip.objects.filter(pk=instance.pk).update(**{member_field: members})
+        return
+
+    # `facility.trips.add(...)` etc.: `pk_set` holds the trips - except on
+    # clear, which doesn't say which ones, so they're noted beforehand.
+    accessor = Trip._meta.get_field(relation).remote_field.get_accessor_name()  # pylint:disable=protected-access
+    if action == "pre_clear":
+        instance._cleared_trip_ids = list(  # pylint:disable=protected-access
+            getattr(instance, accessor).values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        trip_ids = instance.__dict__.pop("_cleared_trip_ids", ())
+        Trip.objects.filter(pk__in=trip_ids).sync_members(relation)
+    elif action.startswith("post_"):
+        Trip.objects.filter(pk__in=pk_set).sync_members(relation)
+
+
+#: Member model (Facility, ...) -> its `Trip.MEMBER_FIELDS` relation name.
+MEMBER_MODELS = {
+    Trip._meta.get_field(relation).related_model: relation  # pylint:disable=protected-access
+    for relation in Trip.MEMBER_FIELDS
+}
+
+
+def sync_deleted_member(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """
+    Deleting a facility (etc.) cascades to its through rows without an
+    m2m_changed - drops it from the `Trip.MEMBER_FIELDS` column of the
+    trips that listed it.
+    """
+    relation = MEMBER_MODELS[sender]
+    Trip.objects.filter(
+        **{f"{Trip.MEMBER_FIELDS[relation]}__contains": member_token(instance.pk)}
+    ).sync_members(relation)
+
+
+def invalidate_catalog_cache(sender, update_fields=None, **kwargs):  # pylint:disable=unused-argument
+    """
+    Bumps the catalog version on any write to a catalog model - except a
+    save of a departure's seat counts alone (see `SEAT_COUNT_FIELDS`).
+    """
+    if kwargs.get("action", "").startswith("pre_"):
+        return  # m2m_changed fires pre_/post_ pairs - the post_ one is enough.
+    if sender is TripSchedule and update_fields and update_fields <= SEAT_COUNT_FIELDS:
+        return
+    bump_catalog_version_on_commit()
+
+
+for _model in CATALOG_MODELS:
+    post_save.connect(
+        invalidate_catalog_cache, sender=_model, dispatch_uid=f"catalog-save-{_model.__name__}"
+    )
+    post_delete.connect(
+        invalidate_catalog_cache, sender=_model, dispatch_uid=f"catalog-delete-{_model.__name__}"
+    )
+
+for _through in (
+    Trip.categories.through,
+    Trip.facilities.through,
+    Trip.trust_badges.through,
+    Trip.locations.through,
+):
+    m2m_changed.connect(
+        invalidate_catalog_cache,
+        sender=_through,
+        dispatch_uid=f"catalog-m2m-{_through.__name__}",
+    )
+
+for _through in MEMBER_RELATIONS:
+    m2m_changed.connect(
+        sync_trip_members,
+        sender=_through,
+        dispatch_uid=f"trip-members-{_through.__name__}",
+    )
+
+for _model in MEMBER_MODELS:
+    post_delete.connect(
+        sync_deleted_member,
+        sender=_model,
+        dispatch_uid=f"trip-members-delete-{_model.__name__}",
+    )
@@ -0,0 +1,227 @@
+"""
+"Similar trips" and "travellers also liked" for the trip detail page.
+
+Both describe every listed trip by a sparse vector, and two trips are as
+similar as the cosine of their vectors:
+
+- content (`trip_vectors()`): its categories, facilities, tags, destination
+  and the destination's region, and duration and price bands, each kind of
+  feature weighted by `FEATURE_WEIGHTS`;
+- also liked (`interaction_vectors()`): the travellers who wishlisted or
+  booked it - a column of the traveller x trip interaction matrix, so the
+  cosine is item-item collaborative filtering over their co-occurrences.
+
+`SimilarityIndex` keeps the vectors keyed by feature (an inverted index),
+so a trip is only ever scored against the trips it shares a feature with -
+the sparse matrix-vector product, without materializing the matrix - and
+one batch of trips at a time. The interaction matrix isn't loaded whole
+either: each batch reads only its own travellers' rows (`co_travelled()`),
+scored with norms from one streamed pass (`interaction_norms()`). The top
+`DJANGO_TRIPS_SIMILAR_TRIPS_LIMIT` per trip are stored in the
+`TripSimilarity` table by an offline job (`manage.py
+refresh_trip_similarities`); the detail page reads them back.
+"""
+
+import heapq
+import math
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Lower, Trim
+
+from django_trips.managers import decode_members
+
+#: What sharing one feature of each kind is worth.
+FEATURE_WEIGHTS = {
+    "category": 1.0,
+    "facility": 0.5,
+    "tag": 1.0,
+    "destination": 1.5,
+    "region": 1.0,
+    "duration": 1.0,
+    "price": 1.0,
+}
+
+#: What one interaction of each kind is worth - a booking says more than a wishlist add.
+INTERACTION_WEIGHTS = {"wishlist": 1.0, "booking": 2.0}
+
+
+def get_similar_trips_limit():
+    return getattr(settings, "DJANGO_TRIPS_SIMILAR_TRIPS_LIMIT", 10)
+
+
+def get_also_liked_min_travellers():
+    """
+    How many travellers two trips need in common to be "also liked" - 2 by
+    default, which also keeps any one traveller's picks from showing through.
+    """
+    return getattr(settings, "DJANGO_TRIPS_ALSO_LIKED_MIN_TRAVELLERS", 2)
+
+
+def band(value):
+    """
+    The doubling band `value` falls in - 1, 2-3, 4-7, 8-15 ... - so a
+    5-day trip is like a 7-day one, and 12,000 like 15,000, but not 40,000.
+    """
+    return math.floor(math.log2(value)) if value and value >= 1 else None
+
+
+def trip_vector(trip, tag_ids=()):
+    """
+    The feature vector (feature -> weight) of `trip`, a row of
+    `Trip.objects.values()` with the fields `trip_vectors()` selects.
+    """
+    features = [("category", pk) for pk in decode_members(trip["category_members"])]
+    features += [("facility", pk) for pk in decode_members(trip["facility_members"])]
+    features += [("tag", pk) for pk in tag_ids]
+    if trip["destination"] is not None:
+        features.append(("destination", trip["destination"]))
+        features.append(("region", trip["destination__parent"] or trip["destination"]))
+    for kind, value in (("duration", trip["duration_days"]), ("price", trip["min_price"])):
+        if band(value) is not None:
+            features.append((kind, band(value)))
+    return {f"{kind}:{value}": FEATURE_WEIGHTS[kind] for kind, value in features}
+
+
+def trip_vectors(trips):
+    """{trip id: feature vector} for every trip in the `trips` queryset - two queries."""
+    tag_ids = defaultdict(list)
+    for trip_id, tag_id in trips.filter(tags__isnull=False).values_list("pk", "tags"):
+        tag_ids[trip_id].append(tag_id)
+    rows = trips.values(
+        "pk",
+        "category_members",
+        "facility_members",
+        "destination",
+        "destination__parent",
+        "duration_days",
+        "min_price",
+    )
+    return {row["pk"]: trip_vector(row, tag_ids[row["pk"]]) for row in rows}
+
+
+def with_traveller_email(bookings):
+    """`bookings` annotated with the `traveller_email` a guest is known by, whatever its case."""
+    return bookings.annotate(traveller_email=Lower(Trim("email")))
+
+
+def interactions(wishlists, bookings):
+    """
+    (trip id, traveller, weight) for every row of the `wishlists` and
+    `bookings` querysets, streamed in trip id order. Travellers are users,
+    and guests (bookings without a user) by their email address.
+    """
+    booking_weight = INTERACTION_WEIGHTS["booking"]
+    wishlist_rows = (
+        (trip_id, f"user:{user_id}", INTERACTION_WEIGHTS["wishlist"])
+        for user_id, trip_id in wishlists.order_by("trip")
+        .values_list("user", "trip")
+        .iterator()
+    )
+    booking_rows = (
+        (trip_id, f"user:{user_id}" if user_id else f"email:{email}", booking_weight)
+        for user_id, email, trip_id in with_traveller_email(bookings)
+        .order_by("schedule__trip")
+        .values_list("created_by", "traveller_email", "schedule__trip")
+        .iterator()
+        if user_id or email
+    )
+    return heapq.merge(wishlist_rows, booking_rows, key=itemgetter(0))
+
+
+def interaction_vectors(wishlists, bookings):
+    """
+    {trip id: {traveller: weight}} from the `wishlists` and `bookings`
+    querysets (see `interactions()`); a traveller who both wishlisted and
+    booked a trip counts once, at the booking's weight.
+    """
+    vectors = defaultdict(dict)
+    for trip_id, traveller, weight in interactions(wishlists, bookings):
+        vectors[trip_id][traveller] = max(vectors[trip_id].get(traveller, 0), weight)
+    return dict(vectors)
+
+
+def interaction_norms(wishlists, bookings):
+    """
+    {trip id: the norm of its `interaction_vectors()` vector}, computed a
+    trip at a time off the stream - never holding more than one trip's
+    travellers.
+    """
+    norms = {}
+    for trip_id, rows in groupby(interactions(wishlists, bookings), key=itemgetter(0)):
+        weights = {}
+        for _trip_id, traveller, weight in rows:
+            weights[traveller] = max(weights.get(traveller, 0), weight)
+        norms[trip_id] = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return norms
+
+
+def co_travelled(wishlists, bookings, trip_ids):
+    """
+    `wishlists` and `bookings` narrowed to the travellers of the trips in
+    `trip_ids` - the rows of the interaction matrix ranking those trips
+    needs: their own vectors in full, and of every other trip, the entries
+    it shares with them.
+    """
+    batch_wishlists = wishlists.filter(trip__in=trip_ids)
+    batch_bookings = with_traveller_email(bookings.filter(schedule__trip__in=trip_ids))
+    batch_users = Q(user__in=batch_wishlists.values("user")) | Q(
+        user__in=batch_bookings.exclude(created_by=None).values("created_by")
+    )
+    batch_guests = batch_bookings.filter(created_by=None).values("traveller_email")
+    return (
+        wishlists.filter(batch_users),
+        with_traveller_email(bookings).filter(
+            Q(created_by__in=batch_wishlists.values("user"))
+            | Q(created_by__in=batch_bookings.exclude(created_by=None).values("created_by"))
+            | Q(created_by=None, traveller_email__in=batch_guests)
+        ),
+    )
+
+
+class SimilarityIndex:
+    """Cosine nearest neighbours over a set of trip vectors (see the module docstring)."""
+
+    def __init__(self, vectors, norms=None):
+        """
+        `norms`, when given, are the vectors' norms computed elsewhere - for
+        `vectors` holding only some trips' entries (see `co_travelled()`).
+        """
+        self.vectors = vectors
+        self.norms = norms or {
+            trip_id: math.sqrt(sum(weight * weight for weight in vector.values()))
+            for trip_id, vector in vectors.items()
+        }
+        self.postings = defaultdict(list)
+        for trip_id, vector in vectors.items():
+            for feature, weight in vector.items():
+                self.postings[feature].append((trip_id, weight))
+
+    def neighbours(self, trip_id, limit, min_shared=1):
+        """
+        Up to `limit` (trip id, cosine similarity) pairs nearest `trip_id`,
+        best first, among the trips sharing at least `min_shared` features.
+        """
+        norm = self.norms.get(trip_id)
+        if not norm:
+            return []
+        dot_products = defaultdict(float)
+        shared = defaultdict(int)
+        for feature, weight in self.vectors[trip_id].items():
+            for other_id, other_weight in self.postings[feature]:
+                dot_products[other_id] += weight * other_weight
+                shared[other_id] += 1
+        dot_products.pop(trip_id, None)
+        return heapq.nlargest(
+            limit,
+            (
+                (other_id, dot_product / (norm * self.norms[other_id]))
+                for other_id, dot_product in dot_products.items()
+                if shared[other_id] >= min_shared
+            ),
+            # Ties go to the lower id, so reruns store the same lists.
+            key=lambda pair: (pair[1], -pair[0]),
+        )
@@ -0,0 +1,214 @@
+"""
+Per-process prefix index behind search-as-you-type suggestions.
+
+Every keystroke in the search box asks for suggestions, so they're served
+from memory rather than an `icontains` per table: a sorted list of
+normalized keys - each name, plus each later word of it, so "valley" finds
+"Hunza Valley" - looked up by bisecting to the prefix.
+
+The index covers the public catalog's trips, locations (with their
+`region`), categories and hosts. It's built on first use, updated in place
+by the save/delete receivers in signals.py, and rebuilt from scratch every
+`DJANGO_TRIPS_SUGGEST_INDEX_TTL` seconds so writes made by other processes
+show up too. That rebuild runs on a thread of its own - the searches
+meanwhile are served from the stale index rather than waiting on it.
+"""
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from django_trips.models import Category, Host, Location, Trip
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+logger = logging.getLogger(__name__)
+
+
+def get_suggest_index_ttl():
+    return getattr(settings, "DJANGO_TRIPS_SUGGEST_INDEX_TTL", 300)
+
+
+class Suggestion(NamedTuple):
+    type: str
+    slug: str
+    name: str
+    region: Optional[str] = None
+
+
+def suggestion_keys(name):
+    """
+    The normalized keys `name` is found under - the whole name, then the
+    name from each later word on:
+
+        >>> suggestion_keys("Hunza Valley Explorer")
+        ['hunza valley explorer', 'valley explorer', 'explorer']
+    """
+    words = _WORD_RE.findall(name.lower())
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def normalize_query(query):
+    """`query` as the keys are stored; a trailing space is kept, as a typed word break."""
+    normalized = " ".join(_WORD_RE.findall(query.lower()))
+    if normalized and query[-1:].isspace():
+        normalized += " "
+    return normalized
+
+
+class SuggestionIndex:
+    """
+    `(key, type, pk, word)` tuples kept sorted - `word` being where in the
+    name the key starts, 0 for the whole name - with the `Suggestion` each
+    (type, pk) resolves to. `SCAN_LIMIT` bounds the work one short, common
+    prefix (e.g. "a") can cause.
+    """
+
+    SCAN_LIMIT = 1000
+    MODEL_TYPES = {Trip: "trip", Location: "location", Category: "category", Host: "host"}
+
+    def __init__(self):
+        self._keys = []
+        self._suggestions = {}
+        self._lock = threading.Lock()
+        self.built_at = None
+        self.rebuild_thread = None
+
+    @staticmethod
+    def suggestion_for(instance):
+        """The `Suggestion` for a Trip/Location/Category/Host, or None if it isn't public."""
+        if not instance.slug:
+            return None
+        if isinstance(instance, Trip):
+            is_public, region = instance.is_listable, None
+        elif isinstance(instance, Location):
+            is_public, region = instance.is_active, instance.region
+        elif isinstance(instance, Host):
+            is_public, region = instance.verified and instance.is_active, None
+        else:
+            is_public, region = instance.is_active, None
+        if not is_public:
+            return None
+        return Suggestion(
+            SuggestionIndex.MODEL_TYPES[type(instance)], instance.slug, instance.name, region
+        )
+
+    @staticmethod
+    def public_instances():
+        yield from Trip.objects.active().only("slug", "name", "is_listable")
+        yield from Location.objects.active().select_related("parent")
+        yield from Category.objects.active().only("slug", "name", "is_active")
+        yield from Host.objects.active().filter(is_active=True).only(
+            "slug", "name", "verified", "is_active"
+        )
+
+    @staticmethod
+    def index_keys(suggestion, pk):
+        return [
+            (key, suggestion.type, pk, word)
+            for word, key in enumerate(suggestion_keys(suggestion.name))
+        ]
+
+    def rebuild(self):
+        keys, suggestions = [], {}
+        for instance in self.public_instances():
+            suggestion = self.suggestion_for(instance)
+            if suggestion:
+                suggestions[suggestion.type, instance.pk] = suggestion
+                keys.extend(self.index_keys(suggestion, instance.pk))
+        keys.sort()
+        with self._lock:
+            self._keys, self._suggestions = keys, suggestions
+            self.built_at = time.monotonic()
+
+    def rebuild_in_background(self):
+        """Starts a `rebuild()` on a thread of its own, unless one is already running."""
+        with self._lock:
+            if self.rebuild_thread is not None and self.rebuild_thread.is_alive():
+                return
+            self.rebuild_thread = threading.Thread(
+                target=self._rebuild_in_thread, name="django-trips-suggest", daemon=True
+            )
+            self.rebuild_thread.start()
+
+    def _rebuild_in_thread(self):
+        try:
+            self.rebuild()
+        except Exception:  # pylint:disable=broad-except
+            logger.exception("Rebuilding the suggestion index failed")
+        finally:
+            # The thread opened its own connection; Django only closes the request thread's.
+            connections.close_all()
+
+    def reset(self):
+        """Drops the index; the next search rebuilds it."""
+        with self._lock:
+            self._keys, self._suggestions = [], {}
+            self.built_at = None
+
+    def is_stale(self):
+        return self.built_at is None or time.monotonic() - self.built_at > get_suggest_index_ttl()
+
+    def update(self, instance):
+        """
+        Re-indexes `instance` - or un-indexes it, if it's no longer public.
+        A no-op until the index is first built.
+        """
+        if self.built_at is None:
+            return
+        suggestion = self.suggestion_for(instance)
+        with self._lock:
+            self._discard(self.MODEL_TYPES[type(instance)], instance.pk)
+            if suggestion:
+                self._suggestions[suggestion.type, instance.pk] = suggestion
+                for index_key in self.index_keys(suggestion, instance.pk):
+                    insort(self._keys, index_key)
+
+    def remove(self, instance):
+        if self.built_at is None:
+            return
+        with self._lock:
+            self._discard(self.MODEL_TYPES[type(instance)], instance.pk)
+
+    def _discard(self, suggestion_type, pk):
+        suggestion = self._suggestions.pop((suggestion_type, pk), None)
+        if suggestion is None:
+            return
+        for index_key in self.index_keys(suggestion, pk):
+            position = bisect_left(self._keys, index_key)
+            if position < len(self._keys) and self._keys[position] == index_key:
+                del self._keys[position]
+
+    def search(self, query, limit=10):
+        """
+        Up to `limit` suggestions with a name or name word starting with
+        `query`: whole-name matches first, then shorter names.
+        """
+        prefix = normalize_query(query)
+        if not prefix:
+            return []
+        if self.built_at is None:
+            self.rebuild()
+        elif self.is_stale():
+            self.rebuild_in_background()
+        keys, suggestions = self._keys, self._suggestions
+        ranks = {}
+        start = bisect_left(keys, (prefix,))
+        for key, suggestion_type, pk, word in keys[start:start + self.SCAN_LIMIT]:
+            if not key.startswith(prefix):
+                break
+            suggestion = suggestions.get((suggestion_type, pk))
+            if suggestion is None:
+                continue
+            rank = (word > 0, len(suggestion.name), suggestion.name)
+            ranks[suggestion] = min(rank, ranks.get(suggestion, rank))
+        return sorted(ranks, key=ranks.get)[:limit]
+
+
+suggestion_index = SuggestionIndex()
@@ -3,11 +3,18 @@ from unittest.mock import MagicMock
 
 from django.contrib import admin
 from django.test import TestCase
+from django.urls import reverse
 from django.utils import timezone
 
 from django_trips.admin import TripAdmin, deactivate_hosts
+from django_trips.choices import LocationType, ScheduleStatus
 from django_trips.models import Host, Trip, TripAvailability
-from django_trips.tests.factories import HostFactory, TripFactory
+from django_trips.tests.factories import (
+    HostFactory,
+    LocationFactory,
+    TripFactory,
+    TripScheduleFactory,
+)
 
 
 class DeactivateHostsActionTestCase(TestCase):
@@ -32,6 +39,8 @@ class DeactivateHostsActionTestCase(TestCase):
         self.trip2.refresh_from_db()
         self.assertFalse(self.trip1.is_active)
         self.assertFalse(self.trip2.is_active)
+        self.assertFalse(self.trip1.is_listable)
+        self.assertFalse(self.trip2.is_listable)
 
     def test_does_not_affect_other_hosts_or_their_trips(self):
         deactivate_hosts(MagicMock(), None, Host.objects.filter(pk=self.host.pk))
@@ -39,6 +48,7 @@ class DeactivateHostsActionTestCase(TestCase):
         self.other_trip.refresh_from_db()
         self.assertTrue(self.other_host.is_active)
         self.assertTrue(self.other_trip.is_active)
+        self.assertEqual(self.other_trip.is_listable, self.other_host.verified)
 
     def test_host_with_no_trips_does_not_error(self):
         lone_host = HostFactory(is_active=True)
@@ -46,6 +56,32 @@ class DeactivateHostsActionTestCase(TestCase):
         lone_host.refresh_from_db()
         self.assertFalse(lone_host.is_active)
 
+    def test_rebuilds_destination_calendars(self):
+        start = timezone.now() + timedelta(days=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            region = LocationFactory(type=LocationType.REGION)
+            city = LocationFactory(type=LocationType.CITY, parent=region)
+            Trip.objects.filter(pk=self.trip1.pk).update(destination=city)
+            TripScheduleFactory(
+                trip=self.trip1,
+                start_date=start,
+                end_date=start + timedelta(days=2),
+                status=ScheduleStatus.PUBLISHED,
+            )
+
+        def calendar_days(location):
+            url = reverse("trips-api:destination-calendar", kwargs={"slug": location.slug})
+            response = self.client.get(url, {"month": start.strftime("%Y-%m")})
+            return [day["date"] for day in response.json()["days"]]
+
+        for location in (city, region):
+            self.assertEqual(calendar_days(location), [start.date().isoformat()])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deactivate_hosts(MagicMock(), None, Host.objects.filter(pk=self.host.pk))
+        for location in (city, region):
+            self.assertEqual(calendar_days(location), [])
+
     def test_message_user_reports_host_and_trip_counts(self):
         modeladmin = MagicMock()
         deactivate_hosts(modeladmin, None, Host.objects.filter(pk=self.host.pk))
@@ -1,16 +1,20 @@
 from datetime import timedelta
+from io import StringIO
 
+from django.core.management import call_command
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from django_trips.choices import (
     AvailabilityType,
+    BookingStatus,
     LocationType,
     PackageTier,
     ScheduleStatus,
     TripStatus,
 )
+from django_trips.managers import encode_members
 from django_trips.models import (
     CancellationPolicy,
     Facility,
@@ -401,6 +405,152 @@ class TestTrip(TestCase):
         self.assertNotIn(unverified_trip.id, active_ids)
 
 
+class TripDurationDaysTestCase(TestCase):
+    """`duration_days` mirrors `duration`'s whole days on every save."""
+
+    def test_set_on_save(self):
+        trip = TripFactory(duration=timedelta(days=4, hours=20))
+        self.assertEqual(trip.duration_days, 4)
+
+        trip.duration = None
+        trip.save()
+        trip.refresh_from_db()
+        self.assertIsNone(trip.duration_days)
+
+    def test_kept_in_sync_with_update_fields(self):
+        trip = TripFactory(duration=timedelta(days=2))
+        trip.duration = timedelta(days=9)
+        trip.save(update_fields=["duration"])
+        trip.refresh_from_db()
+        self.assertEqual(trip.duration_days, 9)
+
+
+class TripIsListableTestCase(TestCase):
+    """`is_listable` tracks is_active, status and the host's verified flag."""
+
+    def setUp(self):
+        self.host = HostFactory(verified=True)
+        self.trip = TripFactory(host=self.host)
+
+    def assert_listable(self, expected):
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.is_listable, expected)
+        self.assertEqual(Trip.objects.active().filter(pk=self.trip.pk).exists(), expected)
+
+    def test_set_on_save(self):
+        self.assert_listable(True)
+
+        self.trip.is_active = False
+        self.trip.save(update_fields=["is_active"])
+        self.assert_listable(False)
+
+        self.trip.is_active = True
+        self.trip.set_status(TripStatus.DRAFT)
+        self.assert_listable(False)
+
+        self.trip.set_status(TripStatus.PUBLISHED)
+        self.assert_listable(True)
+
+    def test_save_reads_stored_row_once(self):
+        trip = Trip.objects.get(pk=self.trip.pk)
+        trip.is_active = False
+        # The stored row (with its host), the slug check and the UPDATE.
+        with self.assertNumQueries(3):
+            trip.save(update_fields=["is_active"])
+        self.assert_listable(False)
+
+    def test_save_follows_repointed_host(self):
+        trip = Trip.objects.get(pk=self.trip.pk)
+        trip.host_id = HostFactory(verified=False).pk
+        trip.save()
+        self.assert_listable(False)
+
+    def test_follows_host_verified(self):
+        self.host.verified = False
+        self.host.save()
+        self.assert_listable(False)
+
+        self.host.verified = True
+        self.host.save()
+        self.assert_listable(True)
+
+    def test_other_host_saves_leave_trips_alone(self):
+        Trip.objects.filter(pk=self.trip.pk).update(is_listable=False)
+        self.host.name = "Renamed"
+        self.host.save()
+        self.assert_listable(False)  # not recomputed
+
+    def test_sync_listable_after_bulk_update(self):
+        Trip.objects.filter(pk=self.trip.pk).update(status=TripStatus.DRAFT)
+        self.assert_listable(True)
+        Trip.objects.filter(pk=self.trip.pk).sync_listable()
+        self.assert_listable(False)
+
+    def test_active_does_not_join_host(self):
+        self.assertNotIn("django_trips_host", str(Trip.objects.active().query))
+
+
+class TripMembersTestCase(TestCase):
+    """The `*_members` columns track their M2M from either side."""
+
+    def setUp(self):
+        self.hot_water, self.bonfire = FacilityFactory(), FacilityFactory()
+        self.trip = TripFactory(facilities=[self.hot_water])
+
+    def assert_members(self, *facilities):
+        self.trip.refresh_from_db()
+        self.assertEqual(
+            self.trip.facility_members, encode_members([facility.pk for facility in facilities])
+        )
+
+    def test_forward_writes(self):
+        self.assert_members(self.hot_water)
+        self.trip.facilities.add(self.bonfire)
+        # Set on the instance too, so a full save() doesn't revert it.
+        self.trip.save()
+        self.assert_members(self.hot_water, self.bonfire)
+        self.trip.facilities.remove(self.hot_water)
+        self.assert_members(self.bonfire)
+        self.trip.facilities.clear()
+        self.assert_members()
+
+    def test_stale_instance_save_keeps_members(self):
+        stale = Trip.objects.get(pk=self.trip.pk)
+        self.bonfire.trips.add(self.trip)
+        stale.name = "Renamed"
+        stale.save()
+        self.assert_members(self.hot_water, self.bonfire)
+
+    def test_reverse_writes(self):
+        self.bonfire.trips.add(self.trip)
+        self.assert_members(self.hot_water, self.bonfire)
+        self.hot_water.trips.clear()
+        self.assert_members(self.bonfire)
+
+    def test_member_deleted(self):
+        self.trip.facilities.add(self.bonfire)
+        self.hot_water.delete()
+        self.assert_members(self.bonfire)
+
+        location = self.trip.locations.first()
+        location.delete()
+        self.trip.refresh_from_db()
+        self.assertEqual(
+            self.trip.location_members,
+            encode_members(self.trip.locations.values_list("pk", flat=True)),
+        )
+
+    def test_sync_members(self):
+        Trip.objects.filter(pk=self.trip.pk).update(facility_members="")
+        Trip.objects.filter(pk=self.trip.pk).sync_members()
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.facility_members, encode_members([self.hot_water.pk]))
+        self.assertEqual(
+            self.trip.location_members,
+            encode_members(self.trip.locations.values_list("pk", flat=True)),
+        )
+
+
 class TripStatusEventTestCase(TestCase):
     """The `trip_status_changed` signal and its default DB-logging receiver."""
 
@@ -956,3 +1106,57 @@ class TripRefundScheduleTestCase(TestCase):
             trip.refund_schedule,
             [{"label": "Custom", "min_hours_before_departure": 24, "refund_percent": 25}],
         )
+
+
+class TripPopularityTestCase(TestCase):
+    """`TripQuerySet.sync_popularity()` - the score behind `?ordering=popularity`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quiet_trip = TripFactory(trip_schedule=None)
+        cls.trip = TripFactory(trip_schedule=None)
+        start = timezone.now().date() + timedelta(days=30)
+        schedule = TripScheduleFactory(
+            trip=cls.trip,
+            start_date=start,
+            end_date=start + timedelta(days=3),
+            status=ScheduleStatus.PUBLISHED,
+        )
+        TripBookingFactory(schedule=schedule)
+        # A second half-life old: counts half.
+        aged = TripBookingFactory(schedule=schedule)
+        TripBookingFactory(schedule=schedule, status=BookingStatus.CANCELLED)
+        TripBooking.objects.filter(pk=aged.pk).update(
+            created=timezone.now() - timedelta(days=20)
+        )
+        TripSchedule.objects.filter(pk=schedule.pk).update(available_seats=10, booked_seats=4)
+
+        TripWishlistFactory(trip=cls.trip)
+        # Past the last decay step: counts for nothing.
+        stale = TripWishlistFactory(trip=cls.trip)
+        TripWishlist.objects.filter(pk=stale.pk).update(
+            created_at=timezone.now() - timedelta(days=100)
+        )
+
+        TripReviewFactory.create_batch(5, trip=cls.trip, overall=4, is_verified=True)
+        TripReviewFactory(trip=cls.trip, overall=1, is_verified=False)
+
+    def test_scores_each_signal(self):
+        Trip.objects.sync_popularity()
+        self.trip.refresh_from_db()
+        self.quiet_trip.refresh_from_db()
+        # 3 x 1.5 bookings + 1 x 1 wishlist add
+        # + 10 x (4/5 rating x 5/(5+5) reviews) + 10 x 0.4 filled.
+        self.assertAlmostEqual(self.trip.popularity, 4.5 + 1 + 4 + 4)
+        self.assertEqual(self.quiet_trip.popularity, 0)
+
+    @override_settings(DJANGO_TRIPS_POPULARITY_WEIGHTS={"fill_rate": 0, "wishlist_adds": 2})
+    def test_weights_setting(self):
+        Trip.objects.filter(pk=self.trip.pk).sync_popularity()
+        self.trip.refresh_from_db()
+        self.assertAlmostEqual(self.trip.popularity, 4.5 + 2 + 4)
+
+    def test_refresh_command(self):
+        call_command("refresh_trip_popularity", stdout=StringIO())
+        self.trip.refresh_from_db()
+        self.assertGreater(self.trip.popularity, 0)
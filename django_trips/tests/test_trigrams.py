@@ -0,0 +1,56 @@
+from django.test import TestCase
+
+from django_trips.tests.factories import LocationFactory
+from django_trips.trigrams import (TrigramIndex, get_location_index,
+                                   resolve_location_slugs, trigrams)
+
+
+class TrigramsTestCase(TestCase):
+    def test_words_padded(self):
+        self.assertEqual(trigrams("Gali"), {"$$g", "$ga", "gal", "ali", "li$"})
+
+    def test_words_also_run_together(self):
+        self.assertLessEqual(trigrams("nathiagali"), trigrams("Nathia Gali"))
+        self.assertEqual(trigrams("nathia-gali"), trigrams("Nathia Gali"))
+
+    def test_no_words(self):
+        self.assertEqual(trigrams(" - "), set())
+        self.assertEqual(trigrams(None), set())
+
+
+class TrigramIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = TrigramIndex(
+            [("hunza", "Hunza"), ("hunza-valley", "Hunza Valley"), ("skardu", "Skardu")]
+        )
+
+    def test_match_ranked(self):
+        self.assertEqual(
+            [key for key, _score in self.index.match("hunza valey")], ["hunza-valley"]
+        )
+        # An exact "hunza" also scores 1.0 against "Hunza Valley" - the
+        # shorter name ranks first.
+        self.assertEqual([key for key, _score in self.index.match("hunza")], ["hunza", "hunza-valley"])
+
+    def test_no_match(self):
+        self.assertEqual(self.index.match("lahore"), [])
+        self.assertEqual(self.index.match(""), [])
+
+
+class ResolveLocationSlugsTestCase(TestCase):
+    def setUp(self):
+        self.nathia_gali = LocationFactory(name="Nathia Gali")
+        self.hunza = LocationFactory(name="Hunza")
+
+    def test_slugs_kept_others_resolved(self):
+        self.assertEqual(
+            resolve_location_slugs([self.hunza.slug, "nathiagali", "no-such-place"]),
+            {self.hunza.slug, self.nathia_gali.slug},
+        )
+
+    def test_index_follows_location_writes(self):
+        self.assertNotIn("skardu", get_location_index())
+        LocationFactory(name="Skardu")
+        self.assertIn("skardu", get_location_index())
+        self.hunza.delete()
+        self.assertNotIn("hunza", get_location_index())
@@ -0,0 +1,123 @@
+"""
+Trigram-based fuzzy matching for trip and location names.
+
+A text's trigrams are the 3-character windows of each of its words, padded
+at the edges (as pg_trgm does), plus those of all its words run together -
+so "nathiagali" still finds "Nathia Gali", and "Hunza valey" finds "Hunza
+Valley". A candidate's score is the share of the query's trigrams it also
+has; anything scoring `SIMILARITY_THRESHOLD` or more is a match.
+
+Words are padded with "$" rather than pg_trgm's spaces: MySQL's PAD SPACE
+collations ignore trailing spaces when comparing, which would make "ey "
+equal "ey" in the persisted `TripTrigram` table.
+"""
+
+import re
+
+from django.apps import apps
+
+from django_trips.cache import get_catalog_version
+
+PAD = "$"
+SIMILARITY_THRESHOLD = 0.5
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(text):
+    """
+    The set of trigrams of `text`, e.g.
+
+        >>> sorted(trigrams("Gali"))
+        ['$$g', '$ga', 'ali', 'gal', 'li$']
+    """
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) > 1:
+        words.append("".join(words))
+    grams = set()
+    for word in words:
+        padded = f"{PAD * 2}{word}{PAD}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    An in-memory trigram -> keys index, for tables small enough to keep
+    whole in each process (locations, not trips - see `TripTrigram`).
+    """
+
+    def __init__(self, entries):
+        """`entries`: (key, text, ...) tuples; a key's texts are indexed together."""
+        self.grams = {}
+        self.postings = {}
+        for key, *texts in entries:
+            key_grams = self.grams.setdefault(key, set())
+            for text in texts:
+                key_grams |= trigrams(text)
+        for key, key_grams in self.grams.items():
+            for gram in key_grams:
+                self.postings.setdefault(gram, set()).add(key)
+
+    def __contains__(self, key):
+        return key in self.grams
+
+    def match(self, query, threshold=SIMILARITY_THRESHOLD):
+        """
+        [(key, score), ...] of the keys scoring at least `threshold` against
+        `query`, best first - ties going to the shorter text, i.e. the one
+        with less the query didn't ask for.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        shared = {}
+        for gram in query_grams:
+            for key in self.postings.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        scored = [
+            (key, count / len(query_grams))
+            for key, count in shared.items()
+            if count / len(query_grams) >= threshold
+        ]
+        scored.sort(key=lambda item: (-item[1], len(self.grams[item[0]]), str(item[0])))
+        return scored
+
+
+_location_index = {}
+
+
+def get_location_index():
+    """
+    The `TrigramIndex` of every Location slug (over its name and slug),
+    built once per catalog version (see cache.py) - a Location write
+    anywhere orphans it - and dropped locally by `reset_location_index()`.
+    """
+    version = get_catalog_version()
+    if _location_index.get("version") != version:
+        location_model = apps.get_model("django_trips", "Location")
+        rows = location_model.objects.filter(slug__isnull=False).values_list("slug", "name")
+        _location_index.update(version=version, index=TrigramIndex(rows))
+    return _location_index["index"]
+
+
+def reset_location_index():
+    """Drops this process's location index; the next lookup rebuilds it."""
+    _location_index.clear()
+
+
+def resolve_location_slugs(values):
+    """
+    `values` with each one that isn't a Location slug replaced by the
+    slug(s) it most closely matches - all of those tied on the best score -
+    or dropped if nothing comes close.
+    """
+    index = get_location_index()
+    slugs = set()
+    for value in values:
+        if value in index:
+            slugs.add(value)
+            continue
+        matches = index.match(value)
+        slugs.update(slug for slug, score in matches if score == matches[0][1])
+    return slugs
@@ -4,6 +4,7 @@ Django settings for trips project.
 
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -131,6 +132,14 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.BasicAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # MessagePackRenderer can't render without the optional msgpack package -
+    # offered only when it's installed, so `Accept: application/msgpack`
+    # falls back to JSON rather than failing.
+    "DEFAULT_RENDERER_CLASSES": [
+        "django_trips.api.renderers.OrjsonRenderer",
+        *(["django_trips.api.renderers.MessagePackRenderer"] if find_spec("msgpack") else []),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_PAGINATION_CLASS": "django_trips.api.paginators.TripResponsePagination",
     "PAGE_SIZE": 10,
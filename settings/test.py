@@ -1,2 +1,7 @@
 # pylint:disable=all
 from settings.common import *
+
+# Catalog caches (list counts etc.) outlive a test's rolled-back transaction
+# in a real cache, leaking one test's data into the next - tests that
+# exercise caching opt back in with override_settings.
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
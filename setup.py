@@ -72,7 +72,11 @@ setup(
     keywords="Django trips",
     packages=["django_trips"],
     install_requires=load_requirements("requirements.txt"),
-    extras_require={"dev": load_requirements("requirements-dev.txt")},
+    extras_require={
+        "dev": load_requirements("requirements-dev.txt"),
+        # Faster JSON / MessagePack renderers, see django_trips/api/renderers.py
+        "renderers": ["orjson>=3.8", "msgpack>=1.0"],
+    },
     python_requires=">=3.11",
     classifiers=[
         "Intended Audience :: Developers",